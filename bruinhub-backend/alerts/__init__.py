@@ -0,0 +1,4 @@
+from .engine import AlertEngine, ThresholdIndex, describe
+
+# Fed by the scrape tasks and updated by the /v1/alerts routes
+alert_engine = AlertEngine()
@@ -0,0 +1,156 @@
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models.alerts import Alert, OPENING_CONDITIONS
+
+logger = logging.getLogger(__name__)
+
+# (kind, slug, zone_name) of a watched value; zone_name is None for dining halls
+SeriesKey = Tuple[str, str, Optional[str]]
+
+
+class ThresholdIndex:
+    """The threshold alerts on one value, kept as sorted (threshold, alert id) lists.
+
+    A new reading only visits the thresholds between the previous reading and itself: `below t`
+    fires when the value drops from at least t to under t, and `above t` when it rises from at
+    most t to over t. Finding that range is a binary search, so the cost of a reading depends on
+    the alerts it fires, not on how many are registered.
+    """
+
+    def __init__(self):
+        self.below: List[Tuple[int, int]] = []
+        self.above: List[Tuple[int, int]] = []
+        self.last_value: Optional[float] = None
+
+    def _entries(self, condition: str) -> List[Tuple[int, int]]:
+        return self.below if condition == "below" else self.above
+
+    def add(self, alert: Alert):
+        bisect.insort(self._entries(alert.condition), (alert.threshold, alert.id))
+
+    def remove(self, alert: Alert):
+        entries = self._entries(alert.condition)
+        index = bisect.bisect_left(entries, (alert.threshold, alert.id))
+        if index < len(entries) and entries[index] == (alert.threshold, alert.id):
+            del entries[index]
+
+    def __len__(self) -> int:
+        return len(self.below) + len(self.above)
+
+    def update(self, value: float) -> List[int]:
+        """Records a reading and returns the ids of the alerts whose threshold it crossed."""
+        previous, self.last_value = self.last_value, value
+        if previous is None or value == previous:
+            return []
+        if value < previous:
+            # Thresholds t with value < t <= previous
+            start = bisect.bisect_right(self.below, (value, float("inf")))
+            end = bisect.bisect_right(self.below, (previous, float("inf")))
+            return [alert_id for _, alert_id in self.below[start:end]]
+        # Thresholds t with previous <= t < value
+        start = bisect.bisect_left(self.above, (previous, float("-inf")))
+        end = bisect.bisect_left(self.above, (value, float("-inf")))
+        return [alert_id for _, alert_id in self.above[start:end]]
+
+
+class AlertEngine:
+    """Every registered alert, indexed for evaluation on each scrape.
+
+    Threshold alerts live in a ThresholdIndex per gym zone or dining hall, and opening alerts in
+    a set per facility and condition that is only read when the facility opens or closes. Both
+    are edge triggered: an alert fires once per crossing, and the first reading after a restart
+    only sets the starting point.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._alerts: Dict[int, Alert] = {}
+        self._thresholds: Dict[SeriesKey, ThresholdIndex] = {}
+        self._openings: Dict[Tuple[str, str, str], Set[int]] = {}  # (kind, slug, condition) -> alert ids
+        self._open_state: Dict[Tuple[str, str], bool] = {}
+        self.loaded = False
+
+    def add(self, alert: Alert):
+        """Registers an alert, ignoring one that is already registered."""
+        with self._lock:
+            if alert.id in self._alerts:
+                return
+            self._alerts[alert.id] = alert
+            if alert.condition in OPENING_CONDITIONS:
+                self._openings.setdefault((alert.kind, alert.slug, alert.condition), set()).add(alert.id)
+            else:
+                key = (alert.kind, alert.slug, alert.zone_name)
+                self._thresholds.setdefault(key, ThresholdIndex()).add(alert)
+
+    def remove(self, alert_id: int) -> Optional[Alert]:
+        """Unregisters an alert, returning it if it was registered."""
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return None
+            if alert.condition in OPENING_CONDITIONS:
+                self._openings.get((alert.kind, alert.slug, alert.condition), set()).discard(alert_id)
+            else:
+                self._thresholds[(alert.kind, alert.slug, alert.zone_name)].remove(alert)
+            return alert
+
+    def load(self, alerts: Iterable[Alert]):
+        """Replaces every registered alert, keeping the last readings seen."""
+        with self._lock:
+            last_values = {key: index.last_value for key, index in self._thresholds.items()}
+            self._alerts.clear()
+            self._thresholds.clear()
+            self._openings.clear()
+            for alert in alerts:
+                self.add(alert)
+            for key, value in last_values.items():
+                if value is not None:
+                    self._thresholds.setdefault(key, ThresholdIndex()).last_value = value
+            self.loaded = True
+        logger.info(f"Loaded {len(self._alerts)} alerts")
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[Alert]]):
+        """Loads the alerts with `loader` unless they already are."""
+        if self.loaded:
+            return
+        with self._lock:
+            if not self.loaded:
+                self.load(loader())
+
+    def observe_value(self, kind: str, slug: str, zone_name: Optional[str], value: float) -> List[Tuple[Alert, float]]:
+        """Records a reading, returning each alert it fired with the value that fired it."""
+        with self._lock:
+            index = self._thresholds.get((kind, slug, zone_name))
+            if index is None:
+                # Remember the reading so alerts registered later have a starting point
+                index = self._thresholds[(kind, slug, zone_name)] = ThresholdIndex()
+            return [(self._alerts[alert_id], value) for alert_id in index.update(value)]
+
+    def observe_open(self, kind: str, slug: str, is_open: Optional[bool]) -> List[Tuple[Alert, None]]:
+        """Records whether a facility is open, returning the alerts fired by it opening or closing."""
+        if is_open is None:
+            return []
+        with self._lock:
+            was_open = self._open_state.get((kind, slug))
+            self._open_state[(kind, slug)] = is_open
+            if was_open is None or was_open == is_open:
+                return []
+            condition = "opens" if is_open else "closes"
+            return [(self._alerts[alert_id], None) for alert_id in self._openings.get((kind, slug, condition), ())]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns how many alerts are registered and how many values are watched."""
+        with self._lock:
+            return {"alerts": len(self._alerts), "watched_values": len(self._thresholds)}
+
+
+def describe(alert: Alert, value: Optional[float]) -> str:
+    """Returns the notification text for a fired alert."""
+    facility = alert.slug if alert.zone_name is None else f"{alert.slug} {alert.zone_name}"
+    if alert.condition in OPENING_CONDITIONS:
+        return f"{facility} {'is now open' if alert.condition == 'opens' else 'just closed'}"
+    unit = "%" if alert.kind == "gym" else ""
+    return f"{facility} is {alert.condition} {alert.threshold}{unit} ({value:g}{unit})"
@@ -0,0 +1,9 @@
+from .popular_times import PopularTimes
+from .forecast import ForecastModels
+
+# Fed by the scrape tasks as each scrape lands and read by the API routes
+gym_popular_times = PopularTimes()
+dining_popular_times = PopularTimes()
+
+# Refitted by the maintenance tasks and read by the API routes
+gym_forecasts = ForecastModels()
@@ -0,0 +1,128 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analytics.popular_times import HOURS_PER_WEEK, hour_of_week, to_epoch_seconds
+from models.gyms import GymForecastModel
+
+logger = logging.getLogger(__name__)
+
+# Fewer hours than this leave most of the week's baseline unobserved
+MIN_FIT_HOURS = 24
+
+
+def fit_zone_model(hours: Sequence, percentages: Sequence[float], fitted_at: datetime) -> Optional[GymForecastModel]:
+    """
+    Fits a seasonal baseline plus decaying residual model to hourly average percentages.
+
+    The baseline is the mean for each hour of the week (the overall mean where an hour was
+    never observed). The decay is the least squares AR(1) coefficient of the residuals of
+    consecutive hours, clipped to [0, 1). Returns None when there is too little history.
+    """
+    seconds = to_epoch_seconds(hours)
+    values = np.asarray(percentages, dtype=np.float64)
+    if len(values) < MIN_FIT_HOURS:
+        return None
+
+    order = np.argsort(seconds)
+    seconds, values = seconds[order], values[order]
+    how = hour_of_week(seconds)
+
+    totals = np.bincount(how, weights=values, minlength=HOURS_PER_WEEK)
+    counts = np.bincount(how, minlength=HOURS_PER_WEEK)
+    baseline = np.divide(totals, counts, out=np.full(HOURS_PER_WEEK, values.mean()), where=counts > 0)
+
+    residuals = values - baseline[how]
+    consecutive = np.diff(seconds) == 3600
+    previous, following = residuals[:-1][consecutive], residuals[1:][consecutive]
+    denominator = np.dot(previous, previous)
+    decay = float(np.dot(previous, following) / denominator) if denominator > 0 else 0.0
+
+    return GymForecastModel(
+        baseline=[round(float(value), 3) for value in baseline],
+        decay=min(max(decay, 0.0), 0.99),
+        samples=len(values),
+        fitted_at=fitted_at,
+    )
+
+
+def fit_models(rows: Sequence[Tuple], fitted_at: datetime) -> Dict[Tuple[str, str], GymForecastModel]:
+    """
+    Fits a model per zone from (slug, zone_name, hour, sum of percentages, samples, ...) rows,
+    as returned by `GymDatabase.get_hourly_percentages`.
+    """
+    grouped: Dict[Tuple[str, str], List[Tuple]] = {}
+    for row in rows:
+        grouped.setdefault((row[0], row[1]), []).append(row)
+
+    models = {}
+    for key, zone_rows in grouped.items():
+        _, _, hours, sums, samples = zip(*(row[:5] for row in zone_rows))
+        model = fit_zone_model(hours, np.divide(sums, samples), fitted_at)
+        if model is not None:
+            models[key] = model
+    return models
+
+
+def predict(
+    model: GymForecastModel, now: datetime, hours: int, current: Optional[float] = None,
+    observed_at: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Predicts the percentage at the start of each of the next `hours` hours. The deviation of
+    the `current` reading (taken at `observed_at`) from its baseline decays by `decay` per hour.
+    """
+    baseline = np.asarray(model.baseline)
+    first = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    targets = [first + timedelta(hours=step) for step in range(hours)]
+    target_seconds = to_epoch_seconds(targets)
+    predictions = baseline[hour_of_week(target_seconds)]
+
+    if current is not None and observed_at is not None:
+        observed_seconds = to_epoch_seconds([observed_at])[0]
+        residual = current - baseline[hour_of_week(np.array([observed_seconds]))[0]]
+        lags = np.maximum((target_seconds - observed_seconds) / 3600, 0)
+        predictions = predictions + residual * model.decay ** lags
+
+    return [
+        {"time": target.isoformat(), "percentage": round(float(value), 1)}
+        for target, value in zip(targets, np.clip(predictions, 0, 100))
+    ]
+
+
+class ForecastModels:
+    """The fitted forecast models of every gym zone, held in memory for serving.
+
+    Models are fitted offline by the maintenance task and persisted, so serving a forecast
+    only needs the models and each zone's latest reading, never the capacity history.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._models: Dict[str, Dict[str, GymForecastModel]] = {}  # slug -> zone_name -> model
+        self.loaded = False
+
+    def load(self, models: Dict[Tuple[str, str], GymForecastModel]):
+        """Replaces every model."""
+        by_gym: Dict[str, Dict[str, GymForecastModel]] = {}
+        for (slug, zone_name), model in models.items():
+            by_gym.setdefault(slug, {})[zone_name] = model
+        with self._lock:
+            self._models = by_gym
+            self.loaded = True
+        logger.info(f"Loaded forecast models for {len(models)} zones")
+
+    def ensure_loaded(self, loader: Callable[[], Dict[Tuple[str, str], GymForecastModel]]):
+        """Loads the models with `loader` unless they already are."""
+        if self.loaded:
+            return
+        with self._lock:
+            if not self.loaded:
+                self.load(loader())
+
+    def get(self, slug: str) -> Dict[str, GymForecastModel]:
+        """Returns the models of a gym's zones."""
+        return self._models.get(slug, {})
@@ -0,0 +1,172 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+HOURS_PER_WEEK = 7 * 24
+
+# 1970-01-01 was a Thursday, so epoch day d falls on weekday (d + 3) % 7 with Monday as 0
+EPOCH_WEEKDAY = 3
+
+# (slug, series, timestamp, weighted sum of values, total weight, newest sample folded into the row)
+ProfileRow = Tuple[str, str, datetime, float, float, datetime]
+
+
+def to_epoch_seconds(timestamps: Iterable) -> np.ndarray:
+    """Converts datetimes or ISO 8601 strings, taken as local wall time, to epoch seconds."""
+    return np.asarray(list(timestamps), dtype="datetime64[s]").astype(np.int64)
+
+
+def hour_of_week(seconds: np.ndarray) -> np.ndarray:
+    """Maps epoch seconds to their hour of the week, 0 being Monday 00:00-01:00."""
+    hours = seconds // 3600
+    return (hours // 24 + EPOCH_WEEKDAY) % 7 * 24 + hours % 24
+
+
+def spread_over_hours(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits the spans [start, end) (epoch seconds) at hour boundaries. Returns the hour of the
+    week, the seconds covered and the index of the originating span for every piece.
+    """
+    first = starts // 3600
+    counts = np.maximum((ends - 1) // 3600 - first + 1, 0)
+    span = np.repeat(np.arange(len(starts)), counts)
+    # Position of each piece within its span
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    hours = first[span] + offset
+    seconds = np.minimum((hours + 1) * 3600, ends[span]) - np.maximum(hours * 3600, starts[span])
+    return hour_of_week(hours * 3600), seconds.astype(np.float64), span
+
+
+class PopularTimes:
+    """Hour-of-week occupancy profiles for one kind of facility, one profile per series.
+
+    A series is a gym zone or a dining hall's capacity. Each keeps a weighted sum of values and
+    the total weight per hour of the week, so new samples are folded in with one `bincount` and
+    an average is a single division. The serialized profile of each facility is cached until
+    one of its series changes, so reads are served from memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sums: Dict[Tuple[str, str], np.ndarray] = {}
+        self._weights: Dict[Tuple[str, str], np.ndarray] = {}
+        self._seen_until: Dict[Tuple[str, str], np.int64] = {}  # Newest point sample folded in
+        self._last_observed: Dict[Tuple[str, str], Tuple[np.int64, float]] = {}  # For span-weighted series
+        self._views: Dict[str, Dict[str, Dict[str, List[Optional[float]]]]] = {}
+        self.loaded = False
+
+    def _fold(self, slug: str, series: str, hours: np.ndarray, sums: np.ndarray, weights: np.ndarray):
+        key = (slug, series)
+        if key not in self._sums:
+            self._sums[key] = np.zeros(HOURS_PER_WEEK)
+            self._weights[key] = np.zeros(HOURS_PER_WEEK)
+        self._sums[key] += np.bincount(hours, weights=sums, minlength=HOURS_PER_WEEK)
+        self._weights[key] += np.bincount(hours, weights=weights, minlength=HOURS_PER_WEEK)
+        self._views.pop(slug, None)
+
+    def add_points(
+        self,
+        slug: str,
+        series: str,
+        timestamps: Sequence,
+        sums: Sequence[float],
+        weights: Optional[Sequence[float]] = None,
+        newest: Optional[Sequence] = None,
+    ) -> int:
+        """
+        Folds in samples taken at `timestamps`, each contributing `sums` (value times weight,
+        weight 1 by default). Samples at or before the newest one already folded into the series
+        are ignored, so a scrape repeating upstream's last reading is not counted twice. `newest`
+        overrides that per sample, for rows that aggregate a whole hour. Returns how many were added.
+        """
+        seconds = to_epoch_seconds(timestamps)
+        newest_seconds = to_epoch_seconds(newest) if newest is not None else seconds
+        sums = np.asarray(sums, dtype=np.float64)
+        weights = np.ones(len(seconds)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        with self._lock:
+            key = (slug, series)
+            seen_until = self._seen_until.get(key)
+            fresh = newest_seconds > seen_until if seen_until is not None else np.ones(len(seconds), dtype=bool)
+            if not fresh.any():
+                return 0
+            self._fold(slug, series, hour_of_week(seconds[fresh]), sums[fresh], weights[fresh])
+            self._seen_until[key] = newest_seconds[fresh].max()
+            return int(fresh.sum())
+
+    def observe(self, slug: str, series: str, at: datetime, value: float):
+        """
+        Records a reading of a value that holds until the next one, like a dining hall's capacity.
+        The previous reading is folded in weighted by the seconds it held within each hour.
+        """
+        at_seconds = to_epoch_seconds([at])[0]
+        with self._lock:
+            key = (slug, series)
+            previous = self._last_observed.get(key)
+            self._last_observed[key] = (at_seconds, value)
+            if previous is None or previous[0] >= at_seconds:
+                return
+
+            hours, seconds, _ = spread_over_hours(np.array([previous[0]]), np.array([at_seconds]))
+            self._fold(slug, series, hours, seconds * previous[1], seconds)
+
+    def load(self, rows: Iterable[ProfileRow]):
+        """Replaces every profile with aggregated history rows, grouped and folded per series."""
+        grouped: Dict[Tuple[str, str], List[ProfileRow]] = {}
+        for row in rows:
+            grouped.setdefault((row[0], row[1]), []).append(row)
+
+        with self._lock:
+            self.clear()
+            for (slug, series), series_rows in grouped.items():
+                _, _, timestamps, sums, weights, newest = zip(*series_rows)
+                self.add_points(slug, series, timestamps, sums, weights, newest)
+            self.loaded = True
+        logger.info(f"Loaded popular times for {len(grouped)} series")
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[ProfileRow]]):
+        """Loads the profiles with `loader` unless they already are."""
+        if self.loaded:
+            return
+        with self._lock:
+            if not self.loaded:
+                self.load(loader())
+
+    def get(self, slug: str) -> Dict[str, Dict[str, List[Optional[float]]]]:
+        """
+        Returns the profiles of a facility as series -> day -> 24 hourly averages (None where
+        nothing was ever recorded). The result is cached until new samples arrive.
+        """
+        view = self._views.get(slug)
+        if view is not None:
+            return view
+
+        with self._lock:
+            view = {}
+            for (profile_slug, series), sums in self._sums.items():
+                if profile_slug != slug:
+                    continue
+                weights = self._weights[(profile_slug, series)]
+                averages = np.divide(sums, weights, out=np.full(HOURS_PER_WEEK, np.nan), where=weights > 0)
+                view[series] = {
+                    day: [None if np.isnan(avg) else round(float(avg), 1) for avg in averages[i * 24:(i + 1) * 24]]
+                    for i, day in enumerate(DAYS)
+                }
+            self._views[slug] = view
+            return view
+
+    def clear(self):
+        """Drops every profile."""
+        with self._lock:
+            self._sums.clear()
+            self._weights.clear()
+            self._seen_until.clear()
+            self._last_observed.clear()
+            self._views.clear()
+            self.loaded = False
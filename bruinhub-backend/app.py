@@ -1,71 +1,94 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
-import os
+from dataclasses import asdict
 from datetime import datetime
-from database import DatabaseManager
-from database.gyms import GymDatabase
-from tasks import init_scheduler
-from tasks.gym_tasks import setup_gym_tasks, scrape_and_store_gym_data
-from tasks.dining_tasks import setup_dining_tasks, scrape_and_store_dining_data
-from routes import api  # Add this import
+from database import init_db_layer
+from cache import event_broker, menu_index
+from alerts import alert_engine
+from tasks import init_scheduler, get_schedule
+from tasks import gym_tasks, dining_tasks, maintenance_tasks
+from tasks.gym_tasks import setup_gym_tasks
+from tasks.dining_tasks import setup_dining_tasks
+from tasks.maintenance_tasks import setup_maintenance_tasks
+from routes import api
+from streaming import stream_server
 import logging
 
-from config import DATABASE_URL
+from config import DATABASE_URL, SCRAPE_INTERVAL
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
 
-# Register the API blueprint
-app.register_blueprint(api, url_prefix="/api")  # Add this line
+def create_app(database_url: str = DATABASE_URL, start_scheduler: bool = True) -> Flask:
+    """
+    Builds the Flask app around one shared database layer.
 
+    Nothing here waits on Postgres or the UCLA APIs: the database connects on first use and the
+    initial scrape runs in the background, so the server accepts traffic right away. With the
+    scheduler, the evented stream server for `/api/v1/stream` starts on `STREAM_PORT` too.
+    """
+    app = Flask(__name__)
+    CORS(app)  # Enable CORS for all routes
 
+    # Share one database layer between the API and the background tasks
+    db_layer = init_db_layer(database_url)
+    app.extensions["db_layer"] = db_layer
 
+    # Register the API blueprint
+    app.register_blueprint(api, url_prefix="/api")
 
-# Load configuration
-DB_URL = DATABASE_URL
-SCRAPE_INTERVAL = int(os.getenv("SCRAPE_INTERVAL", "300"))  # Default 5 minutes
+    # Setup tasks
+    setup_gym_tasks(db_layer)
+    setup_dining_tasks(db_layer)
+    setup_maintenance_tasks(db_layer)
+    if start_scheduler:
+        app.extensions["scheduler"] = init_scheduler(SCRAPE_INTERVAL, run_immediately=True)
+        stream_server.start()
 
-# Initialize database managers
-db_manager = DatabaseManager(DB_URL)
-
-# Setup tasks
-setup_gym_tasks(DB_URL)
-setup_dining_tasks(DB_URL)
-
-
-# Health check endpoint
-@app.route("/health", methods=["GET"])
-def health_check():
-    if db_manager.test_connection():
-        return jsonify(
-            {
-                "status": "healthy",
-                "database": "connected",
-                "timestamp": datetime.now().isoformat(),
-            }
+    # Health check endpoint
+    @app.route("/health", methods=["GET"])
+    def health_check():
+        db_manager = db_layer.manager
+        if db_manager.test_connection():
+            return jsonify(
+                {
+                    "status": "healthy",
+                    "database": "connected",
+                    "pool": db_manager.get_pool_stats(),
+                    "last_scrape": {
+                        "gyms": {name: asdict(stats) for name, stats in gym_tasks.last_run_stats.items()},
+                        "dining": {name: asdict(stats) for name, stats in dining_tasks.last_run_stats.items()},
+                    },
+                    "last_compaction": {
+                        name: asdict(stats) for name, stats in maintenance_tasks.last_run_stats.items()
+                    },
+                    "last_forecast_fit": {
+                        name: asdict(stats) for name, stats in maintenance_tasks.last_fit_stats.items()
+                    },
+                    "streams": event_broker.get_stats(),
+                    "alerts": alert_engine.get_stats(),
+                    "menu_search": menu_index.get_stats(),
+                    "schedule": get_schedule(),
+                    "timestamp": datetime.now().isoformat(),
+                }
+            )
+        return (
+            jsonify(
+                {
+                    "status": "unhealthy",
+                    "database": "disconnected",
+                    "timestamp": datetime.now().isoformat(),
+                }
+            ),
+            500,
         )
-    return (
-        jsonify(
-            {
-                "status": "unhealthy",
-                "database": "disconnected",
-                "timestamp": datetime.now().isoformat(),
-            }
-        ),
-        500,
-    )
 
+    return app
 
-if __name__ == "__main__":
-    # Initialize scheduler
-    scheduler = init_scheduler(SCRAPE_INTERVAL)
-
-    # Initial scrape on startup
-    scrape_and_store_gym_data()
-    scrape_and_store_dining_data()
 
-    app.run(debug=True, host="0.0.0.0", port=5001)
+if __name__ == "__main__":
+    app = create_app()
+    # The reloader would start a second scheduler in its watcher process
+    app.run(debug=True, use_reloader=False, host="0.0.0.0", port=5001)
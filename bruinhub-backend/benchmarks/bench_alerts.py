@@ -0,0 +1,112 @@
+"""
+Alert evaluation benchmark: time to evaluate a scrape against many threshold subscriptions.
+
+Registers synthetic `below`/`above` alerts spread over gym zones, then replays scrapes that
+move every zone by a few points. The indexed AlertEngine is compared with a naive scan that
+checks every alert of a zone on every scrape. No database or network access is needed.
+
+Usage (from bruinhub-backend/):
+    python -m benchmarks.bench_alerts --alerts 100000 --zones 40 --scrapes 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from alerts import AlertEngine
+from models.alerts import Alert
+
+
+def synthetic_alerts(count: int, zones: int, seed: int = 130):
+    """Returns `count` threshold alerts with random zones, conditions and thresholds."""
+    rng = random.Random(seed)
+    return [
+        Alert(
+            id=i, subscriber=f"device-{i}", kind="gym", slug="bfit", zone_name=f"Zone {rng.randrange(zones)}",
+            condition=rng.choice(("below", "above")), threshold=rng.randrange(5, 96, 5),
+        )
+        for i in range(count)
+    ]
+
+
+def synthetic_scrapes(scrapes: int, zones: int, seed: int = 130):
+    """Returns per-scrape zone percentages that random walk by a few points at a time."""
+    rng = random.Random(seed)
+    values = [rng.randrange(101) for _ in range(zones)]
+    result = []
+    for _ in range(scrapes):
+        values = [min(100, max(0, value + rng.randint(-4, 4))) for value in values]
+        result.append(list(values))
+    return result
+
+
+def naive_scan(alerts, scrapes, zones: int):
+    """Checks every alert of every zone against each reading, returning how many fired."""
+    by_zone = {}
+    for alert in alerts:
+        by_zone.setdefault(alert.zone_name, []).append(alert)
+    previous, fired = {}, 0
+    for values in scrapes:
+        for zone in range(zones):
+            zone_name, value = f"Zone {zone}", values[zone]
+            last = previous.get(zone_name)
+            previous[zone_name] = value
+            if last is None:
+                continue
+            for alert in by_zone.get(zone_name, ()):
+                if alert.condition == "below" and value < alert.threshold <= last:
+                    fired += 1
+                elif alert.condition == "above" and last <= alert.threshold < value:
+                    fired += 1
+    return fired
+
+
+def indexed(engine, scrapes, zones: int):
+    """Feeds each reading to the engine, returning how many alerts fired."""
+    fired = 0
+    for values in scrapes:
+        for zone in range(zones):
+            fired += len(engine.observe_value("gym", "bfit", f"Zone {zone}", values[zone]))
+    return fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--zones", type=int, default=40)
+    parser.add_argument("--scrapes", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    alerts = synthetic_alerts(args.alerts, args.zones)
+    scrapes = synthetic_scrapes(args.scrapes, args.zones)
+
+    load_timings, naive_timings, indexed_timings = [], [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        naive_fired = naive_scan(alerts, scrapes, args.zones)
+        naive_timings.append(time.perf_counter() - start)
+
+        # A fresh engine per run, so every run starts without previous readings
+        start = time.perf_counter()
+        engine = AlertEngine()
+        engine.load(alerts)
+        load_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        indexed_fired = indexed(engine, scrapes, args.zones)
+        indexed_timings.append(time.perf_counter() - start)
+        assert naive_fired == indexed_fired, (naive_fired, indexed_fired)
+
+    def per_scrape(timings):
+        return statistics.median(timings) / args.scrapes * 1000
+
+    print(f"{args.alerts} alerts over {args.zones} zones, {args.scrapes} scrapes, {args.runs} runs")
+    print(f"  load      {statistics.median(load_timings) * 1000:8.1f} ms")
+    print(f"  naive     {per_scrape(naive_timings):8.3f} ms per scrape")
+    print(f"  indexed   {per_scrape(indexed_timings):8.3f} ms per scrape")
+    print(f"  {naive_fired} notifications fired, {naive_fired / args.scrapes:.0f} per scrape")
+
+
+if __name__ == "__main__":
+    main()
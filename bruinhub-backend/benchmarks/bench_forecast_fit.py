@@ -0,0 +1,70 @@
+"""
+Forecast fit benchmark: time to fit every zone's occupancy model from a year of hourly history.
+
+Builds synthetic hourly rows shaped like `GymDatabase.get_hourly_percentages` (a weekly
+occupancy pattern, AR(1) noise and random gaps) and times `fit_models` over them. No database
+or network access is needed.
+
+Usage (from bruinhub-backend/):
+    python -m benchmarks.bench_forecast_fit --zones 12 --days 365 --runs 5
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from analytics.forecast import fit_models
+
+
+def synthetic_rows(zones: int, days: int, seed: int = 130):
+    """Returns hourly (slug, zone_name, hour, sum of percentages, samples, newest) rows."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 6)  # A Monday
+    hours = np.arange(days * 24)
+    hour_of_day, weekday = hours % 24, hours // 24 % 7
+    # Busy evenings, quieter weekends
+    pattern = 40 * np.exp(-((hour_of_day - 18) ** 2) / 8) + 15 * np.exp(-((hour_of_day - 12) ** 2) / 6)
+    pattern = pattern * np.where(weekday >= 5, 0.6, 1.0) + 5
+
+    rows = []
+    for zone in range(zones):
+        noise = np.zeros(len(hours))
+        shocks = rng.normal(0, 6, len(hours))
+        for i in range(1, len(hours)):
+            noise[i] = 0.7 * noise[i - 1] + shocks[i]
+        values = np.clip(pattern * rng.uniform(0.6, 1.4) + noise, 0, 100)
+        samples = rng.integers(4, 13, len(hours))
+        kept = rng.random(len(hours)) > 0.05  # Missed scrapes and closures leave gaps
+        for hour, value, count in zip(hours[kept], values[kept], samples[kept]):
+            timestamp = start + timedelta(hours=int(hour))
+            rows.append(("bfit", f"Zone {zone}", timestamp, float(value * count), int(count), timestamp))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", type=int, default=12)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.zones, args.days)
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        models = fit_models(rows, datetime.now())
+        timings.append(time.perf_counter() - start)
+
+    decays = [model.decay for model in models.values()]
+    print(f"Fit {len(models)} zones from {len(rows)} hourly rows ({args.days} days), {args.runs} runs")
+    print(
+        f"  median {statistics.median(timings) * 1000:8.1f} ms"
+        f"   min {min(timings) * 1000:8.1f} ms   max {max(timings) * 1000:8.1f} ms"
+    )
+    print(f"  fitted decay {min(decays):.2f}-{max(decays):.2f} (synthetic 0.70)")
+
+
+if __name__ == "__main__":
+    main()
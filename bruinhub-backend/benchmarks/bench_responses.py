@@ -0,0 +1,89 @@
+"""
+Response benchmark: per-request CPU and bytes sent for a dining hall snapshot.
+
+Compares the previous path (`jsonify` on a freshly built dict every request, optionally
+gzipped on the fly as a compressing proxy would) with `snapshot_response`, which serves the
+body serialized and compressed once when the snapshot changed. The payload is a synthetic
+dining hall with a large menu. No database or network access is needed.
+
+Usage (from bruinhub-backend/):
+    python -m benchmarks.bench_responses --stations 12 --items 15 --requests 2000
+"""
+import argparse
+import gzip
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")  # Nothing connects
+
+from flask import Flask, jsonify
+
+from cache import SnapshotStore
+from routes import snapshot_response
+from tasks.scheduler import DINING_SCRAPE_JOB_ID
+
+
+def synthetic_hall(stations: int, items: int):
+    """Returns a dining hall snapshot with `stations` stations of `items` menu items each."""
+    return {
+        "slug": "epicuria",
+        "capacity": 120,
+        "menu": {
+            f"Station {station}": [f"Roasted Seasonal Vegetable Dish {station}-{item} with Herbs" for item in range(items)]
+            for station in range(stations)
+        },
+        "regular_hours": {day: "7:00 AM - 10:00 PM" for day in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")},
+        "special_hours": None,
+        "last_updated": datetime(2025, 11, 17, 12).isoformat(),
+    }
+
+
+def time_requests(app, requests: int, accept_encoding: str, handler):
+    """Returns the mean microseconds per request and the body size of the last response."""
+    with app.test_request_context("/v1/dining/epicuria", headers={"Accept-Encoding": accept_encoding}):
+        start = time.perf_counter()
+        for _ in range(requests):
+            body = handler()
+        elapsed = time.perf_counter() - start
+    return elapsed / requests * 1e6, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=12)
+    parser.add_argument("--items", type=int, default=15)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    data = synthetic_hall(args.stations, args.items)
+    start = time.perf_counter()
+    snapshot = SnapshotStore(max_entries=1, ttl=60).set("dining", "epicuria", data)
+    build_time = time.perf_counter() - start
+
+    def jsonify_identity():
+        return jsonify({"data": data, "timestamp": datetime.now().isoformat()}).get_data()
+
+    def jsonify_gzip():
+        return gzip.compress(jsonify_identity(), compresslevel=6)
+
+    def pre_encoded():
+        return snapshot_response(snapshot, DINING_SCRAPE_JOB_ID).get_data()
+
+    results = [
+        ("jsonify", "identity", jsonify_identity),
+        ("jsonify + gzip -6", "gzip", jsonify_gzip),
+        ("pre-encoded", "identity", pre_encoded),
+        ("pre-encoded", "gzip", pre_encoded),
+        ("pre-encoded", "br", pre_encoded),
+    ]
+    print(f"Dining hall with {args.stations * args.items} menu items, {args.requests} requests per path")
+    print(f"  snapshot build (serialize + gzip + brotli, once per change): {build_time * 1000:.1f} ms")
+    for name, encoding, handler in results:
+        micros, size = time_requests(app, args.requests, encoding, handler)
+        print(f"  {name:18} {encoding:8} {micros:8.1f} us/request {size:8d} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Startup benchmark: time from process start until the API answers its first request.
+
+Compares the old boot sequence (a DatabaseManager per module, then both scrapes run
+synchronously before serving) with `create_app()` (lazy database layer, first scrape in the
+background). Upstream latency is simulated by delaying the gym and dining scrapers.
+
+Each old manager opened its own connection and re-ran the whole schema script, which the
+blocking scenario reproduces with the initial migration (the old schema, made idempotent). Its
+scrapes and first request still go through today's connection pool, where the old code opened a
+connection per query, so the old boot's cost is if anything understated.
+
+Usage (from bruinhub-backend/):
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_startup --upstream-latency 2 --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import psycopg
+
+# The old database/schemas.sql, which every DatabaseManager ran on construction
+BASELINE_SCHEMA = "migrations/0001_initial_schema.sql"
+
+
+def simulate_upstream_latency(latency: float):
+    """Delays the scrapers as if the UCLA APIs took `latency` seconds to answer."""
+    from scrapers.gyms import GymScrapers
+    from scrapers.dining import DiningScrapers
+
+    scrape_gyms = GymScrapers.get_facility_counts
+    scrape_dining = DiningScrapers.scrape_dining_halls
+
+    def slow_facility_counts():
+        time.sleep(latency)
+        return scrape_gyms()
+
+    def slow_dining_halls():
+        time.sleep(latency)
+        return scrape_dining()
+
+    GymScrapers.get_facility_counts = staticmethod(slow_facility_counts)
+    DiningScrapers.scrape_dining_halls = staticmethod(slow_dining_halls)
+
+
+def run_baseline_schema(database_url: str):
+    """What constructing an old DatabaseManager did: connect and apply the schema script."""
+    with open(BASELINE_SCHEMA, "r") as schema_file:
+        schema_sql = schema_file.read()
+    with psycopg.connect(database_url) as conn:
+        conn.execute(schema_sql)
+
+
+def boot_blocking(latency: float) -> float:
+    """The pre-factory boot: a manager per module, then synchronous scrapes before serving."""
+    start = time.perf_counter()
+    simulate_upstream_latency(latency)
+
+    from config import DATABASE_URL
+    from database import DatabaseLayer
+    from tasks import gym_tasks, dining_tasks
+    from app import create_app
+
+    app = create_app(DATABASE_URL, start_scheduler=False)
+    for _ in range(4):  # app.py, routes.py and both task modules each built a manager
+        run_baseline_schema(DATABASE_URL)
+    gym_tasks.setup_gym_tasks(DatabaseLayer(DATABASE_URL))
+    dining_tasks.setup_dining_tasks(DatabaseLayer(DATABASE_URL))
+    gym_tasks.scrape_and_store_gym_data()
+    dining_tasks.scrape_and_store_dining_data()
+
+    app.test_client().get("/api/v1/gym/bfit")
+    return time.perf_counter() - start
+
+
+def boot_factory(latency: float) -> float:
+    """The factory boot: lazy database layer and a background first scrape."""
+    start = time.perf_counter()
+    simulate_upstream_latency(latency)
+
+    from config import DATABASE_URL
+    from app import create_app
+
+    app = create_app(DATABASE_URL)
+    app.test_client().get("/api/v1/gym/bfit")
+    elapsed = time.perf_counter() - start
+    app.extensions["scheduler"].shutdown(wait=False)
+    return elapsed
+
+
+SCENARIOS = {"blocking": boot_blocking, "factory": boot_factory}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upstream-latency", type=float, default=2.0, help="Simulated seconds per upstream scrape")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        # Child process: boot once and report the time to first response
+        import logging
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(SCENARIOS[args.scenario](args.upstream_latency)))
+        return
+
+    print(f"Time to first response, upstream latency {args.upstream_latency:.1f}s, {args.runs} runs")
+    for name in SCENARIOS:
+        timings = []
+        for _ in range(args.runs):
+            # A fresh interpreter per run, so no pool or migration state carries over
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--scenario", name,
+                 "--upstream-latency", str(args.upstream_latency)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            timings.append(float(output.strip().splitlines()[-1]))
+        print(
+            f"  {name:<9} median {statistics.median(timings) * 1000:8.1f} ms"
+            f"   min {min(timings) * 1000:8.1f} ms   max {max(timings) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
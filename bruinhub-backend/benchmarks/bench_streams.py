@@ -0,0 +1,79 @@
+"""
+Stream benchmark: threads held and fan-out latency with many idle Server-Sent Event subscribers.
+
+Starts the evented stream server on a local port, seeds a cached gym snapshot and opens
+`--streams` connections that each read their opening snapshot and then sit idle. It reports the
+process's thread count with every stream open, then publishes a change and times how long it
+takes until every stream has received the delta. No database or network access is needed.
+
+Usage (from bruinhub-backend/):
+    python -m benchmarks.bench_streams --streams 2000 --port 5099
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import aiohttp
+
+from cache import event_broker, snapshot_store
+from streaming import StreamServer
+
+
+async def open_streams(url: str, count: int):
+    """Opens `count` streams and waits for each one's opening snapshot."""
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=0), timeout=aiohttp.ClientTimeout(total=None)
+    )
+    responses = []
+    for start in range(0, count, 200):
+        batch = await asyncio.gather(*(session.get(url) for _ in range(start, min(count, start + 200))))
+        await asyncio.gather(*(response.content.readuntil(b"\n\n") for response in batch))
+        responses.extend(batch)
+    return session, responses
+
+
+async def run(url: str, count: int):
+    threads_before = threading.active_count()
+    start = time.perf_counter()
+    session, responses = await open_streams(url, count)
+    opened = time.perf_counter() - start
+    threads_open = threading.active_count()
+
+    start = time.perf_counter()
+    await asyncio.to_thread(event_broker.publish, "gym", "bench", {"slug": "bench", "capacity": 2})
+    await asyncio.gather(*(response.content.readuntil(b"\n\n") for response in responses))
+    fan_out = time.perf_counter() - start
+
+    stats = event_broker.get_stats()
+    for response in responses:
+        response.close()
+    await session.close()
+    return opened, fan_out, threads_before, threads_open, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    snapshot_store.set("gym", "bench", {"slug": "bench", "capacity": 1})
+    event_broker.publish("gym", "bench", {"slug": "bench", "capacity": 1})
+    server = StreamServer(host="127.0.0.1", port=args.port)
+    server.start()
+    try:
+        url = f"http://127.0.0.1:{args.port}/api/v1/stream?slugs=bench"
+        opened, fan_out, threads_before, threads_open, stats = asyncio.run(run(url, args.streams))
+    finally:
+        server.close()
+
+    print(f"{args.streams} streams")
+    print(f"  open      {opened * 1000:8.1f} ms for all snapshots")
+    print(f"  threads   {threads_before} before, {threads_open} with every stream open")
+    print(f"  fan-out   {fan_out * 1000:8.1f} ms until every stream had the delta")
+    print(f"  broker    {stats['subscribers']} subscribers, {stats['waiting']} waiting")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from .encoding import EncodedBody, encode_body, negotiate
+from .snapshots import Snapshot, SnapshotStore, project_snapshot
+from .events import Event, EventBroker
+from .hours_index import HoursIndex
+from .menu_index import MenuSearchIndex
+from config import SNAPSHOT_CACHE_MAX_ENTRIES, SNAPSHOT_CACHE_TTL, STREAM_REPLAY_EVENTS
+
+# Shared by the scrape tasks (writers) and the API routes (readers)
+snapshot_store = SnapshotStore(max_entries=SNAPSHOT_CACHE_MAX_ENTRIES, ttl=SNAPSHOT_CACHE_TTL)
+
+# Fed by the scrape tasks with snapshot deltas and read by the /v1/stream endpoint
+event_broker = EventBroker(max_events=STREAM_REPLAY_EVENTS)
+
+# Compiled opening hours, fed by the scrape tasks and read by /v1/open-now
+hours_index = HoursIndex()
+
+# Menu items of every dining hall, fed by the dining scrape task and read by /v1/dining/search
+menu_index = MenuSearchIndex()
@@ -0,0 +1,55 @@
+import gzip
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import brotli
+import orjson
+
+# Bodies are compressed once per change and served many times, so use the densest settings
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# Projections are encoded on the request that first asks for them, where quality 11 costs too much
+PROJECTION_BROTLI_QUALITY = 5
+
+# Preferred first when the client accepts several equally
+ENCODINGS = ("br", "gzip", "identity")
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A JSON response body serialized once, with its compressed variants."""
+    identity: bytes
+    gzip: bytes
+    br: bytes
+
+    def get(self, encoding: str) -> bytes:
+        return self.identity if encoding == "identity" else getattr(self, encoding)
+
+    def sizes(self) -> Dict[str, int]:
+        return {encoding: len(self.get(encoding)) for encoding in ENCODINGS}
+
+
+def encode_body(payload, brotli_quality: int = BROTLI_QUALITY) -> EncodedBody:
+    """Serializes a payload with orjson and compresses it with gzip and brotli."""
+    body = orjson.dumps(payload)
+    return EncodedBody(
+        identity=body,
+        # mtime=0 keeps the gzip bytes, and so the variant ETag, stable across rebuilds
+        gzip=gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+        br=brotli.compress(body, mode=brotli.MODE_TEXT, quality=brotli_quality),
+    )
+
+
+def negotiate(accept_encodings, body: EncodedBody) -> Tuple[str, bytes]:
+    """
+    Picks the encoding to send from a parsed Accept-Encoding header (`request.accept_encodings`).
+
+    Brotli is preferred over gzip at equal quality values, and a variant is only used if it is
+    actually smaller than the identity body.
+    """
+    best, best_quality = "identity", 0.0
+    for encoding in ("br", "gzip"):
+        quality = accept_encodings[encoding]
+        if quality > best_quality and len(body.get(encoding)) < len(body.identity):
+            best, best_quality = encoding, quality
+    return best, body.get(best)
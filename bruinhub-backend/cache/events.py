@@ -0,0 +1,175 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    """A change to one facility's snapshot, as published by a scrape."""
+    id: int
+    kind: str
+    slug: str
+    delta: Dict[str, Any]
+
+
+def compute_delta(previous: Optional[Dict], current: Dict) -> Dict[str, Any]:
+    """
+    Returns the top-level fields of `current` that differ from `previous`. Nested dicts (like a
+    gym's zones) only carry their changed entries, and removed entries are sent as None.
+    """
+    if previous is None:
+        return dict(current)
+
+    delta = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if value == old:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict):
+            changed = {name: entry for name, entry in value.items() if old.get(name) != entry}
+            changed.update({name: None for name in old.keys() - value.keys()})
+            delta[key] = changed
+        else:
+            delta[key] = value
+    return delta
+
+
+class EventBroker:
+    """Fans snapshot deltas out from the scrape tasks to every open stream.
+
+    Events go into one shared, bounded buffer instead of a queue per subscriber. A subscriber is a
+    coroutine on the stream server's event loop: it only remembers the id of the last event it
+    sent, and while it waits it holds a future registered under each facility it follows, so an
+    idle connection costs a future rather than a thread. A publish (from a scrape thread) wakes
+    only the futures of that facility, with one thread-safe callback per event loop. Waking reads
+    the buffer backwards from the newest event down to the subscriber's cursor, so the cost is the
+    events it missed, not the buffer size. A subscriber that falls more than `max_events` behind is
+    told to resync from fresh snapshots.
+    """
+
+    def __init__(self, max_events: int):
+        self._events: "deque[Event]" = deque(maxlen=max_events)
+        self._latest: Dict[Tuple[str, str], Dict] = {}  # (kind, slug) -> last published snapshot
+        self._lock = threading.Lock()
+        # (kind, slug) -> futures of the subscribers waiting on it
+        self._waiters: Dict[Tuple[str, str], Set[asyncio.Future]] = {}
+        # Ids start from the clock, so ids a client saw before a restart are never mistaken for new ones
+        first_id = int(time.time() * 1000)
+        self._ids = itertools.count(first_id)
+        self._last_id = first_id - 1
+        self._subscribers = 0
+        self._waiting = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, kind: str, slug: str, data: Dict) -> Optional[Event]:
+        """Publishes how a facility's snapshot changed, returning None if nothing did. Safe from any thread."""
+        with self._lock:
+            delta = compute_delta(self._latest.get((kind, slug)), data)
+            if not delta:
+                return None
+            self._latest[(kind, slug)] = data
+            event = Event(id=next(self._ids), kind=kind, slug=slug, delta=delta)
+            self._events.append(event)
+            self._last_id = event.id
+            by_loop: Dict[asyncio.AbstractEventLoop, List[asyncio.Future]] = {}
+            for waiter in self._waiters.get((kind, slug), ()):
+                by_loop.setdefault(waiter.get_loop(), []).append(waiter)
+        for loop, waiters in by_loop.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, waiters)
+        return event
+
+    def can_resume(self, after: int) -> bool:
+        """Whether every event after id `after` is still buffered, so a stream can pick up from it."""
+        with self._lock:
+            if after == self._last_id:
+                return True
+            return after < self._last_id and bool(self._events) and self._events[0].id <= after + 1
+
+    def _events_after(self, after: int, facilities: Set[Tuple[str, str]]) -> Optional[List[Event]]:
+        """
+        Returns the buffered events after id `after` about `facilities`, oldest first, or None if
+        some after `after` already left the buffer.
+        """
+        if self._events and self._events[0].id > after + 1:
+            return None
+        events = []
+        for event in reversed(self._events):
+            if event.id <= after:
+                break
+            if (event.kind, event.slug) in facilities:
+                events.append(event)
+        events.reverse()
+        return events
+
+    def get_events(self, after: int, facilities: Set[Tuple[str, str]]) -> Tuple[Optional[List[Event]], int]:
+        """
+        Returns the events about `facilities` after id `after` without waiting, and the id to read
+        after next time. The events are None if the caller must resync.
+        """
+        with self._lock:
+            return self._events_after(after, facilities), self._last_id
+
+    async def wait_for_events(
+        self, after: int, facilities: Set[Tuple[str, str]], timeout: float
+    ) -> Tuple[Optional[List[Event]], int]:
+        """
+        Waits up to `timeout` seconds for events about `facilities` after id `after`. Returns those
+        events (possibly none, once the timeout passes) and the id to wait after next time. The
+        events are None if some after `after` have already left the buffer, so the caller must resync.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        with self._lock:
+            events = self._events_after(after, facilities)
+            if events is None or events or timeout <= 0:
+                return events, self._last_id
+            for facility in facilities:
+                self._waiters.setdefault(facility, set()).add(waiter)
+            self._waiting += 1
+        try:
+            await asyncio.wait((waiter,), timeout=timeout)
+        finally:
+            with self._lock:
+                for facility in facilities:
+                    waiters = self._waiters[facility]
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[facility]
+                self._waiting -= 1
+        return self.get_events(after, facilities)
+
+    def subscribe(self):
+        """Counts an open stream; pair with `unsubscribe`."""
+        with self._lock:
+            self._subscribers += 1
+
+    def unsubscribe(self):
+        with self._lock:
+            self._subscribers -= 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns the number of open streams, waiting streams, buffered events and the last event id."""
+        with self._lock:
+            return {
+                "subscribers": self._subscribers,
+                "waiting": self._waiting,
+                "buffered": len(self._events),
+                "last_id": self._last_id,
+            }
+
+
+def _wake(waiters: List[asyncio.Future]):
+    """Resolves the futures of the subscribers a publish concerns, on their event loop."""
+    for waiter in waiters:
+        if not waiter.done():
+            waiter.set_result(None)
@@ -0,0 +1,89 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from hashing import content_hash
+from hours import CompiledHours, compile_hours
+
+logger = logging.getLogger(__name__)
+
+
+def hash_hours(hours: Dict) -> str:
+    """Returns the content hash of a facility's regular and special hours."""
+    return content_hash({"regular_hours": hours.get("regular_hours"), "special_hours": hours.get("special_hours")})
+
+
+class HoursIndex:
+    """Compiled opening hours of every facility, keyed by (kind, slug).
+
+    Hours are only recompiled when their content hash changes, so feeding the index every
+    snapshot a scrape refreshes is cheap, and "open now" queries never parse hours strings.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[str, CompiledHours]] = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.compilations = 0
+
+    def update(self, kind: str, slug: str, hours: Dict) -> bool:
+        """Stores a facility's hours (a dict with regular_hours and special_hours), returning whether they changed."""
+        digest = hash_hours(hours)
+        entry = self._entries.get((kind, slug))
+        if entry is not None and entry[0] == digest:
+            return False
+
+        compiled = compile_hours(hours)
+        with self._lock:
+            self._entries[(kind, slug)] = (digest, compiled)
+            self.compilations += 1
+        logger.info(f"Compiled hours for {kind} {slug}")
+        return True
+
+    def load(self, facilities: Iterable[Tuple[str, str, Dict]]):
+        """Stores the hours of every (kind, slug, hours) facility."""
+        with self._lock:
+            for kind, slug, hours in facilities:
+                self.update(kind, slug, hours)
+            self.loaded = True
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[Tuple[str, str, Dict]]]):
+        """Loads the hours with `loader` unless they already are."""
+        if self.loaded:
+            return
+        with self._lock:
+            if not self.loaded:
+                self.load(loader())
+
+    def get(self, kind: str, slug: str) -> Optional[CompiledHours]:
+        """Returns a facility's compiled hours, None if they were never stored."""
+        entry = self._entries.get((kind, slug))
+        return entry[1] if entry else None
+
+    def of_kind(self, kind: str) -> List[CompiledHours]:
+        """Returns the compiled hours of every facility of a kind."""
+        with self._lock:
+            return [compiled for (entry_kind, _), (_, compiled) in self._entries.items() if entry_kind == kind]
+
+    def is_open(self, kind: str, slug: str, at: datetime) -> Optional[bool]:
+        """Returns whether a facility is open at a time, None if its hours are unknown."""
+        compiled = self.get(kind, slug)
+        return compiled.is_open(at) if compiled else None
+
+    def open_at(self, at: datetime) -> Dict[str, Dict[str, Dict]]:
+        """
+        Returns whether each facility is open at `at`, and when that next changes.
+
+        The result maps kind -> slug -> {"open", "opens_at" or "closes_at"}.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+
+        result: Dict[str, Dict[str, Dict]] = {}
+        for (kind, slug), (_, compiled) in sorted(entries):
+            is_open = compiled.is_open(at)
+            change = compiled.next_change(at) if is_open is not None else None
+            status = {"open": is_open}
+            status["closes_at" if is_open else "opens_at"] = change.isoformat() if change else None
+            result.setdefault(kind, {})[slug] = status
+        return result
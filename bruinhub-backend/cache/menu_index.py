@@ -0,0 +1,198 @@
+import logging
+import re
+import threading
+import unicodedata
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from hashing import content_hash
+from dietary import classify
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MIN_FUZZY_LENGTH = 4  # Shorter tokens match too much with a typo allowed
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text, strips accents and splits it into alphanumeric tokens."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def deletes(token: str) -> Set[str]:
+    """Returns every string made by deleting one character of `token`."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """Returns whether `a` becomes `b` by one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:])
+
+
+class MenuSearchIndex:
+    """Inverted index over the menu items of every dining hall.
+
+    Each (hall, station, item) is an entry with an integer id. Postings map every token and every
+    token prefix to the entries holding it, and a SymSpell-style dictionary of one-character
+    deletions finds tokens one typo away, so a query is a few set lookups and intersections.
+    Each hall also keeps the dietary bits (see dietary.py) of its entries in an array, so menu
+    filters are two vectorized bitwise tests. A hall's entries are replaced only when its menu's
+    content hash changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[int, Tuple[str, str, str]] = {}  # id -> (slug, station, item)
+        self._entry_tokens: Dict[int, Set[str]] = {}
+        self._hall_entries: Dict[str, List[int]] = {}
+        self._hall_attributes: Dict[str, np.ndarray] = {}  # Dietary bits, aligned with _hall_entries
+        self._hall_hashes: Dict[str, str] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._deletes: Dict[str, Set[str]] = {}  # Token with one character deleted -> tokens
+        self._next_id = 0
+        self.loaded = False
+
+    def _add_token(self, token: str, entry_id: int):
+        postings = self._tokens.get(token)
+        if postings is None:
+            postings = self._tokens[token] = set()
+            for variant in deletes(token):
+                self._deletes.setdefault(variant, set()).add(token)
+        postings.add(entry_id)
+        for end in range(1, len(token) + 1):
+            self._prefixes.setdefault(token[:end], set()).add(entry_id)
+
+    def _remove_token(self, token: str, entry_id: int):
+        postings = self._tokens[token]
+        postings.discard(entry_id)
+        if not postings:
+            del self._tokens[token]
+            for variant in deletes(token):
+                self._deletes[variant].discard(token)
+                if not self._deletes[variant]:
+                    del self._deletes[variant]
+        for end in range(1, len(token) + 1):
+            prefix_postings = self._prefixes[token[:end]]
+            prefix_postings.discard(entry_id)
+            if not prefix_postings:
+                del self._prefixes[token[:end]]
+
+    def update(self, slug: str, menu: Dict[str, List[str]]) -> bool:
+        """Indexes a hall's menu (station -> items), returning whether it changed."""
+        digest = content_hash(menu or {})
+        if self._hall_hashes.get(slug) == digest:
+            return False
+
+        with self._lock:
+            for entry_id in self._hall_entries.pop(slug, []):
+                for token in self._entry_tokens.pop(entry_id):
+                    self._remove_token(token, entry_id)
+                del self._entries[entry_id]
+
+            entry_ids = []
+            for station, items in (menu or {}).items():
+                for item in items:
+                    entry_id, self._next_id = self._next_id, self._next_id + 1
+                    tokens = set(tokenize(item)) | set(tokenize(station))
+                    self._entries[entry_id] = (slug, station, item)
+                    self._entry_tokens[entry_id] = tokens
+                    for token in tokens:
+                        self._add_token(token, entry_id)
+                    entry_ids.append(entry_id)
+            self._hall_entries[slug] = entry_ids
+            self._hall_attributes[slug] = np.array(
+                [classify(self._entries[entry_id][2]) for entry_id in entry_ids], dtype=np.uint32
+            )
+            self._hall_hashes[slug] = digest
+        logger.info(f"Indexed {len(entry_ids)} menu items for {slug}")
+        return True
+
+    def load(self, menus: Dict[str, Dict[str, List[str]]]):
+        """Indexes the menu of every hall (slug -> menu)."""
+        with self._lock:
+            for slug, menu in menus.items():
+                self.update(slug, menu)
+            self.loaded = True
+
+    def ensure_loaded(self, loader: Callable[[], Dict[str, Dict[str, List[str]]]]):
+        """Loads the menus with `loader` unless they already are."""
+        if self.loaded:
+            return
+        with self._lock:
+            if not self.loaded:
+                self.load(loader())
+
+    def _match(self, token: str, fuzzy: bool) -> Tuple[Set[int], Set[int]]:
+        """Returns the entries whose tokens equal `token`, and those that start with it or are one typo away."""
+        exact = self._tokens.get(token, set())
+        partial = set(self._prefixes.get(token, ()))
+        if fuzzy and len(token) >= MIN_FUZZY_LENGTH:
+            candidates = set(self._deletes.get(token, ()))
+            for variant in deletes(token):
+                candidates |= self._deletes.get(variant, set())
+                if variant in self._tokens:
+                    candidates.add(variant)
+            for candidate in candidates:
+                if within_one_edit(token, candidate):
+                    partial |= self._tokens[candidate]
+        return exact, partial
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = False) -> List[Dict[str, str]]:
+        """
+        Returns the items matching every token of `query`, as exact tokens, prefixes or (if `fuzzy`)
+        with one typo. Items matching more tokens exactly come first, then shorter names.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            matches = None
+            exact_counts: Dict[int, int] = {}
+            for token in tokens:
+                exact, partial = self._match(token, fuzzy)
+                matches = partial if matches is None else matches & partial
+                if not matches:
+                    return []
+                for entry_id in exact & matches:
+                    exact_counts[entry_id] = exact_counts.get(entry_id, 0) + 1
+            entries = [(entry_id, self._entries[entry_id]) for entry_id in matches]
+
+        entries.sort(key=lambda entry: (-exact_counts.get(entry[0], 0), len(entry[1][2]), entry[1]))
+        return [{"slug": slug, "station": station, "item": item} for _, (slug, station, item) in entries[:limit]]
+
+    def filter_menu(self, slug: str, required: int = 0) -> Optional[Dict[str, List[str]]]:
+        """
+        Returns a hall's menu (station -> items) keeping only items with every `required` bit.
+        Stations left empty are dropped. None if the hall is not indexed.
+        """
+        with self._lock:
+            entry_ids = self._hall_entries.get(slug)
+            if entry_ids is None:
+                return None
+            bits = self._hall_attributes[slug]
+            kept = np.flatnonzero((bits & required) == required)
+            menu: Dict[str, List[str]] = {}
+            for position in kept:
+                _, station, item = self._entries[entry_ids[position]]
+                menu.setdefault(station, []).append(item)
+            return menu
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns how many halls, items and distinct tokens are indexed."""
+        with self._lock:
+            return {"halls": len(self._hall_entries), "items": len(self._entries), "tokens": len(self._tokens)}
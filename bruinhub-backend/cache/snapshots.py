@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from hashing import content_hash
+from cache.encoding import BROTLI_QUALITY, PROJECTION_BROTLI_QUALITY, EncodedBody, encode_body
+from fields import Fieldset, fieldset_key, project
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Snapshot:
+    """The latest data for a facility along with its HTTP validators."""
+    data: Dict
+    etag: str  # Content hash of `data`, unquoted
+    last_modified: datetime  # When this content was first stored
+    stored_at: datetime  # When this snapshot was (re)loaded
+    body: EncodedBody  # The serialized {"data", "timestamp"} response, see `encode_snapshot`
+    # Fieldset key -> projection of this content, see `project_snapshot`
+    projections: Dict[str, "Snapshot"] = field(default_factory=dict, repr=False)
+
+
+# Distinct fieldsets kept per snapshot, so clients cannot grow one without bound
+MAX_PROJECTIONS = 32
+
+
+def compute_etag(data: Dict) -> str:
+    """Returns a stable content hash of a snapshot payload."""
+    return content_hash(data)[:32]
+
+
+def encode_snapshot(data: Dict, last_modified: datetime, brotli_quality: int = BROTLI_QUALITY) -> EncodedBody:
+    """
+    Encodes the {"data", "timestamp"} response body of a snapshot. The timestamp is when the content
+    was first stored (`last_modified`, in local time like other responses), not when the body was
+    built, so a cached body and its projections always agree on it.
+    """
+    timestamp = last_modified.astimezone().replace(tzinfo=None).isoformat()
+    return encode_body({"data": data, "timestamp": timestamp}, brotli_quality)
+
+
+def project_snapshot(snapshot: Snapshot, fieldset: Fieldset) -> Snapshot:
+    """
+    Returns a snapshot holding only some fields of `snapshot`. Its ETag is derived from the
+    snapshot's ETag and the fieldset, and its body is encoded once per content and fieldset, with a
+    faster brotli quality since that happens on a request.
+    """
+    key = fieldset_key(fieldset)
+    projected = snapshot.projections.get(key)
+    if projected is None:
+        data = project(snapshot.data, fieldset)
+        projected = Snapshot(
+            data=data,
+            etag=content_hash([snapshot.etag, key])[:32],
+            last_modified=snapshot.last_modified,
+            stored_at=snapshot.stored_at,
+            body=encode_snapshot(data, snapshot.last_modified, PROJECTION_BROTLI_QUALITY),
+        )
+        if len(snapshot.projections) < MAX_PROJECTIONS:
+            snapshot.projections[key] = projected
+    return projected
+
+
+class SnapshotStore:
+    """Process-local, size-bounded store of the latest facility snapshots.
+
+    Entries are keyed by (kind, slug), e.g. ("gym", "bfit"). The least recently
+    used entry is evicted once `max_entries` is reached, and entries older than
+    `ttl` seconds are treated as missing so readers fall back to the database.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Snapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, kind: str, slug: str) -> Optional[Snapshot]:
+        """Returns the cached snapshot, or None if it is missing or expired."""
+        key = (kind, slug)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            stored_at, snapshot = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return snapshot
+
+    def set(self, kind: str, slug: str, data: Dict) -> Snapshot:
+        """Stores the latest snapshot for a facility, evicting the oldest entries if full."""
+        key = (kind, slug)
+        etag = compute_etag(data)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            previous = self._entries.get(key)
+        # Unchanged content keeps its original Last-Modified, response body and projections
+        if previous and previous[1].etag == etag:
+            last_modified, body, projections = previous[1].last_modified, previous[1].body, previous[1].projections
+        else:
+            last_modified = now
+            body = encode_snapshot(data, last_modified)
+            projections = {}
+
+        snapshot = Snapshot(
+            data=data, etag=etag, last_modified=last_modified, stored_at=now, body=body, projections=projections
+        )
+        with self._lock:
+            self._entries[key] = (time.monotonic(), snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicted snapshot {evicted}")
+        return snapshot
+
+    def invalidate(self, kind: str, slug: str):
+        """Drops the snapshot for a facility."""
+        with self._lock:
+            self._entries.pop((kind, slug), None)
+
+    def clear(self):
+        """Drops every snapshot."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the current number of entries."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
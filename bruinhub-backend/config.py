@@ -6,6 +6,46 @@ load_dotenv()
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Connection pool configuration
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))  # Close idle connections after 5 minutes
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))  # Recycle connections every hour
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Max wait for a free connection
+
+# Scraping and caching configuration
+SCRAPE_INTERVAL = int(os.getenv("SCRAPE_INTERVAL", "300"))  # Default 5 minutes
+SCRAPE_MIN_INTERVAL = int(os.getenv("SCRAPE_MIN_INTERVAL", "60"))
+SCRAPE_MAX_INTERVAL = int(os.getenv("SCRAPE_MAX_INTERVAL", "900"))  # Slowest polling while open
+SCRAPE_PEAK_INTERVAL = int(os.getenv("SCRAPE_PEAK_INTERVAL", "120"))
+SCRAPE_PEAK_HOURS = os.getenv("SCRAPE_PEAK_HOURS", "11-14,16-21")  # Local hour ranges
+SCRAPE_CLOSED_MAX_INTERVAL = int(os.getenv("SCRAPE_CLOSED_MAX_INTERVAL", "21600"))  # Longest sleep while closed
+SCRAPE_JITTER = float(os.getenv("SCRAPE_JITTER", "15"))  # Max random delay added to each run
+SNAPSHOT_CACHE_TTL = float(os.getenv("SNAPSHOT_CACHE_TTL", str(2 * SCRAPE_INTERVAL)))
+SNAPSHOT_CACHE_MAX_ENTRIES = int(os.getenv("SNAPSHOT_CACHE_MAX_ENTRIES", "256"))
+STREAM_REPLAY_EVENTS = int(os.getenv("STREAM_REPLAY_EVENTS", "1024"))  # Events kept for streams to catch up on
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv("STREAM_HEARTBEAT_INTERVAL", "15"))  # Seconds between keep-alives
+STREAM_HOST = os.getenv("STREAM_HOST", "0.0.0.0")
+STREAM_PORT = int(os.getenv("STREAM_PORT", "5002"))  # The evented server serving /api/v1/stream
+
+# Capacity history compaction (rollups and retention, 0 days keeps rows forever)
+COMPACTION_INTERVAL = int(os.getenv("COMPACTION_INTERVAL", "3600"))
+CAPACITY_RAW_RETENTION_DAYS = int(os.getenv("CAPACITY_RAW_RETENTION_DAYS", "30"))
+CAPACITY_HOURLY_RETENTION_DAYS = int(os.getenv("CAPACITY_HOURLY_RETENTION_DAYS", "365"))
+CAPACITY_PARTITION_MONTHS_AHEAD = int(os.getenv("CAPACITY_PARTITION_MONTHS_AHEAD", "3"))  # Monthly raw partitions created ahead
+
+# Occupancy forecasts (models are refitted offline every FORECAST_FIT_INTERVAL seconds)
+FORECAST_FIT_INTERVAL = int(os.getenv("FORECAST_FIT_INTERVAL", "86400"))
+FORECAST_MAX_HOURS = int(os.getenv("FORECAST_MAX_HOURS", "12"))
+
+# Menu search
+MENU_SEARCH_MAX_RESULTS = int(os.getenv("MENU_SEARCH_MAX_RESULTS", "100"))
+
+# Upstream HTTP configuration for the scrapers
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "10"))  # Total seconds per request
+SCRAPE_CONNECT_TIMEOUT = float(os.getenv("SCRAPE_CONNECT_TIMEOUT", "5"))
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "8"))  # In-flight requests across all sources
+
 # Facility IDs for UCLA Recreation API
 FACILITY_IDS = {
     'bfit': 803,
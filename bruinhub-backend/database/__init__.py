@@ -1 +1,3 @@
 from .manager import DatabaseManager
+from .layer import DatabaseLayer, get_db_layer, init_db_layer
+from .rollups import InvalidBucketError
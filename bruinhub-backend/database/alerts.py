@@ -0,0 +1,115 @@
+from typing import List, Optional, Tuple
+import logging
+from datetime import datetime
+from models.alerts import Alert, AlertNotification
+from database.manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+ALERT_COLUMNS = "id, subscriber, kind, slug, condition, zone_name, threshold, created_at, last_triggered_at"
+
+
+def _to_alert(row: Tuple) -> Alert:
+    return Alert(
+        id=row[0],
+        subscriber=row[1],
+        kind=row[2],
+        slug=row[3],
+        condition=row[4],
+        zone_name=row[5],
+        threshold=row[6],
+        created_at=row[7],
+        last_triggered_at=row[8],
+    )
+
+
+class AlertDatabase:
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+        logger.info("Initialized AlertDatabase")
+
+    def create_alert(
+        self,
+        subscriber: str,
+        kind: str,
+        slug: str,
+        condition: str,
+        zone_name: Optional[str] = None,
+        threshold: Optional[int] = None,
+    ) -> Optional[Alert]:
+        """Registers an alert, returning it with its id, or None if it could not be saved."""
+        query = f"""
+            INSERT INTO alerts (subscriber, kind, slug, condition, zone_name, threshold)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            RETURNING {ALERT_COLUMNS}
+        """
+        try:
+            with self.db.transaction() as cur:
+                cur.execute(query, (subscriber, kind, slug, condition, zone_name, threshold))
+                return _to_alert(cur.fetchone())
+        except Exception as e:
+            logger.error(f"Error creating alert for {subscriber}: {e}", exc_info=True)
+            return None
+
+    def get_alerts(self) -> List[Alert]:
+        """Returns every registered alert."""
+        return [_to_alert(row) for row in self.db.fetch_all(f"SELECT {ALERT_COLUMNS} FROM alerts")]
+
+    def get_subscriber_alerts(self, subscriber: str) -> List[Alert]:
+        """Returns a subscriber's alerts, oldest first."""
+        query = f"SELECT {ALERT_COLUMNS} FROM alerts WHERE subscriber = %s ORDER BY id"
+        return [_to_alert(row) for row in self.db.fetch_all(query, (subscriber,))]
+
+    def delete_alert(self, alert_id: int, subscriber: str) -> bool:
+        """Deletes one of a subscriber's alerts, returning whether it existed."""
+        try:
+            with self.db.transaction() as cur:
+                cur.execute("DELETE FROM alerts WHERE id = %s AND subscriber = %s", (alert_id, subscriber))
+                return cur.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error deleting alert {alert_id}: {e}", exc_info=True)
+            return False
+
+    def record_notifications(self, notifications: List[Tuple[int, str, Optional[int]]], triggered_at: datetime) -> int:
+        """
+        Saves fired alerts ((alert_id, message, value) tuples) in one transaction.
+
+        Alerts deleted since they were loaded are skipped. Returns how many notifications were saved.
+        """
+        if not notifications:
+            return 0
+        alert_ids, messages, values = (list(column) for column in zip(*notifications))
+        insert_query = """
+            INSERT INTO alert_notifications (alert_id, message, value, triggered_at)
+            SELECT n.alert_id, n.message, n.value, %(triggered_at)s
+            FROM unnest(%(alert_ids)s::int[], %(messages)s::text[], %(values)s::int[]) AS n(alert_id, message, value)
+            JOIN alerts a ON a.id = n.alert_id
+        """
+        update_query = "UPDATE alerts SET last_triggered_at = %(triggered_at)s WHERE id = ANY(%(alert_ids)s)"
+        params = {"alert_ids": alert_ids, "messages": messages, "values": values, "triggered_at": triggered_at}
+        try:
+            with self.db.transaction() as cur:
+                cur.execute(insert_query, params)
+                saved = cur.rowcount
+                cur.execute(update_query, params)
+        except Exception as e:
+            logger.error(f"Error recording {len(notifications)} alert notifications: {e}", exc_info=True)
+            return 0
+
+        logger.info(f"Recorded {saved} alert notifications")
+        return saved
+
+    def get_notifications(self, subscriber: str, after: int = 0, limit: int = 100) -> List[AlertNotification]:
+        """Returns a subscriber's notifications with an id above `after`, oldest first."""
+        query = """
+            SELECT n.id, n.alert_id, n.message, n.value, n.triggered_at
+            FROM alert_notifications n
+            JOIN alerts a ON a.id = n.alert_id
+            WHERE a.subscriber = %s AND n.id > %s
+            ORDER BY n.id
+            LIMIT %s
+        """
+        return [
+            AlertNotification(id=row[0], alert_id=row[1], message=row[2], value=row[3], triggered_at=row[4])
+            for row in self.db.fetch_all(query, (subscriber, after, limit))
+        ]
@@ -1,16 +1,45 @@
 import logging
 import json
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from psycopg.types.json import Jsonb
 from models.dining import DiningHall, DiningCapacityHistory
+from models.ingest import IngestStats, CompactionStats
+from hashing import content_hash
 from database.manager import DatabaseManager
+from database.rollups import (
+    HOUR, DAY, RAW_RETENTION, HOURLY_RETENTION, plan_history_sources, get_rollup_watermarks, run_rollup,
+    get_expiry_cutoff, expiry_cutoff, check_bucket,
+)
+from database.partitions import ensure_partitions, drop_partitions_before
+from database.menu_history import record_menu_days, decode_menu
+from fields import Fieldset
 
 logger = logging.getLogger(__name__)
 
 class DiningDatabase:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
+        self._hall_ids: Dict[str, int] = {}  # slug -> id, halls are never renumbered
+        self._content_hashes: Dict[int, str] = {}  # id -> hash of the last written menu and hours
+        self._menu_days: Dict[int, Tuple[date, str]] = {}  # id -> (date, menu hash) last recorded in the history
+        self._menu_item_ids: Dict[str, int] = {}  # Interned menu item name -> id
         logger.info("Initialized DiningDatabase")
 
+    def get_dining_hall_id(self, slug: str) -> Optional[int]:
+        """Resolves a dining hall slug to its id, hitting the database only on the first lookup."""
+        hall_id = self._hall_ids.get(slug)
+        if hall_id is not None:
+            return hall_id
+
+        row = self.db_manager.fetch_one("SELECT id FROM dining_halls WHERE slug = %s", (slug,))
+        if row:
+            self._hall_ids[slug] = row[0]
+            return row[0]
+
+        logger.warning(f"No dining hall found with slug: {slug}")
+        return None
+
     def get_dining_hall_by_slug(self, slug: str) -> Optional[DiningHall]:
         """Get dining hall information by slug."""
         logger.info(f"Getting dining hall info for slug: {slug}")
@@ -23,6 +52,7 @@ class DiningDatabase:
         row = self.db_manager.fetch_one(query, (slug,))
         
         if row:
+            self._hall_ids[row[1]] = row[0]
             return DiningHall(
                 id=row[0],
                 slug=row[1],
@@ -35,63 +65,223 @@ class DiningDatabase:
         logger.warning(f"No dining hall found with slug: {slug}")
         return None
 
+    @staticmethod
+    def hash_hall_content(
+        menu: Dict[str, list], regular_hours: Dict[str, str], special_hours: Optional[Dict[str, str]]
+    ) -> str:
+        """Returns the content hash of a hall's menu and hours."""
+        return content_hash(
+            {"menu": menu, "regular_hours": regular_hours, "special_hours": special_hours or None}
+        )
+
     def update_dining_hall(
         self, slug: str, menu: Dict[str, list], regular_hours: Dict[str, str], special_hours: Optional[Dict[str, str]] = None
     ) -> bool:
-        """Updates a dining hall's menu and hours."""
-        hall = self.get_dining_hall_by_slug(slug)
-        if not hall:
+        """Updates a dining hall's menu and hours, skipping the write if they have not changed."""
+        hall_id = self.get_dining_hall_id(slug)
+        if hall_id is None:
             logger.error(f"No dining hall found with slug {slug}")
             return False
 
+        new_hash = self.hash_hall_content(menu, regular_hours, special_hours)
+        if self._content_hashes.get(hall_id) == new_hash:
+            logger.info(f"Dining hall {slug} unchanged, skipping write")
+            return True
+
         update_query = """
             UPDATE dining_halls
-            SET menu = %s, regular_hours = %s, special_hours = %s, last_updated = NOW()
-            WHERE id = %s
+            SET menu = %s, regular_hours = %s, special_hours = %s, content_hash = %s, last_updated = NOW()
+            WHERE id = %s AND content_hash IS DISTINCT FROM %s
         """
-        params = (json.dumps(menu), json.dumps(regular_hours), json.dumps(special_hours) if special_hours else None, hall.id)
-        
-        self.db_manager.execute(update_query, params)
-        logger.info(f"Successfully updated dining hall {slug}")
+        params = (
+            json.dumps(menu),
+            json.dumps(regular_hours),
+            json.dumps(special_hours) if special_hours else None,
+            new_hash,
+            hall_id,
+            new_hash,
+        )
+
+        try:
+            with self.db_manager.transaction() as cur:
+                cur.execute(update_query, params)
+                updated = cur.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error updating dining hall {slug}: {e}", exc_info=True)
+            return False
+
+        self._content_hashes[hall_id] = new_hash
+        logger.info(f"{'Updated' if updated else 'Unchanged'} dining hall {slug}")
         return True
 
+    # Extends each hall's latest interval when its capacity is unchanged, otherwise opens a new one
+    APPEND_CAPACITIES_QUERY = """
+        WITH incoming AS (
+            SELECT * FROM unnest(%s::int[], %s::int[]) AS t(hall_id, capacity)
+        ),
+        latest AS (
+            SELECT l.*
+            FROM incoming i
+            CROSS JOIN LATERAL (
+                SELECT h.id, h.hall_id, h.capacity, h.valid_from
+                FROM dining_capacity_history h
+                WHERE h.hall_id = i.hall_id
+                ORDER BY h.valid_from DESC
+                LIMIT 1
+            ) l
+        ),
+        extended AS (
+            UPDATE dining_capacity_history h
+            SET last_updated = NOW()
+            FROM latest l
+            JOIN incoming i ON i.hall_id = l.hall_id
+            WHERE h.id = l.id AND h.valid_from = l.valid_from AND l.capacity = i.capacity
+            RETURNING h.hall_id
+        )
+        INSERT INTO dining_capacity_history (hall_id, capacity, valid_from, last_updated)
+        SELECT i.hall_id, i.capacity, NOW(), NOW()
+        FROM incoming i
+        WHERE i.hall_id NOT IN (SELECT hall_id FROM extended)
+        RETURNING id
+    """
+
     def insert_dining_capacity(self, slug: str, capacity: int) -> bool:
-        """Inserts a capacity record for a dining hall."""
-        hall = self.get_dining_hall_by_slug(slug)
-        if not hall:
+        """Records a capacity observation, extending the current interval if the value is unchanged."""
+        hall_id = self.get_dining_hall_id(slug)
+        if hall_id is None:
             logger.error(f"No dining hall found with slug {slug}")
             return False
 
-        insert_query = """
-            INSERT INTO dining_capacity_history (hall_id, capacity, last_updated)
-            VALUES (%s, %s, NOW())
-            RETURNING id
-        """
-        params = (hall.id, capacity)
-        
-        capacity_id = self.db_manager.fetch_one(insert_query, params)
+        try:
+            with self.db_manager.transaction() as cur:
+                cur.execute(self.APPEND_CAPACITIES_QUERY, ([hall_id], [capacity]))
+                capacity_id = cur.fetchone()
+        except Exception as e:
+            logger.error(f"Failed to insert dining capacity for {slug}: {e}", exc_info=True)
+            return False
+
         if capacity_id:
-            logger.info(f"Inserted dining capacity entry with ID: {capacity_id[0]}")
-            return True
+            logger.info(f"Inserted dining capacity interval with ID: {capacity_id[0]}")
+        else:
+            logger.info(f"Extended current dining capacity interval for {slug}")
+        return True
 
-        logger.error("Failed to insert dining capacity")
-        return False
+    def ingest_dining_halls(self, dining_data: Dict[str, Dict]) -> IngestStats:
+        """
+        Writes a whole dining scrape (menus, hours and capacities) in a single transaction.
+
+        Menus and hours are only rewritten for halls whose content hash changed, and a capacity
+        equal to the hall's current one extends its interval instead of adding a row.
+        """
+        stats = IngestStats()
+        hall_ids, capacities, hashes = [], [], {}
+        changed_ids, menus, regular_hours, special_hours, changed_hashes = [], [], [], [], []
+        today = date.today()
+        menu_days, day_menus = {}, {}
+        for slug, hall_info in dining_data.items():
+            hall_id = self.get_dining_hall_id(slug)
+            if hall_id is None:
+                logger.error(f"No dining hall found with slug {slug}")
+                stats.failed += 1
+                continue
+
+            hall_ids.append(hall_id)
+            capacities.append(hall_info["capacity"])
+
+            # Each day's menu is recorded once, even when it is the same as the day before
+            menu_day = (today, content_hash(hall_info["menu"]))
+            if self._menu_days.get(hall_id) != menu_day:
+                menu_days[hall_id] = menu_day
+                day_menus[hall_id] = hall_info["menu"]
+
+            new_hash = self.hash_hall_content(
+                hall_info["menu"], hall_info["regular_hours"], hall_info.get("special_hours")
+            )
+            hashes[hall_id] = new_hash
+            if self._content_hashes.get(hall_id) == new_hash:
+                stats.unchanged += 1
+                continue
+
+            changed_ids.append(hall_id)
+            menus.append(Jsonb(hall_info["menu"]))
+            regular_hours.append(Jsonb(hall_info["regular_hours"]))
+            special_hours.append(Jsonb(hall_info["special_hours"]) if hall_info.get("special_hours") else None)
+            changed_hashes.append(new_hash)
+
+        if not hall_ids:
+            return stats
+
+        # The hash check also covers a cold in-memory cache, using the persisted column
+        update_query = """
+            UPDATE dining_halls d
+            SET menu = u.menu, regular_hours = u.regular_hours, special_hours = u.special_hours,
+                content_hash = u.content_hash, last_updated = NOW()
+            FROM unnest(%s::int[], %s::jsonb[], %s::jsonb[], %s::jsonb[], %s::varchar[])
+                AS u(id, menu, regular_hours, special_hours, content_hash)
+            WHERE d.id = u.id AND d.content_hash IS DISTINCT FROM u.content_hash
+            RETURNING d.id
+        """
+        try:
+            with self.db_manager.transaction() as cur:
+                if changed_ids:
+                    cur.execute(update_query, (changed_ids, menus, regular_hours, special_hours, changed_hashes))
+                    stats.updated = len(cur.fetchall())
+                    stats.unchanged += len(changed_ids) - stats.updated
+                cur.execute(self.APPEND_CAPACITIES_QUERY, (hall_ids, capacities))
+                stats.inserted = len(cur.fetchall())
+                recorded_days, interned = self.record_menu_history(cur, day_menus, today)
+        except Exception as e:
+            logger.error(f"Error ingesting dining halls: {e}", exc_info=True)
+            stats.failed += len(hall_ids)
+            stats.updated = stats.unchanged = 0
+            return stats
+
+        self._content_hashes.update(hashes)
+        if recorded_days is not None:
+            self._menu_days.update(menu_days)
+            self._menu_item_ids.update(interned)
+        stats.skipped = len(hall_ids) - stats.inserted  # Capacity unchanged, interval extended
+        logger.info(
+            f"Updated {stats.updated} dining halls ({stats.unchanged} unchanged), "
+            f"opened {stats.inserted} capacity intervals, extended {stats.skipped}"
+        )
+        return stats
+
+    def record_menu_history(
+        self, cur, menus: Dict[int, Dict[str, list]], menu_date: date
+    ) -> Tuple[Optional[int], Dict[str, int]]:
+        """
+        Appends the menus of several halls (id -> menu) to the menu history inside the caller's transaction.
+
+        Runs under a savepoint, so a failure only loses the history. Returns the number of day rows
+        added (None on failure) and the item names interned for the first time.
+        """
+        if not menus:
+            return 0, {}
+        try:
+            with cur.connection.transaction():
+                recorded, interned = record_menu_days(cur, menus, menu_date, self._menu_item_ids)
+        except Exception as e:
+            logger.error(f"Error recording menu history: {e}", exc_info=True)
+            return None, {}
+        logger.info(f"Recorded {recorded} dining hall menu days, interned {len(interned)} new items")
+        return recorded, interned
 
     def get_latest_dining_capacity(self, slug: str) -> Optional[DiningCapacityHistory]:
         """Retrieves the most recent capacity data for a dining hall."""
-        hall = self.get_dining_hall_by_slug(slug)
-        if not hall:
+        hall_id = self.get_dining_hall_id(slug)
+        if hall_id is None:
             logger.error(f"No dining hall found with slug {slug}")
             return None
 
         query = """
-            SELECT id, hall_id, capacity, last_updated
+            SELECT id, hall_id, capacity, last_updated, valid_from
             FROM dining_capacity_history
             WHERE hall_id = %s
-            ORDER BY last_updated DESC
+            ORDER BY valid_from DESC
             LIMIT 1
         """
-        row = self.db_manager.fetch_one(query, (hall.id,))
+        row = self.db_manager.fetch_one(query, (hall_id,))
         
         if row:
             return DiningCapacityHistory(
@@ -99,23 +289,420 @@ class DiningDatabase:
                 hall_id=row[1],
                 capacity=row[2],
                 last_updated=row[3],
+                valid_from=row[4],
             )
 
         logger.warning(f"No capacity data found for dining hall: {slug}")
         return None
 
+    # Expands the intervals overlapping segment {n} into per-bucket pieces clipped to the segment
+    RAW_HISTORY_SEGMENT = """
+        (WITH intervals AS (
+            SELECT capacity, valid_from,
+                   COALESCE(LEAD(valid_from) OVER (ORDER BY valid_from), last_updated) AS valid_to
+            FROM dining_capacity_history
+            WHERE hall_id = %(hall_id)s
+              AND valid_from >= COALESCE(
+                  (SELECT MAX(valid_from) FROM dining_capacity_history
+                   WHERE hall_id = %(hall_id)s AND valid_from <= %(from_{n})s),
+                  '-infinity'
+              )
+              AND valid_from <= COALESCE(
+                  (SELECT MIN(valid_from) FROM dining_capacity_history
+                   WHERE hall_id = %(hall_id)s AND valid_from >= %(to_{n})s),
+                  'infinity'
+              )
+        ),
+        buckets AS (
+            SELECT generate_series(
+                date_bin(%(bucket)s::interval, %(from_{n})s::timestamp, TIMESTAMP '2000-01-01'),
+                %(to_{n})s::timestamp,
+                %(bucket)s::interval
+            ) AS bucket
+        )
+        SELECT pieces.ts,
+               (i.capacity * pieces.seconds)::float AS weighted_capacity,
+               pieces.seconds::float AS seconds,
+               i.capacity AS min_capacity, i.capacity AS max_capacity,
+               (i.valid_from >= pieces.ts)::int AS started,
+               i.valid_from < pieces.ts AS carried_in
+        FROM buckets b
+        CROSS JOIN LATERAL (SELECT GREATEST(b.bucket, %(from_{n})s) AS ts) piece_start
+        JOIN intervals i
+          ON i.valid_from < LEAST(b.bucket + %(bucket)s::interval, %(to_{n})s)
+         AND (i.valid_to > piece_start.ts OR (i.valid_from = i.valid_to AND i.valid_from >= piece_start.ts))
+        CROSS JOIN LATERAL (
+            SELECT piece_start.ts,
+                   GREATEST(EXTRACT(EPOCH FROM LEAST(i.valid_to, b.bucket + %(bucket)s::interval, %(to_{n})s)
+                                             - GREATEST(i.valid_from, piece_start.ts)), 0) AS seconds
+        ) pieces
+        WHERE b.bucket < %(to_{n})s)
+    """
+
+    def get_dining_capacity_history(
+        self,
+        slug: str,
+        start: datetime,
+        end: datetime,
+        bucket: timedelta,
+        limit: int,
+        after: Optional[datetime] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Aggregates dining hall capacity into fixed-size time buckets (avg/min/max per bucket).
+
+        Stored intervals are expanded on demand: each value holds until the next interval starts,
+        and the bucket average is weighted by how long each value held within the bucket. Finished
+        hours and days are read from the hourly and daily rollups when they divide the bucket size.
+        Results are ordered by bucket. Pass the last bucket of a page as `after` to fetch the next page.
+        Raises InvalidBucketError if the bucket is finer than what is still kept from `start` on.
+        """
+        hall_id = self.get_dining_hall_id(slug)
+        if hall_id is None:
+            return None
+
+        # Buckets are aligned, so the next page starts at the bucket after the cursor
+        if after is not None:
+            start = max(start, after + bucket)
+
+        watermarks = get_rollup_watermarks(self.db_manager, ["dining_daily", "dining_hourly"])
+        check_bucket(start, bucket, [
+            ("raw", None, expiry_cutoff(watermarks.get("dining_hourly"), RAW_RETENTION, HOUR)),
+            ("hourly", HOUR, expiry_cutoff(watermarks.get("dining_daily"), HOURLY_RETENTION, DAY)),
+            ("daily", DAY, None),
+        ])
+        segments = plan_history_sources(
+            start, end, bucket,
+            [("daily", DAY, watermarks.get("dining_daily")), ("hourly", HOUR, watermarks.get("dining_hourly"))],
+        )
+
+        # Every segment yields partial time-weighted sums that are merged into the requested buckets
+        selects = []
+        params = {"hall_id": hall_id, "bucket": bucket, "limit": limit}
+        for n, (source, seg_start, seg_end) in enumerate(segments):
+            if source == "raw":
+                selects.append(self.RAW_HISTORY_SEGMENT.format(n=n))
+            else:
+                selects.append(f"""
+                    SELECT bucket AS ts, weighted_capacity, seconds, min_capacity, max_capacity, started, carried_in
+                    FROM dining_capacity_{source}
+                    WHERE hall_id = %(hall_id)s AND bucket >= %(from_{n})s AND bucket < %(to_{n})s
+                """)
+            params[f"from_{n}"], params[f"to_{n}"] = seg_start, seg_end
+        if not selects:
+            return []
+
+        query = f"""
+            SELECT date_bin(%(bucket)s::interval, ts, TIMESTAMP '2000-01-01') AS bucket,
+                   COALESCE(SUM(weighted_capacity) / NULLIF(SUM(seconds), 0),
+                            AVG((min_capacity + max_capacity) / 2.0))::float,
+                   MIN(min_capacity), MAX(max_capacity),
+                   -- Intervals starting in the bucket, plus the one already holding at its start
+                   SUM(started) + COALESCE((ARRAY_AGG(carried_in ORDER BY ts, carried_in DESC))[1]::int, 0)
+            FROM ({" UNION ALL ".join(selects)}) sources
+            GROUP BY 1
+            ORDER BY 1
+            LIMIT %(limit)s
+        """
+        rows = self.db_manager.fetch_all(query, params)
+        return [
+            {
+                "bucket": row[0].isoformat(),
+                "capacity": {"avg": round(row[1], 2), "min": row[2], "max": row[3]},
+                "intervals": row[4],
+            }
+            for row in rows
+        ]
+
+    # Splits the capacity intervals holding in [%(since)s, %(until)s) into per-hour pieces
+    HOURLY_PIECES = """
+        WITH intervals AS (
+            SELECT hall_id, capacity, valid_from,
+                   COALESCE(LEAD(valid_from) OVER (PARTITION BY hall_id ORDER BY valid_from), last_updated) AS valid_to
+            FROM dining_capacity_history h
+            WHERE valid_from >= COALESCE(
+                (SELECT MAX(valid_from) FROM dining_capacity_history p
+                 WHERE p.hall_id = h.hall_id AND p.valid_from <= %(since)s::timestamp),
+                '-infinity'
+            )
+        ),
+        pieces AS (
+            SELECT i.hall_id, i.capacity, i.valid_from, hour AS bucket,
+                   GREATEST(EXTRACT(EPOCH FROM LEAST(i.valid_to, hour + INTERVAL '1 hour', %(until)s)
+                                            - GREATEST(i.valid_from, hour)), 0)::float AS seconds
+            FROM intervals i
+            CROSS JOIN LATERAL generate_series(
+                date_trunc('hour', GREATEST(i.valid_from, COALESCE(%(since)s::timestamp, '-infinity'))),
+                LEAST(i.valid_to, %(until)s),
+                INTERVAL '1 hour'
+            ) AS hour
+            WHERE hour < %(until)s AND (hour < i.valid_to OR i.valid_from = i.valid_to)
+        )
+    """
+
+    # Upserts finished hours of the capacity intervals, weighting each value by the seconds it held
+    HOURLY_ROLLUP_QUERY = HOURLY_PIECES + """
+        INSERT INTO dining_capacity_hourly (
+            hall_id, bucket, seconds, weighted_capacity, min_capacity, max_capacity, started, carried_in
+        )
+        SELECT hall_id, bucket, SUM(seconds), SUM(capacity * seconds), MIN(capacity), MAX(capacity),
+               COUNT(*) FILTER (WHERE valid_from >= bucket), BOOL_OR(valid_from < bucket)
+        FROM pieces
+        GROUP BY hall_id, bucket
+        ON CONFLICT (hall_id, bucket) DO UPDATE
+        SET seconds = EXCLUDED.seconds,
+            weighted_capacity = EXCLUDED.weighted_capacity,
+            min_capacity = EXCLUDED.min_capacity,
+            max_capacity = EXCLUDED.max_capacity,
+            started = EXCLUDED.started,
+            carried_in = EXCLUDED.carried_in
+    """
+
+    # Merges finished hours into days
+    DAILY_ROLLUP_QUERY = """
+        INSERT INTO dining_capacity_daily (
+            hall_id, bucket, seconds, weighted_capacity, min_capacity, max_capacity, started, carried_in
+        )
+        SELECT hall_id, date_trunc('day', bucket), SUM(seconds), SUM(weighted_capacity),
+               MIN(min_capacity), MAX(max_capacity), SUM(started),
+               -- Only the first hour of the day can carry an interval in from the day before
+               COALESCE(BOOL_OR(carried_in) FILTER (WHERE bucket = date_trunc('day', bucket)), FALSE)
+        FROM dining_capacity_hourly
+        WHERE bucket >= COALESCE(%(since)s::timestamp, '-infinity') AND bucket < %(until)s
+        GROUP BY 1, 2
+        ON CONFLICT (hall_id, bucket) DO UPDATE
+        SET seconds = EXCLUDED.seconds,
+            weighted_capacity = EXCLUDED.weighted_capacity,
+            min_capacity = EXCLUDED.min_capacity,
+            max_capacity = EXCLUDED.max_capacity,
+            started = EXCLUDED.started,
+            carried_in = EXCLUDED.carried_in
+    """
+
+    def compact_capacity_history(
+        self, raw_retention: Optional[timedelta], hourly_retention: Optional[timedelta], partition_months_ahead: int
+    ) -> CompactionStats:
+        """
+        Creates the interval table's partitions for the coming months, rolls finished hours of
+        capacity intervals into the hourly rollup and finished days into the daily one, then expires
+        intervals and hourly rows older than their retention (None keeps them forever). An interval
+        is only expired once the next one has started before the cutoff, so every hall keeps its
+        current interval; whole months of such intervals are dropped as partitions.
+
+        The rollups commit before anything expires, and each partition is dropped in its own short
+        transaction, so the parent table is never locked for the whole compaction.
+        """
+        stats = CompactionStats()
+        try:
+            with self.db_manager.transaction() as cur:
+                stats.created_partitions = ensure_partitions(
+                    cur, "dining_capacity_history", datetime.now(), partition_months_ahead
+                )
+        except Exception as e:
+            logger.error(f"Error creating dining capacity history partitions: {e}", exc_info=True)
+
+        with self.db_manager.transaction() as cur:
+            stats.rolled_hourly = run_rollup(
+                cur, "dining_hourly", self.HOURLY_ROLLUP_QUERY,
+                "SELECT date_trunc('hour', MAX(last_updated)) FROM dining_capacity_history", HOUR,
+            )
+            stats.rolled_daily = run_rollup(
+                cur, "dining_daily", self.DAILY_ROLLUP_QUERY,
+                "SELECT date_trunc('day', rolled_until) FROM capacity_rollup_state WHERE name = 'dining_hourly'", DAY,
+            )
+
+            raw_cutoff = get_expiry_cutoff(cur, "dining_hourly", raw_retention, HOUR)
+            hourly_cutoff = get_expiry_cutoff(cur, "dining_daily", hourly_retention, DAY)
+            drop_before = None
+            if raw_cutoff is not None:
+                # Months before every hall's interval holding at the cutoff contain only expired ones
+                cur.execute(
+                    """
+                    SELECT MIN(holding) FROM (
+                        SELECT MAX(valid_from) AS holding
+                        FROM dining_capacity_history
+                        WHERE valid_from <= %s
+                        GROUP BY hall_id
+                    ) halls
+                    """,
+                    (raw_cutoff,),
+                )
+                drop_before = cur.fetchone()[0]
+
+        if drop_before is not None:
+            stats.dropped_partitions = drop_partitions_before(self.db_manager, "dining_capacity_history", drop_before)
+
+        with self.db_manager.transaction() as cur:
+            if raw_cutoff is not None:
+                cur.execute(
+                    """
+                    DELETE FROM dining_capacity_history h
+                    WHERE h.valid_from < %(cutoff)s AND EXISTS (
+                        SELECT 1 FROM dining_capacity_history n
+                        WHERE n.hall_id = h.hall_id AND n.valid_from > h.valid_from AND n.valid_from <= %(cutoff)s
+                    )
+                    """,
+                    {"cutoff": raw_cutoff},
+                )
+                stats.expired_raw = cur.rowcount
+
+            if hourly_cutoff is not None:
+                cur.execute("DELETE FROM dining_capacity_hourly WHERE bucket < %s", (hourly_cutoff,))
+                stats.expired_hourly = cur.rowcount
+
+        logger.info(
+            f"Compacted dining capacity history: {stats.rolled_hourly} hourly and {stats.rolled_daily} daily "
+            f"rollups written, {stats.expired_raw} intervals and {stats.expired_hourly} hourly rows expired, "
+            f"{stats.created_partitions} partitions created and {stats.dropped_partitions} dropped"
+        )
+        return stats
+
+    def get_hourly_capacities(self) -> List[Tuple]:
+        """
+        Returns the time-weighted capacity of every hall per hour, as (slug, "capacity", hour,
+        capacity * seconds, seconds, end of hour) rows. Rolled up hours come from the hourly
+        rollup and the rest from the intervals, split the same way the rollup splits them.
+        """
+        query = self.HOURLY_PIECES + """
+            SELECT d.slug, 'capacity', h.bucket, h.weighted_capacity, h.seconds, h.bucket + INTERVAL '1 hour'
+            FROM dining_capacity_hourly h
+            JOIN dining_halls d ON d.id = h.hall_id
+            WHERE h.bucket < COALESCE(%(since)s::timestamp, '-infinity')
+            UNION ALL
+            SELECT d.slug, 'capacity', p.bucket, SUM(p.capacity * p.seconds), SUM(p.seconds),
+                   p.bucket + INTERVAL '1 hour'
+            FROM pieces p
+            JOIN dining_halls d ON d.id = p.hall_id
+            GROUP BY d.slug, p.bucket
+        """
+        watermarks = get_rollup_watermarks(self.db_manager, ["dining_hourly"])
+        return self.db_manager.fetch_all(query, {"since": watermarks.get("dining_hourly"), "until": datetime.max})
+
+    def get_menu_on(self, slug: str, menu_date: date) -> Optional[Dict[str, list]]:
+        """Returns the menu a dining hall served on a date (its last version that day), None if none was recorded."""
+        hall_id = self.get_dining_hall_id(slug)
+        if hall_id is None:
+            return None
+
+        query = """
+            SELECT v.stations, v.item_ids
+            FROM dining_menu_days md
+            JOIN dining_menu_versions v ON v.id = md.version_id
+            WHERE md.hall_id = %s AND md.menu_date = %s
+            ORDER BY md.recorded_at DESC
+            LIMIT 1
+        """
+        row = self.db_manager.fetch_one(query, (hall_id, menu_date))
+        if row is None:
+            return None
+        stations, item_ids = row
+        names = dict(self.db_manager.fetch_all("SELECT id, name FROM menu_items WHERE id = ANY(%s)", (item_ids,)))
+        return decode_menu(stations, names)
+
+    def get_item_served(self, item: str, today: date, slug: Optional[str] = None) -> Dict[str, Optional[Dict]]:
+        """
+        Finds the last day up to `today` that an item (case-insensitive) was on a menu, optionally at
+        one hall. The GIN index on item ids finds the menus serving it, so no menu is read beyond the
+        station lookup of the match.
+
+        Only the menu of the day each scrape runs is recorded, so future days are never known.
+        """
+        query = """
+            SELECT d.slug, md.menu_date,
+                   (SELECT s.key FROM jsonb_each(v.stations) s WHERE s.value @> to_jsonb(i.id) LIMIT 1),
+                   i.name
+            FROM menu_items i
+            JOIN dining_menu_versions v ON v.item_ids @> ARRAY[i.id]
+            JOIN dining_menu_days md ON md.version_id = v.id
+            JOIN dining_halls d ON d.id = md.hall_id
+            WHERE lower(i.name) = lower(%(item)s)
+              AND (%(slug)s::text IS NULL OR d.slug = %(slug)s)
+              AND md.menu_date <= %(today)s
+            ORDER BY md.menu_date DESC
+            LIMIT 1
+        """
+        row = self.db_manager.fetch_one(query, {"item": item, "slug": slug, "today": today})
+        if row is None:
+            return {"last_served": None}
+        hall, menu_date, station, name = row
+        return {"last_served": {"slug": hall, "date": menu_date.isoformat(), "station": station, "item": name}}
+
+    def get_dining_halls_menus(self) -> Dict[str, Dict[str, List[str]]]:
+        """Returns the menu (station -> items) of every dining hall, keyed by slug."""
+        rows = self.db_manager.fetch_all("SELECT slug, menu FROM dining_halls")
+        return {row[0]: row[1] or {} for row in rows}
+
+    def get_dining_halls_hours(self) -> Dict[str, Dict]:
+        """Returns the regular and special hours of every dining hall, keyed by slug."""
+        rows = self.db_manager.fetch_all("SELECT slug, regular_hours, special_hours FROM dining_halls")
+        return {row[0]: {"regular_hours": row[1] or {}, "special_hours": row[2] or None} for row in rows}
+
     def get_dining_hall_latest(self, slug: str) -> Dict:
-        """Gets the latest data for a dining hall, including capacity."""
-        hall = self.get_dining_hall_by_slug(slug)
+        """Gets the latest data for a dining hall, including capacity, in a single query."""
+        hall = self.get_dining_halls_latest([slug]).get(slug)
         if not hall:
+            logger.warning(f"No dining hall found with slug: {slug}")
             return {}
+        return hall
+
+    # Response field -> dining_halls column, read only when the field is requested
+    HALL_COLUMNS = {
+        "menu": "d.menu",
+        "regular_hours": "d.regular_hours",
+        "special_hours": "d.special_hours",
+        "last_updated": "d.last_updated",
+    }
+
+    def get_dining_halls_latest(
+        self, slugs: Optional[List[str]] = None, fields: Optional[Fieldset] = None
+    ) -> Dict[str, Dict]:
+        """
+        Gets the latest data for several dining halls (all halls if `slugs` is None) in a single query.
+
+        `fields` (see fields.py) limits the result to some fields. Only their columns are selected,
+        so the menu and hours JSONB are not read (or detoasted) unless requested.
+        """
+        hall_fields = [field for field in self.HALL_COLUMNS if fields is None or field in fields]
+        with_capacity = fields is None or "capacity" in fields
+
+        columns = ["d.id", "d.slug"] + [self.HALL_COLUMNS[field] for field in hall_fields]
+        capacity_join = ""
+        if with_capacity:
+            columns.append("c.capacity")
+            capacity_join = """
+            LEFT JOIN LATERAL (
+                SELECT capacity
+                FROM dining_capacity_history
+                WHERE hall_id = d.id
+                ORDER BY valid_from DESC
+                LIMIT 1
+            ) c ON TRUE"""
+
+        query = f"""
+            SELECT {", ".join(columns)}
+            FROM dining_halls d{capacity_join}
+            {{where}}
+            ORDER BY d.slug
+        """
+        if slugs is None:
+            rows = self.db_manager.fetch_all(query.format(where=""))
+        else:
+            rows = self.db_manager.fetch_all(query.format(where="WHERE d.slug = ANY(%s)"), (list(slugs),))
+
+        halls: Dict[str, Dict] = {}
+        for row in rows:
+            self._hall_ids[row[1]] = row[0]
+            values = dict(zip(hall_fields, row[2:]))
+            hall = halls[row[1]] = {"slug": row[1]}
+            if with_capacity:
+                hall["capacity"] = row[-1]
+            if "menu" in values:
+                hall["menu"] = values["menu"] if values["menu"] else {}
+            if "regular_hours" in values:
+                hall["regular_hours"] = values["regular_hours"] if values["regular_hours"] else {}
+            if "special_hours" in values:
+                hall["special_hours"] = values["special_hours"] if values["special_hours"] else None
+            if "last_updated" in values:
+                hall["last_updated"] = values["last_updated"].isoformat()
 
-        capacity = self.get_latest_dining_capacity(slug)
-        return {
-            "slug": hall.slug,
-            "capacity": capacity.capacity if capacity else hall.capacity,
-            "menu": hall.menu,
-            "regular_hours": hall.regular_hours,
-            "special_hours": hall.special_hours,
-            "last_updated": hall.last_updated.isoformat(),
-        }
+        return halls
@@ -1,17 +1,42 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 import logging
-from datetime import datetime
-from models.gyms import Gym, GymCapacityHistory
+from datetime import datetime, timedelta
+from models.gyms import Gym, GymCapacityHistory, GymForecastModel
+from models.ingest import IngestStats, CompactionStats
+from hashing import content_hash
+from psycopg.types.json import Jsonb
 from database.manager import DatabaseManager
+from database.rollups import (
+    HOUR, DAY, RAW_RETENTION, HOURLY_RETENTION, plan_history_sources, get_rollup_watermarks, run_rollup,
+    get_expiry_cutoff, expiry_cutoff, check_bucket,
+)
+from database.partitions import ensure_partitions, drop_partitions_before
+from fields import Fieldset
 
 logger = logging.getLogger(__name__)
 
 class GymDatabase:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
+        self._gym_ids: Dict[str, int] = {}  # slug -> id, gyms are never renumbered
+        self._hours_hashes: Dict[int, str] = {}  # id -> hash of the last written hours
         logger.info("Initialized GymDatabase")
 
+    def get_gym_id(self, slug: str) -> Optional[int]:
+        """Resolves a gym slug to its id, hitting the database only on the first lookup."""
+        gym_id = self._gym_ids.get(slug)
+        if gym_id is not None:
+            return gym_id
+
+        row = self.db.fetch_one("SELECT id FROM gyms WHERE slug = %s", (slug,))
+        if row:
+            self._gym_ids[slug] = row[0]
+            return row[0]
+
+        logger.warning(f"No gym found with slug: {slug}")
+        return None
+
     def get_gym_by_slug(self, slug: str) -> Optional[Gym]:
         """Get gym information by slug."""
         logger.info(f"Getting gym info for slug: {slug}")
@@ -24,6 +49,7 @@ class GymDatabase:
         row = self.db.fetch_one(query, (slug,))
         
         if row:
+            self._gym_ids[row[1]] = row[0]
             return Gym(
                 id=row[0],
                 slug=row[1],
@@ -38,27 +64,68 @@ class GymDatabase:
     def update_gym_hours(
         self, slug: str, regular_hours: Dict[str, str], special_hours: Optional[Dict[str, str]] = None
     ) -> bool:
-        """Updates a gym's regular and special hours."""
-        gym = self.get_gym_by_slug(slug)
-        if not gym:
-            logger.error(f"No gym found with slug {slug}")
-            return False
+        """Updates a gym's regular and special hours, skipping the write if they have not changed."""
+        stats = self.update_gyms_hours({slug: {"regular_hours": regular_hours, "special_hours": special_hours}})
+        return stats.failed == 0
 
-        update_query = """
-            UPDATE gyms
-            SET regular_hours = %s, special_hours = %s, last_updated = NOW()
-            WHERE id = %s
+    def update_gyms_hours(self, hours_data: Dict[str, Dict]) -> IngestStats:
         """
-        params = (json.dumps(regular_hours), json.dumps(special_hours) if special_hours else None, gym.id)
-        
-        self.db.execute(update_query, params)
-        logger.info(f"Successfully updated hours for gym: {slug}")
-        return True
+        Updates the hours of several gyms (slug -> regular/special hours) in one statement.
+
+        Gyms whose hours hash matches the last written one are not rewritten.
+        """
+        stats = IngestStats()
+        hashes = {}
+        gym_ids, regular_hours, special_hours, hours_hashes = [], [], [], []
+        for slug, hours in hours_data.items():
+            gym_id = self.get_gym_id(slug)
+            if gym_id is None:
+                logger.error(f"No gym found with slug {slug}")
+                stats.failed += 1
+                continue
+
+            new_hash = content_hash(
+                {"regular_hours": hours["regular_hours"], "special_hours": hours.get("special_hours") or None}
+            )
+            hashes[gym_id] = new_hash
+            if self._hours_hashes.get(gym_id) == new_hash:
+                stats.unchanged += 1
+                continue
+
+            gym_ids.append(gym_id)
+            regular_hours.append(Jsonb(hours["regular_hours"]))
+            special_hours.append(Jsonb(hours["special_hours"]) if hours.get("special_hours") else None)
+            hours_hashes.append(new_hash)
+
+        if gym_ids:
+            # The hash check also covers a cold in-memory cache, using the persisted column
+            update_query = """
+                UPDATE gyms g
+                SET regular_hours = u.regular_hours, special_hours = u.special_hours,
+                    hours_hash = u.hours_hash, last_updated = NOW()
+                FROM unnest(%s::int[], %s::jsonb[], %s::jsonb[], %s::varchar[])
+                    AS u(id, regular_hours, special_hours, hours_hash)
+                WHERE g.id = u.id AND g.hours_hash IS DISTINCT FROM u.hours_hash
+                RETURNING g.id
+            """
+            try:
+                with self.db.transaction() as cur:
+                    cur.execute(update_query, (gym_ids, regular_hours, special_hours, hours_hashes))
+                    stats.updated = len(cur.fetchall())
+            except Exception as e:
+                logger.error(f"Error updating gym hours: {e}", exc_info=True)
+                stats.failed += len(gym_ids)
+                return stats
+            stats.unchanged += len(gym_ids) - stats.updated
+
+        self._hours_hashes.update(hashes)
+        logger.info(f"Updated hours for {stats.updated} gyms ({stats.unchanged} unchanged)")
+        return stats
 
     def insert_gym_capacity(self, slug: str, zone_name: str, capacity: int, percentage: int, last_updated: str) -> bool:
         """Inserts or updates capacity for a specific gym zone."""
-        gym = self.get_gym_by_slug(slug)
-        if not gym:
+        gym_id = self.get_gym_id(slug)
+        if gym_id is None:
             logger.error(f"No gym found with slug {slug}")
             return False
 
@@ -68,7 +135,7 @@ class GymDatabase:
             ON CONFLICT (gym_id, zone_name, capacity, percentage, last_updated) DO NOTHING
             RETURNING id
         """
-        params = (gym.id, zone_name, capacity, percentage, last_updated)
+        params = (gym_id, zone_name, capacity, percentage, last_updated)
         
         capacity_id = self.db.fetch_one(insert_query, params)
         if capacity_id:
@@ -78,26 +145,70 @@ class GymDatabase:
             logger.info(f"Skipped duplicate capacity entry for {slug} - {zone_name}")
             return True
 
+    def insert_gym_capacities(self, facility_counts: Dict[str, List[Dict]]) -> IngestStats:
+        """Inserts a whole scrape of zone capacities (slug -> zones) in one multi-row insert."""
+        stats = IngestStats()
+        gym_ids, zone_names, capacities, percentages, timestamps = [], [], [], [], []
+        for slug, zones in facility_counts.items():
+            gym_id = self.get_gym_id(slug)
+            if gym_id is None:
+                logger.error(f"No gym found with slug {slug}")
+                stats.failed += len(zones)
+                continue
+
+            for zone in zones:
+                gym_ids.append(gym_id)
+                zone_names.append(zone["zone_name"])
+                capacities.append(zone["last_count"])
+                percentages.append(zone["percentage"])
+                timestamps.append(zone["last_updated"])
+
+        if not gym_ids:
+            return stats
+
+        insert_query = """
+            INSERT INTO gym_capacity_history (gym_id, zone_name, capacity, percentage, last_updated)
+            SELECT * FROM unnest(%s::int[], %s::varchar[], %s::int[], %s::int[], %s::timestamp[])
+            ON CONFLICT (gym_id, zone_name, capacity, percentage, last_updated) DO NOTHING
+            RETURNING id
+        """
+        params = (gym_ids, zone_names, capacities, percentages, timestamps)
+
+        try:
+            with self.db.transaction() as cur:
+                cur.execute(insert_query, params)
+                stats.inserted = len(cur.fetchall())
+        except Exception as e:
+            logger.error(f"Error bulk inserting gym capacities: {e}", exc_info=True)
+            stats.failed += len(gym_ids)
+            return stats
+
+        stats.skipped = len(gym_ids) - stats.inserted
+        logger.info(f"Inserted {stats.inserted} gym capacity entries, skipped {stats.skipped} duplicates")
+        return stats
+
+    # Start of the month before a gym's newest sample. Latest-value queries only look at zones
+    # sampled since then, so they scan at most the two newest partitions.
+    LATEST_WINDOW_START = """
+        SELECT date_trunc('month', MAX(last_updated)) - INTERVAL '1 month'
+        FROM gym_capacity_history
+        WHERE gym_id = {gym_id}
+    """
+
     def get_latest_gym_capacity(self, slug: str) -> Optional[List[GymCapacityHistory]]:
         """Retrieves the most recent capacity data for each gym zone."""
-        gym = self.get_gym_by_slug(slug)
-        if not gym:
+        gym_id = self.get_gym_id(slug)
+        if gym_id is None:
             logger.error(f"No gym found with slug {slug}")
             return None
 
-        query = """
-            WITH RankedCapacities AS (
-                SELECT id, gym_id, zone_name, capacity, percentage, last_updated,
-                       ROW_NUMBER() OVER (PARTITION BY gym_id, zone_name ORDER BY last_updated DESC) as rn
-                FROM gym_capacity_history
-                WHERE gym_id = %s
-            )
-            SELECT id, gym_id, zone_name, capacity, percentage, last_updated
-            FROM RankedCapacities
-            WHERE rn = 1
-            ORDER BY zone_name
+        query = f"""
+            SELECT DISTINCT ON (zone_name) id, gym_id, zone_name, capacity, percentage, last_updated
+            FROM gym_capacity_history
+            WHERE gym_id = %s AND last_updated >= ({self.LATEST_WINDOW_START.format(gym_id="%s")})
+            ORDER BY zone_name, last_updated DESC
         """
-        rows = self.db.fetch_all(query, (gym.id,))
+        rows = self.db.fetch_all(query, (gym_id, gym_id))
         
         if rows:
             return [
@@ -115,26 +226,348 @@ class GymDatabase:
         logger.warning(f"No capacity data found for gym: {slug}")
         return None
 
-    def get_gym_latest(self, slug: str) -> Dict:
-        """Gets the latest data for a gym, including capacity per zone."""
-        gym = self.get_gym_by_slug(slug)
-        if not gym:
-            return {}
+    def get_gym_capacity_history(
+        self,
+        slug: str,
+        start: datetime,
+        end: datetime,
+        bucket: timedelta,
+        limit: int,
+        zone_name: Optional[str] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Aggregates zone capacity history into fixed-size time buckets (avg/min/max per bucket per zone).
+
+        Finished hours and days are read from the hourly and daily rollups when they divide the
+        bucket size, and only the rest of the range from raw samples. Results are ordered by
+        (bucket, zone_name). Pass the last (bucket, zone_name) of a page as `after` to fetch the next page.
+        Raises InvalidBucketError if the bucket is finer than what is still kept from `start` on.
+        """
+        gym_id = self.get_gym_id(slug)
+        if gym_id is None:
+            return None
+
+        if after is not None:
+            # Skip rows that can only fall into buckets already returned
+            start = max(start, after[0])
+
+        watermarks = get_rollup_watermarks(self.db, ["gym_daily", "gym_hourly"])
+        check_bucket(start, bucket, [
+            ("raw", None, expiry_cutoff(watermarks.get("gym_hourly"), RAW_RETENTION, HOUR)),
+            ("hourly", HOUR, expiry_cutoff(watermarks.get("gym_daily"), HOURLY_RETENTION, DAY)),
+            ("daily", DAY, None),
+        ])
+        segments = plan_history_sources(
+            start, end, bucket,
+            [("daily", DAY, watermarks.get("gym_daily")), ("hourly", HOUR, watermarks.get("gym_hourly"))],
+        )
+        zone_filter = " AND zone_name = %s" if zone_name is not None else ""
+
+        # Every segment yields partial aggregates that are merged into the requested buckets
+        selects, params = [], []
+        for source, seg_start, seg_end in segments:
+            if source == "raw":
+                selects.append(f"""
+                    SELECT last_updated AS ts, zone_name, 1 AS samples,
+                           percentage AS sum_percentage, percentage AS min_percentage, percentage AS max_percentage,
+                           capacity AS sum_capacity, capacity AS min_capacity, capacity AS max_capacity
+                    FROM gym_capacity_history
+                    WHERE gym_id = %s AND last_updated >= %s AND last_updated < %s{zone_filter}
+                """)
+            else:
+                selects.append(f"""
+                    SELECT bucket AS ts, zone_name, samples, sum_percentage, min_percentage, max_percentage,
+                           sum_capacity, min_capacity, max_capacity
+                    FROM gym_capacity_{source}
+                    WHERE gym_id = %s AND bucket >= %s AND bucket < %s{zone_filter}
+                """)
+            params.extend([gym_id, seg_start, seg_end])
+            if zone_name is not None:
+                params.append(zone_name)
+        if not selects:
+            return []
+
+        query = f"""
+            SELECT bucket, zone_name, avg_percentage, min_percentage, max_percentage,
+                   avg_capacity, min_capacity, max_capacity, samples
+            FROM (
+                SELECT date_bin(%s::interval, ts, TIMESTAMP '2000-01-01') AS bucket,
+                       zone_name,
+                       SUM(sum_percentage)::float / SUM(samples) AS avg_percentage,
+                       MIN(min_percentage) AS min_percentage,
+                       MAX(max_percentage) AS max_percentage,
+                       SUM(sum_capacity)::float / SUM(samples) AS avg_capacity,
+                       MIN(min_capacity) AS min_capacity,
+                       MAX(max_capacity) AS max_capacity,
+                       SUM(samples) AS samples
+                FROM ({" UNION ALL ".join(selects)}) sources
+                GROUP BY 1, 2
+            ) buckets
+            {"WHERE (bucket, zone_name) > (%s, %s)" if after is not None else ""}
+            ORDER BY bucket, zone_name
+            LIMIT %s
+        """
+        params = [bucket] + params
+        if after is not None:
+            params.extend(after)
+        params.append(limit)
 
-        capacities = self.get_latest_gym_capacity(slug)
-        zones = {
-            cap.zone_name: {
-                "capacity": cap.capacity,
-                "percentage": cap.percentage,
-                "last_updated": cap.last_updated.isoformat()
+        rows = self.db.fetch_all(query, tuple(params))
+        return [
+            {
+                "bucket": row[0].isoformat(),
+                "zone_name": row[1],
+                "percentage": {"avg": round(row[2], 2), "min": row[3], "max": row[4]},
+                "capacity": {"avg": round(row[5], 2), "min": row[6], "max": row[7]},
+                "samples": row[8],
             }
-            for cap in capacities
-        } if capacities else {}
+            for row in rows
+        ]
 
+    # Upserts finished hours of raw samples, recomputing from %(since)s to pick up late rows
+    HOURLY_ROLLUP_QUERY = """
+        INSERT INTO gym_capacity_hourly (
+            gym_id, zone_name, bucket, samples, sum_percentage, min_percentage, max_percentage,
+            sum_capacity, min_capacity, max_capacity
+        )
+        SELECT gym_id, zone_name, date_trunc('hour', last_updated), COUNT(*),
+               SUM(percentage), MIN(percentage), MAX(percentage),
+               SUM(capacity), MIN(capacity), MAX(capacity)
+        FROM gym_capacity_history
+        WHERE last_updated >= COALESCE(%(since)s::timestamp, '-infinity') AND last_updated < %(until)s
+        GROUP BY 1, 2, 3
+        ON CONFLICT (gym_id, bucket, zone_name) DO UPDATE
+        SET samples = EXCLUDED.samples,
+            sum_percentage = EXCLUDED.sum_percentage,
+            min_percentage = EXCLUDED.min_percentage,
+            max_percentage = EXCLUDED.max_percentage,
+            sum_capacity = EXCLUDED.sum_capacity,
+            min_capacity = EXCLUDED.min_capacity,
+            max_capacity = EXCLUDED.max_capacity
+    """
+
+    # Merges finished hours into days
+    DAILY_ROLLUP_QUERY = """
+        INSERT INTO gym_capacity_daily (
+            gym_id, zone_name, bucket, samples, sum_percentage, min_percentage, max_percentage,
+            sum_capacity, min_capacity, max_capacity
+        )
+        SELECT gym_id, zone_name, date_trunc('day', bucket), SUM(samples),
+               SUM(sum_percentage), MIN(min_percentage), MAX(max_percentage),
+               SUM(sum_capacity), MIN(min_capacity), MAX(max_capacity)
+        FROM gym_capacity_hourly
+        WHERE bucket >= COALESCE(%(since)s::timestamp, '-infinity') AND bucket < %(until)s
+        GROUP BY 1, 2, 3
+        ON CONFLICT (gym_id, bucket, zone_name) DO UPDATE
+        SET samples = EXCLUDED.samples,
+            sum_percentage = EXCLUDED.sum_percentage,
+            min_percentage = EXCLUDED.min_percentage,
+            max_percentage = EXCLUDED.max_percentage,
+            sum_capacity = EXCLUDED.sum_capacity,
+            min_capacity = EXCLUDED.min_capacity,
+            max_capacity = EXCLUDED.max_capacity
+    """
+
+    def compact_capacity_history(
+        self, raw_retention: Optional[timedelta], hourly_retention: Optional[timedelta], partition_months_ahead: int
+    ) -> CompactionStats:
+        """
+        Creates the raw table's partitions for the coming months, rolls finished hours of raw samples
+        into the hourly rollup and finished days into the daily one, then expires raw and hourly rows
+        older than their retention (None keeps them forever). Rows are only expired once the next
+        coarser rollup covers them; whole expired months of raw samples are dropped as partitions.
+
+        The rollups commit before anything expires, and each partition is dropped in its own short
+        transaction, so the parent table is never locked for the whole compaction.
+        """
+        stats = CompactionStats()
+        try:
+            with self.db.transaction() as cur:
+                stats.created_partitions = ensure_partitions(
+                    cur, "gym_capacity_history", datetime.now(), partition_months_ahead
+                )
+        except Exception as e:
+            logger.error(f"Error creating gym capacity history partitions: {e}", exc_info=True)
+
+        with self.db.transaction() as cur:
+            stats.rolled_hourly = run_rollup(
+                cur, "gym_hourly", self.HOURLY_ROLLUP_QUERY,
+                "SELECT date_trunc('hour', MAX(last_updated)) FROM gym_capacity_history", HOUR,
+            )
+            stats.rolled_daily = run_rollup(
+                cur, "gym_daily", self.DAILY_ROLLUP_QUERY,
+                "SELECT date_trunc('day', rolled_until) FROM capacity_rollup_state WHERE name = 'gym_hourly'", DAY,
+            )
+
+            raw_cutoff = get_expiry_cutoff(cur, "gym_hourly", raw_retention, HOUR)
+            hourly_cutoff = get_expiry_cutoff(cur, "gym_daily", hourly_retention, DAY)
+
+        if raw_cutoff is not None:
+            stats.dropped_partitions = drop_partitions_before(self.db, "gym_capacity_history", raw_cutoff)
+
+        with self.db.transaction() as cur:
+            if raw_cutoff is not None:
+                cur.execute("DELETE FROM gym_capacity_history WHERE last_updated < %s", (raw_cutoff,))
+                stats.expired_raw = cur.rowcount
+
+            if hourly_cutoff is not None:
+                cur.execute("DELETE FROM gym_capacity_hourly WHERE bucket < %s", (hourly_cutoff,))
+                stats.expired_hourly = cur.rowcount
+
+        logger.info(
+            f"Compacted gym capacity history: {stats.rolled_hourly} hourly and {stats.rolled_daily} daily "
+            f"rollups written, {stats.expired_raw} raw and {stats.expired_hourly} hourly rows expired, "
+            f"{stats.created_partitions} partitions created and {stats.dropped_partitions} dropped"
+        )
+        return stats
+
+    def get_hourly_percentages(self) -> List[Tuple]:
+        """
+        Returns the percentage of every gym zone per hour, as (slug, zone_name, hour, sum of
+        percentages, samples, newest sample) rows. Rolled up hours come from the hourly rollup
+        and the rest from raw samples.
+        """
+        query = """
+            SELECT g.slug, h.zone_name, h.bucket, h.sum_percentage::float, h.samples,
+                   h.bucket + INTERVAL '1 hour'
+            FROM gym_capacity_hourly h
+            JOIN gyms g ON g.id = h.gym_id
+            WHERE h.bucket < COALESCE(%(since)s::timestamp, '-infinity')
+            UNION ALL
+            SELECT g.slug, c.zone_name, date_trunc('hour', c.last_updated), SUM(c.percentage)::float, COUNT(*),
+                   MAX(c.last_updated)
+            FROM gym_capacity_history c
+            JOIN gyms g ON g.id = c.gym_id
+            WHERE c.last_updated >= COALESCE(%(since)s::timestamp, '-infinity')
+            GROUP BY 1, 2, 3
+        """
+        watermarks = get_rollup_watermarks(self.db, ["gym_hourly"])
+        return self.db.fetch_all(query, {"since": watermarks.get("gym_hourly")})
+
+    def save_forecast_models(self, models: Dict[Tuple[str, str], GymForecastModel]) -> IngestStats:
+        """Upserts the forecast models of several zones ((slug, zone_name) -> model) in one transaction."""
+        stats = IngestStats()
+        params = []
+        for (slug, zone_name), model in models.items():
+            gym_id = self.get_gym_id(slug)
+            if gym_id is None:
+                logger.error(f"No gym found with slug {slug}")
+                stats.failed += 1
+                continue
+            params.append((gym_id, zone_name, model.baseline, model.decay, model.samples, model.fitted_at))
+
+        upsert_query = """
+            INSERT INTO gym_forecast_models (gym_id, zone_name, baseline, decay, samples, fitted_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (gym_id, zone_name) DO UPDATE
+            SET baseline = EXCLUDED.baseline,
+                decay = EXCLUDED.decay,
+                samples = EXCLUDED.samples,
+                fitted_at = EXCLUDED.fitted_at
+        """
+        try:
+            with self.db.transaction() as cur:
+                cur.executemany(upsert_query, params)
+        except Exception as e:
+            logger.error(f"Error saving forecast models: {e}", exc_info=True)
+            stats.failed += len(params)
+            return stats
+
+        stats.updated = len(params)
+        logger.info(f"Saved forecast models for {stats.updated} zones")
+        return stats
+
+    def get_forecast_models(self) -> Dict[Tuple[str, str], GymForecastModel]:
+        """Returns the persisted forecast model of every zone, keyed by (slug, zone_name)."""
+        query = """
+            SELECT g.slug, m.zone_name, m.baseline, m.decay, m.samples, m.fitted_at
+            FROM gym_forecast_models m
+            JOIN gyms g ON g.id = m.gym_id
+        """
         return {
-            "slug": gym.slug,
-            "regular_hours": gym.regular_hours,
-            "special_hours": gym.special_hours,
-            "zones": zones,
-            "last_updated": gym.last_updated.isoformat(),
+            (row[0], row[1]): GymForecastModel(baseline=row[2], decay=row[3], samples=row[4], fitted_at=row[5])
+            for row in self.db.fetch_all(query)
         }
+
+    def get_gyms_hours(self) -> Dict[str, Dict]:
+        """Returns the regular and special hours of every gym, keyed by slug."""
+        rows = self.db.fetch_all("SELECT slug, regular_hours, special_hours FROM gyms")
+        return {row[0]: {"regular_hours": row[1] or {}, "special_hours": row[2] or None} for row in rows}
+
+    def get_gym_latest(self, slug: str) -> Dict:
+        """Gets the latest data for a gym, including capacity per zone, in a single query."""
+        gym = self.get_gyms_latest([slug]).get(slug)
+        if not gym:
+            logger.warning(f"No gym found with slug: {slug}")
+            return {}
+        return gym
+
+    # Response field -> gyms column, read only when the field is requested
+    GYM_COLUMNS = {"regular_hours": "g.regular_hours", "special_hours": "g.special_hours", "last_updated": "g.last_updated"}
+    ZONE_COLUMNS = ("capacity", "percentage", "last_updated")
+
+    def get_gyms_latest(self, slugs: Optional[List[str]] = None, fields: Optional[Fieldset] = None) -> Dict[str, Dict]:
+        """
+        Gets the latest data for several gyms (all gyms if `slugs` is None) in a single query.
+
+        `fields` (see fields.py) limits the result to some fields. Only their columns are selected,
+        and zone history is not read at all unless zones are requested.
+        """
+        gym_fields = [field for field in self.GYM_COLUMNS if fields is None or field in fields]
+        zone_fields = None
+        if fields is None or "zones" in fields:
+            zone_fields = [
+                field for field in self.ZONE_COLUMNS if fields is None or fields["zones"] is None or field in fields["zones"]
+            ]
+
+        columns = ["g.id", "g.slug"] + [self.GYM_COLUMNS[field] for field in gym_fields]
+        zones_join, order = "", "g.slug"
+        if zone_fields is not None:
+            columns += ["c.zone_name"] + [f"c.{field}" for field in zone_fields]
+            zones_join = f"""
+            LEFT JOIN LATERAL (
+                SELECT DISTINCT ON (zone_name) {", ".join(["zone_name"] + zone_fields)}
+                FROM gym_capacity_history
+                WHERE gym_id = g.id AND last_updated >= ({self.LATEST_WINDOW_START.format(gym_id="g.id")})
+                ORDER BY zone_name, last_updated DESC
+            ) c ON TRUE"""
+            order = "g.slug, c.zone_name"
+
+        query = f"""
+            SELECT {", ".join(columns)}
+            FROM gyms g{zones_join}
+            {{where}}
+            ORDER BY {order}
+        """
+        if slugs is None:
+            rows = self.db.fetch_all(query.format(where=""))
+        else:
+            rows = self.db.fetch_all(query.format(where="WHERE g.slug = ANY(%s)"), (list(slugs),))
+
+        gyms: Dict[str, Dict] = {}
+        for row in rows:
+            gym_id, gym_slug = row[:2]
+            gym = gyms.get(gym_slug)
+            if gym is None:
+                self._gym_ids[gym_slug] = gym_id
+                values = dict(zip(gym_fields, row[2:2 + len(gym_fields)]))
+                gym = gyms[gym_slug] = {"slug": gym_slug}
+                if "regular_hours" in values:
+                    gym["regular_hours"] = values["regular_hours"] if values["regular_hours"] else {}
+                if "special_hours" in values:
+                    gym["special_hours"] = values["special_hours"] if values["special_hours"] else None
+                if zone_fields is not None:
+                    gym["zones"] = {}
+                if "last_updated" in values:
+                    gym["last_updated"] = values["last_updated"].isoformat()
+
+            # A gym without any capacity history comes back as a single row of NULL zone columns
+            zone = row[2 + len(gym_fields):]
+            if zone_fields is not None and zone[0] is not None:
+                gym["zones"][zone[0]] = {
+                    field: value.isoformat() if field == "last_updated" else value
+                    for field, value in zip(zone_fields, zone[1:])
+                }
+
+        return gyms
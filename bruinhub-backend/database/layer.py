@@ -0,0 +1,94 @@
+import logging
+import threading
+from typing import Optional
+from database.manager import DatabaseManager
+from database.gyms import GymDatabase
+from database.dining import DiningDatabase
+from database.alerts import AlertDatabase
+from config import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseLayer:
+    """
+    The DatabaseManager, GymDatabase, DiningDatabase and AlertDatabase shared by the API and the tasks.
+
+    Nothing connects to Postgres until one of them is first used, so building the app
+    never waits on the database.
+    """
+
+    def __init__(self, db_url: str):
+        if not db_url:
+            raise ValueError("DATABASE_URL is not set!")
+        self.db_url = db_url
+        self._lock = threading.Lock()
+        self._manager: Optional[DatabaseManager] = None
+        self._gyms: Optional[GymDatabase] = None
+        self._dining: Optional[DiningDatabase] = None
+        self._alerts: Optional[AlertDatabase] = None
+
+    @property
+    def manager(self) -> DatabaseManager:
+        """The shared DatabaseManager, created (and the schema migrated) on first use."""
+        if self._manager is None:
+            with self._lock:
+                if self._manager is None:
+                    logger.info("Initializing shared database layer")
+                    self._manager = DatabaseManager(self.db_url)
+        return self._manager
+
+    @property
+    def gyms(self) -> GymDatabase:
+        """The shared GymDatabase."""
+        if self._gyms is None:
+            manager = self.manager
+            with self._lock:
+                if self._gyms is None:
+                    self._gyms = GymDatabase(manager)
+        return self._gyms
+
+    @property
+    def dining(self) -> DiningDatabase:
+        """The shared DiningDatabase."""
+        if self._dining is None:
+            manager = self.manager
+            with self._lock:
+                if self._dining is None:
+                    self._dining = DiningDatabase(manager)
+        return self._dining
+
+    @property
+    def alerts(self) -> AlertDatabase:
+        """The shared AlertDatabase."""
+        if self._alerts is None:
+            manager = self.manager
+            with self._lock:
+                if self._alerts is None:
+                    self._alerts = AlertDatabase(manager)
+        return self._alerts
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the database has been connected to yet."""
+        return self._manager is not None
+
+
+_db_layer: Optional[DatabaseLayer] = None
+_db_layer_lock = threading.Lock()
+
+
+def init_db_layer(db_url: str) -> DatabaseLayer:
+    """Sets the process-wide database layer, replacing one for a different URL."""
+    global _db_layer
+    with _db_layer_lock:
+        if _db_layer is None or _db_layer.db_url != db_url:
+            _db_layer = DatabaseLayer(db_url)
+        return _db_layer
+
+
+def get_db_layer() -> DatabaseLayer:
+    """Returns the process-wide database layer, creating it from DATABASE_URL if needed."""
+    if _db_layer is None:
+        return init_db_layer(DATABASE_URL)
+    return _db_layer
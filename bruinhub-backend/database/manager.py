@@ -1,45 +1,96 @@
 import psycopg
 import logging
-from typing import Optional, Tuple, List, Any
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, List, Any, Union
+from psycopg_pool import ConnectionPool
+from database.migrator import run_migrations
+from config import (
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MAX_IDLE,
+    DB_POOL_MAX_LIFETIME,
+    DB_POOL_TIMEOUT,
+)
 
 logger = logging.getLogger(__name__)
 
+# Pools are shared by every DatabaseManager pointing at the same database, so
+# the managers built by the API and the task modules reuse one set of connections.
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_migrated_urls = set()
+
+
+def _get_pool(db_url: str) -> ConnectionPool:
+    """Returns the connection pool for a database URL, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(db_url)
+        if pool is None or pool.closed:
+            logger.info(
+                f"Creating connection pool (min={DB_POOL_MIN_SIZE}, max={DB_POOL_MAX_SIZE})"
+            )
+            pool = ConnectionPool(
+                db_url,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                max_idle=DB_POOL_MAX_IDLE,
+                max_lifetime=DB_POOL_MAX_LIFETIME,
+                timeout=DB_POOL_TIMEOUT,
+                check=ConnectionPool.check_connection,  # Health check on checkout
+                name="bruinhub",
+                open=False,
+            )
+            pool.open()
+            _pools[db_url] = pool
+        return pool
+
+
 class DatabaseManager:
     def __init__(self, db_url: str):
         self.db_url = db_url
         if not self.db_url:
             raise ValueError("DATABASE_URL is not set!")
         logger.info(f"Connecting to database: {self.db_url}")
+        self.pool = _get_pool(self.db_url)
 
-        # Run the schema at startup
-        self.run_schema()
-        logger.info("Database schema updated.")
-
+        # Bring the schema up to date once per process
+        with _pools_lock:
+            migrated = self.db_url in _migrated_urls
+        if not migrated:
+            self.run_migrations()
 
-    def run_schema(self):
-        """Runs the schemas.sql script at startup."""
+    def run_migrations(self):
+        """Applies any pending migrations from the migrations/ directory."""
         try:
-            logger.info("Applying database schema from database/schemas.sql...")
-            conn = psycopg.connect(self.db_url)
-            cur = conn.cursor()
-
-            with open("database/schemas.sql", "r") as schema_file:
-                schema_sql = schema_file.read()
-                cur.execute(schema_sql)
-
-            conn.commit()
-            logger.info("Database schema applied successfully.")
+            run_migrations(self)
+            with _pools_lock:
+                _migrated_urls.add(self.db_url)
+        except Exception as e:
+            logger.error(f"Error applying database migrations: {e}", exc_info=True)
 
-            cur.close()
-            conn.close()
+    def get_connection(self):
+        """Checks a connection out of the pool; it is returned when the context exits."""
+        return self.pool.connection()
 
-        except Exception as e:
-            logger.error(f"Error applying database schema: {e}", exc_info=True)
+    @contextmanager
+    def transaction(self) -> Iterator[psycopg.Cursor]:
+        """Yields a cursor whose statements commit together, or roll back if the block raises."""
+        with self.get_connection() as conn:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    yield cur
 
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Returns usage statistics for the connection pool."""
+        return self.pool.get_stats()
 
-    def get_connection(self):
-        """Establishes a new database connection."""
-        return psycopg.connect(self.db_url)
+    def close(self):
+        """Closes the connection pool and all of its connections."""
+        with _pools_lock:
+            if _pools.get(self.db_url) is self.pool:
+                del _pools[self.db_url]
+        self.pool.close()
 
     def test_connection(self) -> bool:
         """Tests if the database connection is working."""
@@ -74,7 +125,7 @@ class DatabaseManager:
             logger.error(f"Error fetching one row: {query} with params {params}: {e}", exc_info=True)
             return None
 
-    def fetch_all(self, query: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+    def fetch_all(self, query: str, params: Union[Tuple[Any, ...], Dict[str, Any]] = ()) -> List[Tuple[Any, ...]]:
         """Executes a query and fetches all results."""
         try:
             with self.get_connection() as conn:
@@ -0,0 +1,80 @@
+import logging
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+import psycopg
+from psycopg.types.json import Jsonb
+from hashing import content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def encode_menu(menu: Dict[str, List[str]], item_ids: Dict[str, int]) -> Dict[str, List[int]]:
+    """Replaces the item names of a menu (station -> items) with their interned ids."""
+    return {station: [item_ids[item] for item in items] for station, items in menu.items()}
+
+
+def decode_menu(stations: Dict[str, List[int]], names: Dict[int, str]) -> Dict[str, List[str]]:
+    """Replaces the item ids of an encoded menu with their names."""
+    return {station: [names[item_id] for item_id in ids] for station, ids in stations.items()}
+
+
+def hash_stations(stations: Dict[str, List[int]]) -> str:
+    return content_hash(stations)
+
+
+def intern_items(cur: psycopg.Cursor, names: Iterable[str]) -> Dict[str, int]:
+    """Returns the ids of item names, adding the ones seen for the first time."""
+    names = sorted(set(names))
+    if not names:
+        return {}
+    cur.execute("INSERT INTO menu_items (name) SELECT unnest(%s::text[]) ON CONFLICT (name) DO NOTHING", (names,))
+    cur.execute("SELECT name, id FROM menu_items WHERE name = ANY(%s)", (names,))
+    return dict(cur.fetchall())
+
+
+def record_menu_days(
+    cur: psycopg.Cursor, menus: Dict[int, Dict[str, List[str]]], menu_date: date, item_ids: Dict[str, int]
+) -> Tuple[int, Dict[str, int]]:
+    """
+    Records the menu each hall (hall_id -> menu) served on a date.
+
+    `item_ids` holds names already interned; the ids of new names are returned for the caller to
+    remember once the transaction commits. Returns (new day rows, newly interned names).
+    """
+    unknown = {item for menu in menus.values() for items in menu.values() for item in items} - item_ids.keys()
+    interned = intern_items(cur, unknown)
+    known = {**item_ids, **interned}
+
+    versions = {}
+    hall_hashes = {}
+    for hall_id, menu in menus.items():
+        stations = encode_menu(menu, known)
+        digest = hash_stations(stations)
+        versions[digest] = stations
+        hall_hashes[hall_id] = digest
+
+    cur.executemany(
+        """
+        INSERT INTO dining_menu_versions (content_hash, stations, item_ids)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (content_hash) DO NOTHING
+        """,
+        [
+            (digest, Jsonb(stations), sorted({item_id for ids in stations.values() for item_id in ids}))
+            for digest, stations in versions.items()
+        ],
+    )
+    cur.execute("SELECT content_hash, id FROM dining_menu_versions WHERE content_hash = ANY(%s)", (list(versions),))
+    version_ids = dict(cur.fetchall())
+
+    hall_ids = list(hall_hashes)
+    cur.execute(
+        """
+        INSERT INTO dining_menu_days (hall_id, menu_date, version_id)
+        SELECT hall_id, %s, version_id FROM unnest(%s::int[], %s::int[]) AS t(hall_id, version_id)
+        ON CONFLICT DO NOTHING
+        """,
+        (menu_date, hall_ids, [version_ids[hall_hashes[hall_id]] for hall_id in hall_ids]),
+    )
+    return cur.rowcount, interned
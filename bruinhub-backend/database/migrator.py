@@ -0,0 +1,89 @@
+import logging
+import os
+import re
+from typing import List, Tuple
+import psycopg
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# Arbitrary application-wide key for pg_advisory_xact_lock, held while migrating
+MIGRATION_LOCK_ID = 130_2025
+
+CREATE_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Tuple[int, str, str]]:
+    """Reads every migration file as (version, name, sql), ordered by version."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), "r") as migration_file:
+            migrations.append((int(match.group(1)), match.group(2), migration_file.read()))
+
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def get_applied_versions(cur: psycopg.Cursor) -> set:
+    """Returns the versions recorded in schema_migrations."""
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def run_migrations(db_manager, directory: str = MIGRATIONS_DIR) -> List[int]:
+    """
+    Applies pending migrations and returns the versions that were applied.
+
+    When the schema is already current this costs a single query. Otherwise every pending
+    migration runs in one transaction under an advisory lock, so concurrent workers wait for
+    the first one and then find nothing left to do.
+    """
+    migrations = load_migrations(directory)
+    versions = [version for version, _, _ in migrations]
+    latest = versions[-1] if versions else 0
+
+    # Fast path: one query confirms every migration is already recorded
+    try:
+        with db_manager.get_connection() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM schema_migrations WHERE version = ANY(%s)", (versions,)
+            ).fetchone()
+        if row[0] == len(versions):
+            logger.info(f"Database schema is up to date (version {latest})")
+            return []
+    except psycopg.errors.UndefinedTable:
+        logger.info("No schema_migrations table yet, migrating a fresh database")
+
+    applied_now = []
+    with db_manager.transaction() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        cur.execute(CREATE_MIGRATIONS_TABLE)
+        applied = get_applied_versions(cur)
+
+        for version, name, sql in migrations:
+            if version in applied:
+                continue
+            logger.info(f"Applying migration {version:04d}_{name}")
+            cur.execute(sql)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name),
+            )
+            applied_now.append(version)
+
+    logger.info(f"Applied {len(applied_now)} migration(s), schema is at version {latest}")
+    return applied_now
@@ -0,0 +1,110 @@
+import logging
+import re
+from datetime import datetime
+from typing import List, Optional
+
+import psycopg
+from psycopg import sql
+
+from database.manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Monthly partitions are named <parent>_pYYYYMM; rows outside every month land in <parent>_default
+PARTITION_NAME_PATTERN = re.compile(r"^(?P<parent>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+# How long detaching a partition may wait for its ACCESS EXCLUSIVE lock on the parent. A waiting
+# request queues every later reader and writer of the parent behind it, so it gives up instead.
+DETACH_LOCK_TIMEOUT = "2s"
+
+
+def month_start(ts: datetime) -> datetime:
+    return datetime(ts.year, ts.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(parent: str, month: datetime) -> str:
+    return f"{parent}_p{month:%Y%m}"
+
+
+def partition_month(parent: str, name: str) -> Optional[datetime]:
+    """Returns the month a partition of `parent` covers, or None for the default partition."""
+    match = PARTITION_NAME_PATTERN.match(name)
+    if not match or match.group("parent") != parent:
+        return None
+    return datetime(int(match.group("year")), int(match.group("month")), 1)
+
+
+def list_partitions(cur: psycopg.Cursor, parent: str) -> List[str]:
+    """Returns the names of the partitions currently attached to `parent`."""
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        """,
+        (parent,),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def ensure_partitions(cur: psycopg.Cursor, parent: str, now: datetime, months_ahead: int) -> int:
+    """
+    Creates the monthly partitions of `parent` from the current month through `months_ahead`
+    months later, so inserts never fall through to the default partition. Returns how many were created.
+    """
+    existing = set(list_partitions(cur, parent))
+    created = 0
+    month = month_start(now)
+    for _ in range(months_ahead + 1):
+        name = partition_name(parent, month)
+        if name not in existing:
+            cur.execute(
+                sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM ({}) TO ({})").format(
+                    sql.Identifier(name),
+                    sql.Identifier(parent),
+                    sql.Literal(month.isoformat(sep=" ")),
+                    sql.Literal(add_months(month, 1).isoformat(sep=" ")),
+                )
+            )
+            logger.info(f"Created partition {name}")
+            created += 1
+        month = add_months(month, 1)
+    return created
+
+
+def drop_partitions_before(db: DatabaseManager, parent: str, cutoff: datetime) -> int:
+    """
+    Detaches and drops every monthly partition of `parent` whose whole month ends at or before
+    `cutoff`, which is much cheaper than deleting its rows. Returns how many were dropped.
+
+    Detaching locks the whole parent, so each partition gets its own short transaction (never the
+    caller's) with a lock timeout. A partition that cannot be locked in time is left for the next
+    compaction.
+    """
+    with db.transaction() as cur:
+        names = sorted(list_partitions(cur, parent))
+
+    dropped = 0
+    for name in names:
+        month = partition_month(parent, name)
+        if month is None or add_months(month, 1) > cutoff:
+            continue
+        try:
+            with db.transaction() as cur:
+                cur.execute(sql.SQL("SET LOCAL lock_timeout = {}").format(sql.Literal(DETACH_LOCK_TIMEOUT)))
+                cur.execute(
+                    sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(sql.Identifier(parent), sql.Identifier(name))
+                )
+                cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+        except psycopg.errors.LockNotAvailable:
+            logger.warning(f"Partition {name} is busy, leaving it for the next compaction")
+            continue
+        logger.info(f"Dropped partition {name}")
+        dropped += 1
+    return dropped
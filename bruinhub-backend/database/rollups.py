@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import psycopg
+
+from database.manager import DatabaseManager
+from config import CAPACITY_RAW_RETENTION_DAYS, CAPACITY_HOURLY_RETENTION_DAYS
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# How long raw samples and hourly rollups are kept once a coarser rollup covers them (None is forever)
+RAW_RETENTION = timedelta(days=CAPACITY_RAW_RETENTION_DAYS) if CAPACITY_RAW_RETENTION_DAYS > 0 else None
+HOURLY_RETENTION = timedelta(days=CAPACITY_HOURLY_RETENTION_DAYS) if CAPACITY_HOURLY_RETENTION_DAYS > 0 else None
+
+# Same origin the history queries pass to date_bin, so rollup buckets line up with theirs
+BUCKET_ORIGIN = datetime(2000, 1, 1)
+
+# Finished buckets that are recomputed on every run, to pick up late samples
+ROLLUP_LOOKBACK = 2
+
+
+class InvalidBucketError(ValueError):
+    """A history bucket finer than the rollups still holding part of the requested range."""
+
+
+def floor_to(ts: datetime, resolution: timedelta) -> datetime:
+    return BUCKET_ORIGIN + (ts - BUCKET_ORIGIN) // resolution * resolution
+
+
+def ceil_to(ts: datetime, resolution: timedelta) -> datetime:
+    floor = floor_to(ts, resolution)
+    return floor if floor == ts else floor + resolution
+
+
+def plan_history_sources(
+    start: datetime, end: datetime, bucket: timedelta, levels: List[Tuple[str, timedelta, Optional[datetime]]]
+) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Splits [start, end) into (source, from, to) segments, reading each part of the range from
+    the coarsest rollup that can serve it.
+
+    `levels` lists (name, resolution, rolled_until) from coarsest to finest. A rollup is used for
+    the whole buckets it has finished, if its resolution divides `bucket`; everything else falls
+    through to the next level and finally to the raw table ("raw").
+    """
+    if start >= end:
+        return []
+    if not levels:
+        return [("raw", start, end)]
+
+    (name, resolution, rolled_until), finer = levels[0], levels[1:]
+    if rolled_until is None or bucket % resolution:
+        return plan_history_sources(start, end, bucket, finer)
+
+    lo = ceil_to(start, resolution)
+    hi = min(floor_to(end, resolution), rolled_until)
+    if lo >= hi:
+        return plan_history_sources(start, end, bucket, finer)
+    return (
+        plan_history_sources(start, lo, bucket, finer)
+        + [(name, lo, hi)]
+        + plan_history_sources(hi, end, bucket, finer)
+    )
+
+
+def format_resolution(resolution: timedelta) -> str:
+    return f"{resolution // DAY}d" if resolution >= DAY else f"{resolution // HOUR}h"
+
+
+def check_bucket(start: datetime, bucket: timedelta, retained: List[Tuple[str, Optional[timedelta], Optional[datetime]]]):
+    """
+    Raises InvalidBucketError if history from `start` on is no longer kept finely enough for `bucket`.
+
+    `retained` lists (name, resolution, expired_before) from the raw table (resolution None) to
+    the coarsest rollup, where rows before `expired_before` may have been deleted (None if none
+    were). The finest level still covering `start` must have a resolution dividing `bucket`;
+    coarser ones are multiples of it, so they cannot serve the bucket either.
+    """
+    for name, resolution, expired_before in retained:
+        if expired_before is not None and start < expired_before:
+            continue
+        if resolution is not None and bucket % resolution:
+            raise InvalidBucketError(
+                f"History from {start.isoformat()} is only kept in {name} rollups, "
+                f"use a bucket that is a multiple of {format_resolution(resolution)}"
+            )
+        return
+
+
+def expiry_cutoff(
+    rolled_until: Optional[datetime], retention: Optional[timedelta], resolution: timedelta
+) -> Optional[datetime]:
+    """
+    Returns the time before which rows covered by a rollup finished until `rolled_until` may be
+    deleted, or None to keep everything. Rows inside the lookback window are always kept so they
+    can still be re-rolled.
+    """
+    if retention is None or rolled_until is None:
+        return None
+    return rolled_until - max(retention, ROLLUP_LOOKBACK * resolution)
+
+
+def get_rollup_watermarks(db_manager: DatabaseManager, names: List[str]) -> Dict[str, datetime]:
+    """Returns how far each named rollup is complete"""
+    rows = db_manager.fetch_all(
+        "SELECT name, rolled_until FROM capacity_rollup_state WHERE name = ANY(%s)", (names,)
+    )
+    return {name: rolled_until for name, rolled_until in rows}
+
+
+def run_rollup(cur: psycopg.Cursor, name: str, rollup_query: str, until_query: str, resolution: timedelta) -> int:
+    """
+    Aggregates every finished bucket since the rollup's watermark and advances the watermark.
+
+    `until_query` returns the exclusive end of the last finished bucket in the source, and
+    `rollup_query` upserts the buckets in [%(since)s, %(until)s). Returns the rows written.
+    """
+    cur.execute("SELECT rolled_until FROM capacity_rollup_state WHERE name = %s FOR UPDATE", (name,))
+    row = cur.fetchone()
+    rolled_until = row[0] if row else None
+
+    cur.execute(until_query)
+    row = cur.fetchone()
+    until = row[0] if row else None
+    if until is None:
+        return 0
+
+    since = rolled_until - ROLLUP_LOOKBACK * resolution if rolled_until else None
+    cur.execute(rollup_query, {"since": since, "until": until})
+    written = cur.rowcount
+
+    cur.execute(
+        """
+        INSERT INTO capacity_rollup_state (name, rolled_until) VALUES (%s, %s)
+        ON CONFLICT (name) DO UPDATE SET rolled_until = GREATEST(capacity_rollup_state.rolled_until, EXCLUDED.rolled_until)
+        """,
+        (name, until),
+    )
+    return written
+
+
+def get_expiry_cutoff(
+    cur: psycopg.Cursor, rollup_name: str, retention: Optional[timedelta], resolution: timedelta
+) -> Optional[datetime]:
+    """
+    Returns the time before which rows already covered by a rollup may be deleted (see `expiry_cutoff`).
+    """
+    if retention is None:
+        return None
+    cur.execute("SELECT rolled_until FROM capacity_rollup_state WHERE name = %s", (rollup_name,))
+    row = cur.fetchone()
+    return expiry_cutoff(row[0] if row else None, retention, resolution)
@@ -0,0 +1,116 @@
+import re
+from enum import IntFlag
+from functools import lru_cache
+from typing import Dict, List
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+
+class Attribute(IntFlag):
+    """
+    Dietary guarantees of a menu item, packed into one integer per item. A bit is only set when the
+    item is known to have the property, so items without it never match a filter needing it.
+    """
+    VEGETARIAN = 1 << 0
+    VEGAN = 1 << 1
+    GLUTEN_FREE = 1 << 2
+    MILK_FREE = 1 << 3
+    EGG_FREE = 1 << 4
+    FISH_FREE = 1 << 5
+    SHELLFISH_FREE = 1 << 6
+    TREE_NUT_FREE = 1 << 7
+    PEANUT_FREE = 1 << 8
+    WHEAT_FREE = 1 << 9
+    SOY_FREE = 1 << 10
+    SESAME_FREE = 1 << 11
+
+
+# Values accepted by `?diet=`, each a bit the item must have
+DIETS = {"vegetarian": Attribute.VEGETARIAN, "vegan": Attribute.VEGAN, "gluten-free": Attribute.GLUTEN_FREE}
+
+# Values accepted by `?exclude=`, each a bit the item must have to be known free of the allergen
+ALLERGENS = {
+    "milk": Attribute.MILK_FREE,
+    "dairy": Attribute.MILK_FREE,
+    "egg": Attribute.EGG_FREE,
+    "fish": Attribute.FISH_FREE,
+    "shellfish": Attribute.SHELLFISH_FREE,
+    "tree-nut": Attribute.TREE_NUT_FREE,
+    "peanut": Attribute.PEANUT_FREE,
+    "wheat": Attribute.WHEAT_FREE,
+    "gluten": Attribute.GLUTEN_FREE,
+    "soy": Attribute.SOY_FREE,
+    "sesame": Attribute.SESAME_FREE,
+}
+
+# Menus carry no dietary tags, so only explicit labels in an item name count. Words implying that an
+# ingredient is absent are never guessed: "Chocolate Chip Cookie" is neither vegan nor nut free.
+DIETARY_NOTE = (
+    "Dietary filters are inferred from menu item names: only items explicitly labelled (e.g. \"Vegan\", "
+    "\"Peanut Free\") match. Confirm allergens with dining hall staff."
+)
+
+# Label -> the guarantees it implies
+LABELS: Dict[str, Attribute] = {
+    "vegan": (
+        Attribute.VEGAN | Attribute.VEGETARIAN | Attribute.MILK_FREE | Attribute.EGG_FREE
+        | Attribute.FISH_FREE | Attribute.SHELLFISH_FREE
+    ),
+    "vegetarian": Attribute.VEGETARIAN | Attribute.FISH_FREE | Attribute.SHELLFISH_FREE,
+    "veggie": Attribute.VEGETARIAN | Attribute.FISH_FREE | Attribute.SHELLFISH_FREE,
+}
+# Word before "free" (as in "Peanut Free" or "peanut-free") -> the guarantees it implies
+FREE_LABELS: Dict[str, Attribute] = {
+    "gluten": Attribute.GLUTEN_FREE | Attribute.WHEAT_FREE,
+    "wheat": Attribute.WHEAT_FREE,
+    "dairy": Attribute.MILK_FREE,
+    "milk": Attribute.MILK_FREE,
+    "lactose": Attribute.MILK_FREE,
+    "egg": Attribute.EGG_FREE,
+    "fish": Attribute.FISH_FREE,
+    "shellfish": Attribute.SHELLFISH_FREE,
+    "nut": Attribute.TREE_NUT_FREE | Attribute.PEANUT_FREE,
+    "peanut": Attribute.PEANUT_FREE,
+    "soy": Attribute.SOY_FREE,
+    "sesame": Attribute.SESAME_FREE,
+    "allergen": (
+        Attribute.MILK_FREE | Attribute.EGG_FREE | Attribute.FISH_FREE | Attribute.SHELLFISH_FREE
+        | Attribute.TREE_NUT_FREE | Attribute.PEANUT_FREE | Attribute.WHEAT_FREE | Attribute.SOY_FREE
+        | Attribute.SESAME_FREE
+    ),
+}
+
+
+def _words(name: str) -> List[str]:
+    """Returns the lowercase words of a name in order, with plurals in their singular form."""
+    words = TOKEN_PATTERN.findall(name.lower())
+    return [word[:-1] if len(word) > 3 and word.endswith("s") else word for word in words]
+
+
+@lru_cache(maxsize=8192)
+def classify(name: str) -> int:
+    """
+    Returns the Attribute bits an item name guarantees.
+
+    Only labels count: "Vegan" and "Vegetarian" (or "Veggie"), and "<allergen> free" such as
+    "Gluten Free" or "Nut-Free". Anything else gets no bits, so unlabelled items are left out by
+    every `diet` and `exclude` filter.
+    """
+    words = _words(name)
+    bits = Attribute(0)
+    for position, word in enumerate(words):
+        if word in LABELS:
+            bits |= LABELS[word]
+        elif word == "free" and position > 0 and words[position - 1] in FREE_LABELS:
+            bits |= FREE_LABELS[words[position - 1]]
+    return int(bits)
+
+
+def parse_mask(value: str, names: Dict[str, Attribute]) -> int:
+    """Parses a comma separated list of attribute names into one mask, raising ValueError on unknown names."""
+    mask = 0
+    for name in filter(None, (part.strip().lower() for part in value.split(","))):
+        if name not in names:
+            raise ValueError(f"Unknown value '{name}', expected one of {', '.join(names)}")
+        mask |= names[name]
+    return mask
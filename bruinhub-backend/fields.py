@@ -0,0 +1,70 @@
+from typing import Dict, FrozenSet, Optional, Tuple
+
+# Top-level field -> its subfields (empty if it has none), in response order
+Schema = Dict[str, Tuple[str, ...]]
+# Requested top-level field -> requested subfields, None for all of them
+Fieldset = Dict[str, Optional[FrozenSet[str]]]
+
+GYM_FIELDS: Schema = {
+    "slug": (),
+    "regular_hours": (),
+    "special_hours": (),
+    "zones": ("capacity", "percentage", "last_updated"),
+    "last_updated": (),
+}
+DINING_FIELDS: Schema = {
+    "slug": (),
+    "capacity": (),
+    "menu": (),
+    "regular_hours": (),
+    "special_hours": (),
+    "last_updated": (),
+}
+# Every endpoint accepts the fields of any kind, each facility keeping those it has
+FACILITY_FIELDS: Dict[str, Schema] = {"gym": GYM_FIELDS, "dining": DINING_FIELDS}
+
+
+def parse_fields(value: str, schemas: Dict[str, Schema]) -> Dict[str, Fieldset]:
+    """
+    Parses a `fields` parameter such as `capacity,zones.percentage` into a fieldset per facility
+    kind. A field only needs to exist for one of the kinds; `slug` is always included. Raises
+    ValueError for fields no kind has.
+    """
+    fieldsets: Dict[str, Fieldset] = {kind: {"slug": None} for kind in schemas}
+    for name in filter(None, (part.strip() for part in value.split(","))):
+        field, _, subfield = name.partition(".")
+        known = False
+        for kind, schema in schemas.items():
+            if field not in schema or (subfield and subfield not in schema[field]):
+                continue
+            known = True
+            fieldset = fieldsets[kind]
+            if not subfield:
+                fieldset[field] = None
+            elif field not in fieldset or fieldset[field] is not None:
+                fieldset[field] = (fieldset.get(field) or frozenset()) | {subfield}
+        if not known:
+            raise ValueError(f"Unknown field '{name}'")
+    return fieldsets
+
+
+def fieldset_key(fieldset: Fieldset) -> str:
+    """Returns a canonical name for a fieldset, e.g. `slug,zones.percentage`."""
+    names = []
+    for field in sorted(fieldset):
+        subfields = fieldset[field]
+        names += [field] if subfields is None else [f"{field}.{subfield}" for subfield in sorted(subfields)]
+    return ",".join(names)
+
+
+def project(data: Dict, fieldset: Fieldset) -> Dict:
+    """Keeps only the requested fields of a facility, and the requested subfields of each nested entry."""
+    projected = {}
+    for field, subfields in fieldset.items():
+        if field not in data:
+            continue
+        value = data[field]
+        if subfields is not None and isinstance(value, dict):
+            value = {key: {name: item for name, item in entry.items() if name in subfields} for key, entry in value.items()}
+        projected[field] = value
+    return projected
@@ -0,0 +1,9 @@
+import hashlib
+import json
+from typing import Any
+
+
+def content_hash(value: Any) -> str:
+    """Returns a stable SHA-256 hex digest of a JSON-serializable value, independent of key order."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
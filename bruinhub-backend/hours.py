@@ -0,0 +1,133 @@
+import logging
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+# "6:00 AM - 1:00 AM", optionally followed by a label such as "(A)"
+RANGE_PATTERN = re.compile(
+    r"^\s*(\d{1,2}):(\d{2})\s*([AP]M)\s*-\s*(\d{1,2}):(\d{2})\s*([AP]M)\s*(?:\([^)]*\))?\s*$",
+    re.IGNORECASE,
+)
+
+
+def _to_minutes(hour: str, minute: str, meridiem: str) -> int:
+    hour = int(hour) % 12
+    if meridiem.upper() == "PM":
+        hour += 12
+    return hour * 60 + int(minute)
+
+
+def parse_hours(value: Optional[str]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parses an hours string into (open, close) minute offsets from the start of the day.
+
+    A close time at or before the open time runs past midnight, so "6:00 AM - 1:00 AM" becomes
+    (360, 1500). "CLOSED" is an empty list and "(A); (C)" alternatives are all kept. Returns None
+    if the string cannot be parsed.
+    """
+    if value is None:
+        return None
+    if value.strip().upper() == "CLOSED":
+        return []
+
+    intervals = []
+    for part in value.split(";"):
+        match = RANGE_PATTERN.match(part)
+        if not match:
+            logger.warning(f"Could not parse hours: {value!r}")
+            return None
+        start = _to_minutes(*match.group(1, 2, 3))
+        end = _to_minutes(*match.group(4, 5, 6))
+        if end <= start:
+            end += MINUTES_PER_DAY
+        intervals.append((start, end))
+    return sorted(intervals)
+
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Parsed intervals of one day, None if its hours are unknown
+DayIntervals = Optional[Tuple[Tuple[int, int], ...]]
+
+
+class CompiledHours:
+    """
+    A facility's hours parsed once: interval tuples per weekday plus per-date special overrides.
+
+    Intervals are the (open, close) minute offsets of `parse_hours`, so answering a query is a
+    couple of dictionary lookups and comparisons instead of parsing strings.
+    """
+
+    __slots__ = ("weekly", "special")
+
+    def __init__(self, weekly: Tuple[DayIntervals, ...], special: Dict[date, DayIntervals]):
+        self.weekly = weekly  # Monday first
+        self.special = special
+
+    def intervals(self, day: date) -> DayIntervals:
+        """Returns the opening periods that start on a date, special hours taking precedence"""
+        if day in self.special:
+            return self.special[day]
+        return self.weekly[day.weekday()]
+
+    def is_open(self, at: datetime) -> Optional[bool]:
+        """Returns whether the facility is open at a time, None if its hours are unknown"""
+        minute = at.hour * 60 + at.minute + (at.second + at.microsecond / 1e6) / 60
+        today = self.intervals(at.date())
+        # A period from the previous day can run past midnight
+        yesterday = self.intervals(at.date() - timedelta(days=1))
+        if today is None and yesterday is None:
+            return None
+        return any(start <= minute < end for start, end in today or ()) or any(
+            start <= minute + MINUTES_PER_DAY < end for start, end in yesterday or ()
+        )
+
+    def next_change(self, at: datetime, days: int = 8) -> Optional[datetime]:
+        """
+        Returns when the facility next closes if it is open at `at`, or next opens if it is closed.
+
+        Back to back and overlapping periods count as one. None if that is not within `days`.
+        """
+        midnight = datetime.combine(at.date(), time())
+        minute = (at - midnight).total_seconds() / 60
+        periods = sorted(
+            (start + offset * MINUTES_PER_DAY, end + offset * MINUTES_PER_DAY)
+            for offset in range(-1, days + 1)
+            for start, end in self.intervals(at.date() + timedelta(days=offset)) or ()
+        )
+
+        close = None
+        for start, end in periods:
+            if close is not None:
+                if start > close:
+                    break
+                close = max(close, end)
+            elif start <= minute < end:
+                close = end
+            elif start > minute:
+                return midnight + timedelta(minutes=start)
+        return midnight + timedelta(minutes=close) if close is not None else None
+
+
+def compile_hours(hours: Dict) -> CompiledHours:
+    """Parses a facility's regular and special hours, parsing each distinct string only once"""
+    parsed: Dict[Optional[str], DayIntervals] = {}
+
+    def parse(value: Optional[str]) -> DayIntervals:
+        if value not in parsed:
+            intervals = parse_hours(value)
+            parsed[value] = tuple(intervals) if intervals is not None else None
+        return parsed[value]
+
+    regular_hours = hours.get("regular_hours") or {}
+    special = {}
+    for day, value in (hours.get("special_hours") or {}).items():
+        try:
+            special[date.fromisoformat(day)] = parse(value)
+        except ValueError:
+            logger.warning(f"Ignoring special hours for invalid date: {day!r}")
+    return CompiledHours(tuple(parse(regular_hours.get(day)) for day in DAYS), special)
@@ -44,7 +44,7 @@ VALUES
     ('bruin-plate', '{}'::jsonb, '{}'::jsonb, '{}'::jsonb)
 ON CONFLICT (slug) DO NOTHING;
 
--- Insert initial capacity history
+-- Insert initial capacity history (only for halls that have none yet)
 INSERT INTO dining_capacity_history (hall_id, capacity, last_updated)
 SELECT id, capacity, NOW()
 FROM (
@@ -53,7 +53,10 @@ FROM (
         ('de-neve', 20),
         ('bruin-plate', 70)
 ) AS t(slug, capacity)
-JOIN dining_halls ON dining_halls.slug = t.slug;
+JOIN dining_halls ON dining_halls.slug = t.slug
+WHERE NOT EXISTS (
+    SELECT 1 FROM dining_capacity_history h WHERE h.hall_id = dining_halls.id
+);
 
 -- Ensure initial gyms exist
 INSERT INTO gyms (slug, regular_hours, special_hours)
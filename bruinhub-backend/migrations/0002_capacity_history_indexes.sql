@@ -0,0 +1,7 @@
+-- Indexes for latest-value lookups and time-range history queries
+CREATE INDEX IF NOT EXISTS idx_gym_capacity_history_zone_time
+    ON gym_capacity_history (gym_id, zone_name, last_updated DESC);
+CREATE INDEX IF NOT EXISTS idx_gym_capacity_history_time
+    ON gym_capacity_history (gym_id, last_updated);
+CREATE INDEX IF NOT EXISTS idx_dining_capacity_history_time
+    ON dining_capacity_history (hall_id, last_updated DESC);
@@ -0,0 +1,3 @@
+-- Content hashes of the JSONB payloads, so unchanged menus and hours are never rewritten
+ALTER TABLE dining_halls ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE gyms ADD COLUMN IF NOT EXISTS hours_hash VARCHAR(64);
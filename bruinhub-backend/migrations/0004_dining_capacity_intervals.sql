@@ -0,0 +1,37 @@
+-- Store dining capacity as run-length encoded intervals. Each row now holds one value from
+-- valid_from until last_updated (the last time it was observed, i.e. the interval's valid_to),
+-- and is extended in place while the value holds instead of appending a row per scrape.
+ALTER TABLE dining_capacity_history ADD COLUMN IF NOT EXISTS valid_from TIMESTAMP;
+UPDATE dining_capacity_history SET valid_from = last_updated WHERE valid_from IS NULL;
+
+-- Collapse existing runs of identical consecutive samples into a single interval per run
+WITH runs AS (
+    SELECT id, hall_id, capacity, last_updated,
+           ROW_NUMBER() OVER (PARTITION BY hall_id ORDER BY last_updated, id)
+         - ROW_NUMBER() OVER (PARTITION BY hall_id, capacity ORDER BY last_updated, id) AS run
+    FROM dining_capacity_history
+),
+intervals AS (
+    SELECT hall_id, capacity, run,
+           MIN(id) AS keep_id, MIN(last_updated) AS valid_from, MAX(last_updated) AS valid_to
+    FROM runs
+    GROUP BY hall_id, capacity, run
+),
+extended AS (
+    UPDATE dining_capacity_history h
+    SET valid_from = i.valid_from, last_updated = i.valid_to
+    FROM intervals i
+    WHERE h.id = i.keep_id
+)
+DELETE FROM dining_capacity_history h
+USING runs r
+JOIN intervals i ON i.hall_id = r.hall_id AND i.capacity = r.capacity AND i.run = r.run
+WHERE h.id = r.id AND h.id <> i.keep_id;
+
+ALTER TABLE dining_capacity_history
+    ALTER COLUMN valid_from SET DEFAULT CURRENT_TIMESTAMP,
+    ALTER COLUMN valid_from SET NOT NULL;
+
+-- Expanding intervals for history queries walks them in valid_from order
+CREATE INDEX IF NOT EXISTS idx_dining_capacity_history_valid_from
+    ON dining_capacity_history (hall_id, valid_from);
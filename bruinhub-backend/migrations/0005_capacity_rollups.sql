@@ -0,0 +1,43 @@
+-- Hourly and daily rollups of capacity history. Gym rollups keep sums and sample counts so
+-- they can be merged into any coarser bucket; dining rollups keep the time-weighted sum of
+-- capacity and the number of seconds it covers, and count intervals so they are not counted
+-- again in every bucket they span.
+CREATE TABLE IF NOT EXISTS gym_capacity_hourly (
+    gym_id INT REFERENCES gyms(id) ON DELETE CASCADE,
+    zone_name VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    samples INT NOT NULL,
+    sum_percentage BIGINT NOT NULL,
+    min_percentage INT NOT NULL,
+    max_percentage INT NOT NULL,
+    sum_capacity BIGINT NOT NULL,
+    min_capacity INT NOT NULL,
+    max_capacity INT NOT NULL,
+    PRIMARY KEY (gym_id, bucket, zone_name)
+);
+
+CREATE TABLE IF NOT EXISTS gym_capacity_daily (LIKE gym_capacity_hourly INCLUDING ALL);
+ALTER TABLE gym_capacity_daily
+    ADD FOREIGN KEY (gym_id) REFERENCES gyms(id) ON DELETE CASCADE;
+
+CREATE TABLE IF NOT EXISTS dining_capacity_hourly (
+    hall_id INT REFERENCES dining_halls(id) ON DELETE CASCADE,
+    bucket TIMESTAMP NOT NULL,
+    seconds DOUBLE PRECISION NOT NULL,
+    weighted_capacity DOUBLE PRECISION NOT NULL,  -- Sum of capacity * seconds held
+    min_capacity INT NOT NULL,
+    max_capacity INT NOT NULL,
+    started INT NOT NULL,  -- Intervals that start within the bucket
+    carried_in BOOLEAN NOT NULL,  -- Whether an earlier interval still holds at the bucket's start
+    PRIMARY KEY (hall_id, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS dining_capacity_daily (LIKE dining_capacity_hourly INCLUDING ALL);
+ALTER TABLE dining_capacity_daily
+    ADD FOREIGN KEY (hall_id) REFERENCES dining_halls(id) ON DELETE CASCADE;
+
+-- How far each rollup is complete (exclusive end of its last finished bucket)
+CREATE TABLE IF NOT EXISTS capacity_rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    rolled_until TIMESTAMP NOT NULL
+);
@@ -0,0 +1,90 @@
+-- Range partition capacity history by month, so indexes stay small, time-bounded queries only
+-- scan the months they cover and expired months are dropped instead of deleted row by row.
+-- Gym samples are partitioned on last_updated. Dining intervals are partitioned on valid_from,
+-- since last_updated moves forward every time an interval is extended.
+-- Partitions are named <table>_pYYYYMM (see database/partitions.py); rows outside every month
+-- land in <table>_default.
+
+-- Primary and unique keys of a partitioned table must include the partition key. The sample
+-- key still covers every column, so ON CONFLICT deduplication of gym samples is unchanged.
+ALTER TABLE gym_capacity_history RENAME TO gym_capacity_history_unpartitioned;
+DROP INDEX IF EXISTS idx_gym_capacity_history_zone_time;
+DROP INDEX IF EXISTS idx_gym_capacity_history_time;
+
+CREATE TABLE gym_capacity_history (
+    id INT NOT NULL DEFAULT nextval('gym_capacity_history_id_seq'),
+    gym_id INT REFERENCES gyms(id) ON DELETE CASCADE,
+    zone_name VARCHAR(100) NOT NULL,
+    capacity INT NOT NULL,
+    percentage INT NOT NULL,
+    last_updated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT gym_capacity_history_id_time_pkey PRIMARY KEY (id, last_updated),
+    CONSTRAINT gym_capacity_history_sample_key UNIQUE (gym_id, zone_name, capacity, percentage, last_updated)
+) PARTITION BY RANGE (last_updated);
+ALTER SEQUENCE gym_capacity_history_id_seq OWNED BY gym_capacity_history.id;
+
+CREATE INDEX idx_gym_capacity_history_zone_time
+    ON gym_capacity_history (gym_id, zone_name, last_updated DESC);
+CREATE INDEX idx_gym_capacity_history_time
+    ON gym_capacity_history (gym_id, last_updated);
+
+ALTER TABLE dining_capacity_history RENAME TO dining_capacity_history_unpartitioned;
+DROP INDEX IF EXISTS idx_dining_capacity_history_time;
+DROP INDEX IF EXISTS idx_dining_capacity_history_valid_from;
+
+CREATE TABLE dining_capacity_history (
+    id INT NOT NULL DEFAULT nextval('dining_capacity_history_id_seq'),
+    hall_id INT REFERENCES dining_halls(id) ON DELETE CASCADE,
+    capacity INT NOT NULL,
+    valid_from TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT dining_capacity_history_id_time_pkey PRIMARY KEY (id, valid_from)
+) PARTITION BY RANGE (valid_from);
+ALTER SEQUENCE dining_capacity_history_id_seq OWNED BY dining_capacity_history.id;
+
+-- Latest-value lookups walk this backwards, which only reaches older months when a hall has
+-- no interval in the newest one
+CREATE INDEX idx_dining_capacity_history_valid_from
+    ON dining_capacity_history (hall_id, valid_from);
+
+-- Create every month holding existing rows, through three months from now
+DO $$
+DECLARE
+    parent TEXT;
+    month TIMESTAMP;
+    first_month TIMESTAMP;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['gym_capacity_history', 'dining_capacity_history'] LOOP
+        IF parent = 'gym_capacity_history' THEN
+            SELECT date_trunc('month', MIN(last_updated)) INTO first_month FROM gym_capacity_history_unpartitioned;
+        ELSE
+            SELECT date_trunc('month', MIN(valid_from)) INTO first_month FROM dining_capacity_history_unpartitioned;
+        END IF;
+
+        FOR month IN
+            SELECT generate_series(
+                LEAST(COALESCE(first_month, 'infinity'), date_trunc('month', LOCALTIMESTAMP)),
+                date_trunc('month', LOCALTIMESTAMP) + INTERVAL '3 months',
+                INTERVAL '1 month'
+            )
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                parent || '_p' || to_char(month, 'YYYYMM'), parent, month, month + INTERVAL '1 month'
+            );
+        END LOOP;
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', parent || '_default', parent);
+    END LOOP;
+END $$;
+
+INSERT INTO gym_capacity_history (id, gym_id, zone_name, capacity, percentage, last_updated)
+SELECT id, gym_id, zone_name, capacity, percentage, last_updated
+FROM gym_capacity_history_unpartitioned
+WHERE last_updated IS NOT NULL;
+
+INSERT INTO dining_capacity_history (id, hall_id, capacity, valid_from, last_updated)
+SELECT id, hall_id, capacity, valid_from, last_updated
+FROM dining_capacity_history_unpartitioned;
+
+DROP TABLE gym_capacity_history_unpartitioned;
+DROP TABLE dining_capacity_history_unpartitioned;
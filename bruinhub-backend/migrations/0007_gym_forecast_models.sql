@@ -0,0 +1,10 @@
+-- Forecast parameters fitted offline per gym zone, so serving a forecast never reads history
+CREATE TABLE IF NOT EXISTS gym_forecast_models (
+    gym_id INT REFERENCES gyms(id) ON DELETE CASCADE,
+    zone_name VARCHAR(100) NOT NULL,
+    baseline DOUBLE PRECISION[] NOT NULL,  -- Mean percentage per hour of the week, Monday 00:00 first
+    decay DOUBLE PRECISION NOT NULL,  -- Hourly persistence of the deviation from the baseline
+    samples INT NOT NULL,
+    fitted_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (gym_id, zone_name)
+);
@@ -0,0 +1,23 @@
+-- Alert subscriptions and the notifications they produced
+CREATE TABLE IF NOT EXISTS alerts (
+    id SERIAL PRIMARY KEY,
+    subscriber VARCHAR(200) NOT NULL,
+    kind VARCHAR(20) NOT NULL CHECK (kind IN ('gym', 'dining')),
+    slug VARCHAR(50) NOT NULL,
+    zone_name VARCHAR(100),
+    condition VARCHAR(20) NOT NULL CHECK (condition IN ('below', 'above', 'opens', 'closes')),
+    threshold INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_triggered_at TIMESTAMP,
+    CHECK ((condition IN ('below', 'above')) = (threshold IS NOT NULL))
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_subscriber ON alerts (subscriber);
+
+CREATE TABLE IF NOT EXISTS alert_notifications (
+    id SERIAL PRIMARY KEY,
+    alert_id INT NOT NULL REFERENCES alerts(id) ON DELETE CASCADE,
+    message TEXT NOT NULL,
+    value INT,
+    triggered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_alert_notifications_alert ON alert_notifications (alert_id, id);
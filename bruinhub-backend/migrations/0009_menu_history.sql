@@ -0,0 +1,25 @@
+-- Append-only menu history. Item names are interned once in menu_items, each distinct menu is
+-- stored once as station -> item id arrays, and each day a hall served a menu points at it.
+CREATE TABLE IF NOT EXISTS menu_items (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_menu_items_lower_name ON menu_items (lower(name));
+
+CREATE TABLE IF NOT EXISTS dining_menu_versions (
+    id SERIAL PRIMARY KEY,
+    content_hash VARCHAR(64) NOT NULL UNIQUE,  -- Hash of `stations`, shared by identical menus
+    stations JSONB NOT NULL,  -- Station -> array of menu_items ids
+    item_ids INT[] NOT NULL  -- Every item id in `stations`, sorted and distinct
+);
+-- Finds the menus serving an item without reading `stations`
+CREATE INDEX IF NOT EXISTS idx_dining_menu_versions_items ON dining_menu_versions USING GIN (item_ids);
+
+CREATE TABLE IF NOT EXISTS dining_menu_days (
+    hall_id INT NOT NULL REFERENCES dining_halls(id) ON DELETE CASCADE,
+    menu_date DATE NOT NULL,
+    version_id INT NOT NULL REFERENCES dining_menu_versions(id),
+    recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (hall_id, menu_date, version_id)  -- A menu changed during the day keeps both versions
+);
+CREATE INDEX IF NOT EXISTS idx_dining_menu_days_version ON dining_menu_days (version_id, menu_date);
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# Threshold conditions compare a zone's percentage (gyms) or a hall's capacity (dining)
+THRESHOLD_CONDITIONS = ("below", "above")
+# Opening conditions fire when a facility's hours say it just opened or closed
+OPENING_CONDITIONS = ("opens", "closes")
+
+@dataclass
+class Alert:
+    """A subscriber's request to be notified when a facility crosses a condition."""
+    id: int
+    subscriber: str  # Opaque id of the device or user that registered the alert
+    kind: str  # "gym" or "dining"
+    slug: str
+    condition: str  # One of THRESHOLD_CONDITIONS or OPENING_CONDITIONS
+    zone_name: Optional[str] = None  # Gym zone a threshold applies to
+    threshold: Optional[int] = None
+    created_at: Optional[datetime] = None
+    last_triggered_at: Optional[datetime] = None
+
+@dataclass
+class AlertNotification:
+    """A single firing of an alert, shown on the notifications screen."""
+    id: int
+    alert_id: int
+    message: str
+    value: Optional[int]  # The reading that crossed the threshold, None for opening alerts
+    triggered_at: datetime
@@ -14,8 +14,9 @@ class DiningHall:
 
 @dataclass
 class DiningCapacityHistory:
-    """Tracks historical capacity changes for a dining hall."""
+    """An interval during which a dining hall's capacity held a single value."""
     id: int
     hall_id: int
     capacity: int
-    last_updated: datetime
+    last_updated: datetime  # Last time the value was observed (end of the interval)
+    valid_from: Optional[datetime] = None  # First time the value was observed
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 @dataclass
 class Gym:
@@ -20,3 +20,11 @@ class GymCapacityHistory:
     capacity: int
     percentage: int
     last_updated: datetime
+
+@dataclass
+class GymForecastModel:
+    """Fitted occupancy forecast parameters for one gym zone."""
+    baseline: List[float]  # Mean percentage for each hour of the week, Monday 00:00 first
+    decay: float  # Share of the current deviation from the baseline that persists an hour later
+    samples: int  # Hours of history the model was fitted on
+    fitted_at: datetime
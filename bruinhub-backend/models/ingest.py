@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+@dataclass
+class IngestStats:
+    """Counts of rows written, skipped as duplicates, or rejected by a bulk ingestion."""
+    inserted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    updated: int = 0
+    unchanged: int = 0  # Writes skipped because the content hash had not changed
+
+@dataclass
+class CompactionStats:
+    """Counts of rollup rows written, expired rows deleted and partitions managed by a compaction run."""
+    rolled_hourly: int = 0
+    rolled_daily: int = 0
+    expired_raw: int = 0
+    expired_hourly: int = 0
+    created_partitions: int = 0
+    dropped_partitions: int = 0  # Whole months of raw rows, not counted in expired_raw
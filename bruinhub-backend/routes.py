@@ -1,20 +1,150 @@
+import base64
+import json
 import logging
-from flask import Blueprint, jsonify
-from datetime import datetime
-from database.gyms import GymDatabase
-from database.dining import DiningDatabase
-from database import DatabaseManager
-import os
-from config import DATABASE_URL
+import re
+from dataclasses import asdict
+from flask import Blueprint, Response, jsonify, request
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from werkzeug.http import is_resource_modified
+from database import InvalidBucketError, get_db_layer
+from cache import Snapshot, snapshot_store, hours_index, menu_index, negotiate, project_snapshot
+from analytics import gym_popular_times, dining_popular_times, gym_forecasts
+from analytics.forecast import predict
+from alerts import alert_engine
+from dietary import DIETS, ALLERGENS, DIETARY_NOTE, parse_mask
+from fields import FACILITY_FIELDS, Fieldset, parse_fields, project
+from models.alerts import THRESHOLD_CONDITIONS, OPENING_CONDITIONS
+from tasks.scheduler import GYM_SCRAPE_JOB_ID, DINING_SCRAPE_JOB_ID, get_next_run_time
+from config import SCRAPE_INTERVAL, FORECAST_MAX_HOURS, MENU_SEARCH_MAX_RESULTS
 
 logger = logging.getLogger(__name__)
 
 api = Blueprint("api", __name__)
 
-# Initialize database managers
-db_manager = DatabaseManager(DATABASE_URL)
-gym_db = GymDatabase(db_manager)
-dining_db = DiningDatabase(db_manager)
+
+def get_snapshot(kind: str, slug: str, loader: Callable[[str], Dict]) -> Optional[Snapshot]:
+    """Returns the cached snapshot for a facility, loading it from the database on a miss."""
+    snapshot = snapshot_store.get(kind, slug)
+    if snapshot is None:
+        data = loader(slug)
+        if not data:
+            return None
+        snapshot = snapshot_store.set(kind, slug, data)
+    return snapshot
+
+
+def parse_fieldsets() -> Optional[Dict[str, Fieldset]]:
+    """
+    Parses the optional `fields` parameter into a fieldset per facility kind, None meaning every
+    field. Fields of any kind are accepted, so one `fields` works for every endpoint.
+    """
+    if "fields" not in request.args:
+        return None
+    return parse_fields(request.args["fields"], FACILITY_FIELDS)
+
+
+def get_projected(
+    kind: str, slug: str, fieldset: Fieldset, loader: Callable[..., Dict[str, Dict]]
+) -> Tuple[Optional[Snapshot], Optional[Dict]]:
+    """
+    Returns some fields of a facility as (snapshot, data). A cached snapshot is projected, keeping
+    validators and pre-encoded bodies; on a miss only their columns are read, the snapshot is None
+    and nothing is cached.
+    """
+    snapshot = snapshot_store.get(kind, slug)
+    if snapshot is not None:
+        projected = project_snapshot(snapshot, fieldset)
+        return projected, projected.data
+    return None, loader([slug], fieldset).get(slug)
+
+
+def snapshot_response(snapshot: Snapshot, job_id: str) -> Response:
+    """
+    Builds the response for a snapshot, honouring If-None-Match / If-Modified-Since.
+
+    The body was serialized and compressed when the snapshot changed; the encoding is picked from
+    Accept-Encoding, and each compressed variant gets its own ETag. Clients may cache the response
+    until the next scheduled scrape of its data.
+    """
+    encoding, body = negotiate(request.accept_encodings, snapshot.body)
+    etag = snapshot.etag if encoding == "identity" else f"{snapshot.etag}-{encoding}"
+    if is_resource_modified(request.environ, etag=etag, last_modified=snapshot.last_modified):
+        response = Response(body, mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    else:
+        response = Response(status=304)
+    response.vary.add("Accept-Encoding")
+
+    now = datetime.now(timezone.utc)
+    next_run = get_next_run_time(job_id)
+    if next_run is None:
+        # No scheduler in this process, assume the snapshot was stored by the last scrape
+        max_age = SCRAPE_INTERVAL - (now - snapshot.stored_at).total_seconds()
+    else:
+        max_age = (next_run - now).total_seconds()
+
+    response.set_etag(etag)
+    response.last_modified = snapshot.last_modified
+    response.cache_control.max_age = max(0, int(max_age))
+    return response
+
+
+BUCKET_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+MIN_BUCKET = timedelta(minutes=1)
+MAX_HISTORY_PAGE = 5000
+
+
+def parse_bucket(value: str) -> timedelta:
+    """Parses a bucket size such as `15m`, `1h` or `1d`."""
+    match = re.fullmatch(r"(\d+)([smhd])", value.strip())
+    if not match:
+        raise ValueError(f"Invalid bucket '{value}', expected e.g. 15m, 1h or 1d")
+
+    bucket = timedelta(seconds=int(match.group(1)) * BUCKET_UNITS[match.group(2)])
+    if bucket < MIN_BUCKET:
+        raise ValueError(f"Bucket must be at least {int(MIN_BUCKET.total_seconds())}s")
+    return bucket
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parses an ISO 8601 timestamp, converting aware timestamps to naive UTC like the stored ones."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_history_args() -> Tuple[datetime, datetime, timedelta, int]:
+    """Reads `from`, `to`, `bucket` and `limit` for a history query, defaulting to the last day."""
+    end = parse_timestamp(request.args["to"]) if "to" in request.args else datetime.utcnow()
+    start = parse_timestamp(request.args["from"]) if "from" in request.args else end - timedelta(days=1)
+    if start >= end:
+        raise ValueError("'from' must be before 'to'")
+
+    bucket = parse_bucket(request.args.get("bucket", "15m"))
+    limit = min(int(request.args.get("limit", "500")), MAX_HISTORY_PAGE)
+    if limit <= 0:
+        raise ValueError("'limit' must be positive")
+    return start, end, bucket, limit
+
+
+def encode_cursor(*values) -> str:
+    """Encodes a keyset pagination position as an opaque string."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, length: int) -> List[str]:
+    """Decodes a cursor produced by `encode_cursor` from `length` strings, raising ValueError for anything else."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != length or not all(isinstance(value, str) for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
 
 @api.route("/v1/gym/<slug>", methods=["GET"])
 def get_gym_data(slug: str):
@@ -24,12 +154,159 @@ def get_gym_data(slug: str):
     Example:
     - `/v1/gym/bfit` → Returns data for BFIT gym.
     - `/v1/gym/john-wooden-center` → Returns data for Wooden Center.
+    - `/v1/gym/bfit?fields=zones.percentage` → Returns only the percentage of each BFIT zone.
+    """
+    try:
+        fieldsets = parse_fieldsets()
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    db = get_db_layer()
+    if fieldsets is None:
+        snapshot = get_snapshot("gym", slug, db.gyms.get_gym_latest)
+        data = snapshot.data if snapshot is not None else None
+    else:
+        snapshot, data = get_projected("gym", slug, fieldsets["gym"], db.gyms.get_gyms_latest)
+    if data is None:
+        return jsonify({"error": "Gym not found", "timestamp": datetime.now().isoformat()}), 404
+
+    if snapshot is None:
+        return jsonify({"data": data, "timestamp": datetime.now().isoformat()})
+    return snapshot_response(snapshot, GYM_SCRAPE_JOB_ID)
+
+
+@api.route("/v1/gym/<slug>/history", methods=["GET"])
+def get_gym_history(slug: str):
+    """
+    Get downsampled capacity history for a gym's zones.
+
+    Example:
+    - `/v1/gym/bfit/history?from=2025-02-01T00:00&to=2025-02-08T00:00&bucket=15m`
+    - `/v1/gym/bfit/history?zone=Weight Room&bucket=1h&cursor=...` → Next page for one zone.
+    """
+    try:
+        start, end, bucket, limit = parse_history_args()
+        after = None
+        if "cursor" in request.args:
+            bucket_start, zone_name = decode_cursor(request.args["cursor"], 2)
+            after = (datetime.fromisoformat(bucket_start), zone_name)
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    try:
+        history = get_db_layer().gyms.get_gym_capacity_history(
+            slug, start, end, bucket, limit, zone_name=request.args.get("zone"), after=after
+        )
+    except InvalidBucketError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+    if history is None:
+        return jsonify({"error": "Gym not found", "timestamp": datetime.now().isoformat()}), 404
+
+    next_cursor = None
+    if len(history) == limit:
+        next_cursor = encode_cursor(history[-1]["bucket"], history[-1]["zone_name"])
+
+    return jsonify({"data": history, "next_cursor": next_cursor, "timestamp": datetime.now().isoformat()})
+
+
+@api.route("/v1/gym/<slug>/popular-times", methods=["GET"])
+def get_gym_popular_times(slug: str):
+    """
+    Get the average occupancy percentage of each zone by hour of the week.
+
+    Example:
+    - `/v1/gym/bfit/popular-times` → `zones["Weight Room"]["Monday"][17]` is the average at 5-6 PM.
+    """
+    gyms = get_db_layer().gyms
+    if gyms.get_gym_id(slug) is None:
+        return jsonify({"error": "Gym not found", "timestamp": datetime.now().isoformat()}), 404
+
+    gym_popular_times.ensure_loaded(gyms.get_hourly_percentages)
+    return jsonify(
+        {"data": {"slug": slug, "zones": gym_popular_times.get(slug)}, "timestamp": datetime.now().isoformat()}
+    )
+
+
+@api.route("/v1/gym/<slug>/forecast", methods=["GET"])
+def get_gym_forecast(slug: str):
+    """
+    Get the predicted occupancy percentage of each zone for the next few hours.
+
+    Example:
+    - `/v1/gym/bfit/forecast?hours=3` → Predictions at the start of each of the next 3 hours.
     """
-    data = gym_db.get_gym_latest(slug)
-    if not data:
+    try:
+        hours = int(request.args.get("hours", "3"))
+    except ValueError:
+        hours = 0
+    if not 1 <= hours <= FORECAST_MAX_HOURS:
+        return jsonify(
+            {"error": f"'hours' must be between 1 and {FORECAST_MAX_HOURS}", "timestamp": datetime.now().isoformat()}
+        ), 400
+
+    gyms = get_db_layer().gyms
+    snapshot = get_snapshot("gym", slug, gyms.get_gym_latest)
+    if snapshot is None:
         return jsonify({"error": "Gym not found", "timestamp": datetime.now().isoformat()}), 404
 
-    return jsonify({"data": data, "timestamp": datetime.now().isoformat()})
+    # The fitted models and the latest reading are enough, the history is never read
+    gym_forecasts.ensure_loaded(gyms.get_forecast_models)
+    now = datetime.now()
+    zones = {}
+    for zone_name, model in gym_forecasts.get(slug).items():
+        reading = snapshot.data["zones"].get(zone_name)
+        zones[zone_name] = predict(
+            model, now, hours,
+            current=reading["percentage"] if reading else None,
+            observed_at=datetime.fromisoformat(reading["last_updated"]) if reading else None,
+        )
+
+    return jsonify({"data": {"slug": slug, "zones": zones}, "timestamp": now.isoformat()})
+
+
+@api.route("/v1/dining/search", methods=["GET"])
+def search_dining_menus():
+    """
+    Finds menu items across every dining hall. Each word of `q` must match a word of the item
+    or its station, in full or as a prefix; `fuzzy=true` also allows one typo per word.
+
+    Example:
+    - `/v1/dining/search?q=shrimp alf` → `[{"slug": "epicuria", "station": "Capri", "item": "Shrimp Alfredo Pasta"}]`
+    - `/v1/dining/search?q=lamb&fuzzy=true&limit=5`
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Missing q parameter", "timestamp": datetime.now().isoformat()}), 400
+    try:
+        limit = int(request.args.get("limit", "20"))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MENU_SEARCH_MAX_RESULTS:
+        return jsonify(
+            {"error": f"'limit' must be between 1 and {MENU_SEARCH_MAX_RESULTS}", "timestamp": datetime.now().isoformat()}
+        ), 400
+    fuzzy = request.args.get("fuzzy", "false").lower() in ("1", "true", "yes")
+
+    menu_index.ensure_loaded(get_db_layer().dining.get_dining_halls_menus)
+    results = menu_index.search(query, limit=limit, fuzzy=fuzzy)
+    return jsonify({"data": results, "timestamp": datetime.now().isoformat()})
+
+
+@api.route("/v1/dining/item-history", methods=["GET"])
+def get_dining_item_history():
+    """
+    Finds when a menu item was last served, from the menu history.
+
+    Example:
+    - `/v1/dining/item-history?item=DFC&slug=de-neve` → When De Neve last served DFC.
+    - `/v1/dining/item-history?item=Braised Lamb` → The last day any hall had Braised Lamb.
+    """
+    item = request.args.get("item", "").strip()
+    if not item:
+        return jsonify({"error": "Missing item parameter", "timestamp": datetime.now().isoformat()}), 400
+
+    served = get_db_layer().dining.get_item_served(item, date.today(), slug=request.args.get("slug") or None)
+    return jsonify({"data": {"item": item, **served}, "timestamp": datetime.now().isoformat()})
 
 
 @api.route("/v1/dining/<slug>", methods=["GET"])
@@ -40,12 +317,403 @@ def get_dining_hall(slug: str):
     Example:
     - `/v1/dining/epicuria` → Returns data for Epicuria dining hall.
     - `/v1/dining/de-neve` → Returns data for De Neve.
+    - `/v1/dining/epicuria?diet=vegan&exclude=peanut,soy` → Only menu items labelled with every diet
+      and as free of every excluded allergen.
+    - `/v1/dining/epicuria?fields=capacity` → Returns only the capacity, without reading the menu.
     """
     logger.info(f"Fetching dining hall data for {slug}")
+    try:
+        # Excluding an allergen keeps the items known to be free of it
+        required = parse_mask(request.args.get("diet", ""), DIETS)
+        required |= parse_mask(request.args.get("exclude", ""), ALLERGENS)
+        fieldsets = parse_fieldsets()
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
 
-    data = dining_db.get_dining_hall_latest(slug)
-    if not data:
+    db = get_db_layer()
+    if fieldsets is None:
+        snapshot = get_snapshot("dining", slug, db.dining.get_dining_hall_latest)
+        data = snapshot.data if snapshot is not None else None
+    else:
+        snapshot, data = get_projected("dining", slug, fieldsets["dining"], db.dining.get_dining_halls_latest)
+    if data is None:
         logger.warning(f"Dining hall '{slug}' not found")
         return jsonify({"error": "Dining hall not found"}), 404
 
-    return jsonify({"data": data, "timestamp": datetime.now().isoformat()})
+    if not required or "menu" not in data:
+        if snapshot is None:
+            return jsonify({"data": data, "timestamp": datetime.now().isoformat()})
+        return snapshot_response(snapshot, DINING_SCRAPE_JOB_ID)
+
+    # Filter with the precomputed dietary bits of the indexed menu
+    menu_index.ensure_loaded(db.dining.get_dining_halls_menus)
+    menu = menu_index.filter_menu(slug, required)
+    if menu is None:
+        menu_index.update(slug, data["menu"])
+        menu = menu_index.filter_menu(slug, required)
+    return jsonify(
+        {"data": {**data, "menu": menu}, "dietary_note": DIETARY_NOTE, "timestamp": datetime.now().isoformat()}
+    )
+
+
+def parse_slugs(param: str) -> Optional[List[str]]:
+    """Parses a comma separated `slugs` parameter, None standing for `all`."""
+    if param == "all":
+        return None
+    return list(dict.fromkeys(slug.strip() for slug in param.split(",") if slug.strip()))
+
+
+def get_latest_facilities(
+    slugs: Optional[List[str]], fieldsets: Optional[Dict[str, Fieldset]] = None
+) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """
+    Returns the latest (gyms, dining halls) among `slugs`, or every facility if None.
+
+    Cached snapshots are used where possible; everything else is fetched with one set-based query
+    per facility type and stored in the cache. With `fieldsets`, snapshots are projected and the
+    queries only read the requested columns, so their partial results are not cached.
+    """
+    if fieldsets is not None:
+        return get_projected_facilities(slugs, fieldsets)
+    if slugs is None:
+        db = get_db_layer()
+        # Fetch every facility with one query per table and refresh the cache with the results
+        gyms = db.gyms.get_gyms_latest()
+        dining = db.dining.get_dining_halls_latest()
+        for slug, data in gyms.items():
+            snapshot_store.set("gym", slug, data)
+        for slug, data in dining.items():
+            snapshot_store.set("dining", slug, data)
+        return gyms, dining
+
+    gyms, dining, misses = {}, {}, []
+    for slug in slugs:
+        gym_snapshot = snapshot_store.get("gym", slug)
+        dining_snapshot = snapshot_store.get("dining", slug)
+        if gym_snapshot:
+            gyms[slug] = gym_snapshot.data
+        elif dining_snapshot:
+            dining[slug] = dining_snapshot.data
+        else:
+            misses.append(slug)
+
+    if misses:
+        # Resolve every cache miss with one set-based query per facility type
+        db = get_db_layer()
+        for slug, data in db.gyms.get_gyms_latest(misses).items():
+            gyms[slug] = snapshot_store.set("gym", slug, data).data
+        for slug, data in db.dining.get_dining_halls_latest(misses).items():
+            dining[slug] = snapshot_store.set("dining", slug, data).data
+    return gyms, dining
+
+
+def get_projected_facilities(
+    slugs: Optional[List[str]], fieldsets: Dict[str, Fieldset]
+) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Like `get_latest_facilities`, but only returns the fields in `fieldsets` and caches nothing."""
+    db = get_db_layer()
+    if slugs is None:
+        return (
+            db.gyms.get_gyms_latest(fields=fieldsets["gym"]),
+            db.dining.get_dining_halls_latest(fields=fieldsets["dining"]),
+        )
+
+    gyms, dining, misses = {}, {}, []
+    for slug in slugs:
+        gym_snapshot = snapshot_store.get("gym", slug)
+        dining_snapshot = snapshot_store.get("dining", slug)
+        if gym_snapshot:
+            gyms[slug] = project(gym_snapshot.data, fieldsets["gym"])
+        elif dining_snapshot:
+            dining[slug] = project(dining_snapshot.data, fieldsets["dining"])
+        else:
+            misses.append(slug)
+
+    if misses:
+        gyms.update(db.gyms.get_gyms_latest(misses, fieldsets["gym"]))
+        dining.update(db.dining.get_dining_halls_latest(misses, fieldsets["dining"]))
+    return gyms, dining
+
+
+@api.route("/v1/facilities", methods=["GET"])
+def get_facilities():
+    """
+    Retrieves the latest data for many gyms and dining halls in one request.
+
+    Example:
+    - `/v1/facilities?slugs=bfit,epicuria` → Returns BFIT and Epicuria.
+    - `/v1/facilities?slugs=all` → Returns every gym and dining hall.
+    - `/v1/facilities?slugs=all&fields=capacity,zones.percentage` → Returns only dining hall
+      capacities and gym zone percentages.
+    """
+    param = request.args.get("slugs", "").strip()
+    if not param:
+        return jsonify({"error": "Missing slugs parameter", "timestamp": datetime.now().isoformat()}), 400
+    try:
+        fieldsets = parse_fieldsets()
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    slugs = parse_slugs(param)
+    gyms, dining = get_latest_facilities(slugs, fieldsets)
+    if slugs is None:
+        return jsonify({"data": {"gyms": gyms, "dining": dining}, "timestamp": datetime.now().isoformat()})
+
+    not_found = [slug for slug in slugs if slug not in gyms and slug not in dining]
+    return jsonify(
+        {
+            "data": {"gyms": gyms, "dining": dining},
+            "not_found": not_found,
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
+def load_facility_hours() -> List[Tuple[str, str, Dict]]:
+    """Returns the (kind, slug, hours) of every gym and dining hall."""
+    db = get_db_layer()
+    return [("gym", slug, hours) for slug, hours in db.gyms.get_gyms_hours().items()] + [
+        ("dining", slug, hours) for slug, hours in db.dining.get_dining_halls_hours().items()
+    ]
+
+
+@api.route("/v1/open-now", methods=["GET"])
+def get_open_now():
+    """
+    Reports which gyms and dining halls are open, and when each next opens or closes.
+
+    Answered from the compiled hours index, which is only rebuilt when stored hours change.
+    Timestamps are in campus local time; an `at` with a UTC offset is converted to it.
+
+    Example:
+    - `/v1/open-now` → `data["gyms"]["bfit"] == {"open": true, "closes_at": "2025-11-18T01:00:00"}`
+    - `/v1/open-now?at=2025-11-27T12:00` → Which facilities are open at noon on Thanksgiving.
+    """
+    try:
+        at = datetime.fromisoformat(request.args["at"]) if "at" in request.args else datetime.now()
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+    if at.tzinfo is not None:
+        at = at.astimezone().replace(tzinfo=None)
+
+    hours_index.ensure_loaded(load_facility_hours)
+    facilities = hours_index.open_at(at)
+    return jsonify(
+        {
+            "data": {"gyms": facilities.get("gym", {}), "dining": facilities.get("dining", {})},
+            "at": at.isoformat(),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
+@api.route("/v1/dining/<slug>/history", methods=["GET"])
+def get_dining_history(slug: str):
+    """
+    Get downsampled capacity history for a dining hall.
+
+    Example:
+    - `/v1/dining/epicuria/history?from=2025-02-01T00:00&bucket=1h`
+    """
+    try:
+        start, end, bucket, limit = parse_history_args()
+        after = None
+        if "cursor" in request.args:
+            (bucket_start,) = decode_cursor(request.args["cursor"], 1)
+            after = datetime.fromisoformat(bucket_start)
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    try:
+        history = get_db_layer().dining.get_dining_capacity_history(slug, start, end, bucket, limit, after=after)
+    except InvalidBucketError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+    if history is None:
+        return jsonify({"error": "Dining hall not found"}), 404
+
+    next_cursor = encode_cursor(history[-1]["bucket"]) if len(history) == limit else None
+    return jsonify({"data": history, "next_cursor": next_cursor, "timestamp": datetime.now().isoformat()})
+
+
+@api.route("/v1/dining/<slug>/menu", methods=["GET"])
+def get_dining_menu(slug: str):
+    """
+    Get the menu a dining hall served on a past (or recorded future) day.
+
+    Example:
+    - `/v1/dining/epicuria/menu?date=2025-11-17`
+    """
+    try:
+        menu_date = date.fromisoformat(request.args["date"]) if "date" in request.args else date.today()
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    menu = get_db_layer().dining.get_menu_on(slug, menu_date)
+    if menu is None:
+        return jsonify({"error": "No menu recorded", "timestamp": datetime.now().isoformat()}), 404
+    return jsonify(
+        {"data": {"slug": slug, "date": menu_date.isoformat(), "menu": menu}, "timestamp": datetime.now().isoformat()}
+    )
+
+
+@api.route("/v1/dining/<slug>/popular-times", methods=["GET"])
+def get_dining_popular_times(slug: str):
+    """
+    Get a dining hall's average capacity by hour of the week.
+
+    Example:
+    - `/v1/dining/epicuria/popular-times` → `capacity["Friday"][12]` is the average at noon.
+    """
+    dining = get_db_layer().dining
+    if dining.get_dining_hall_id(slug) is None:
+        return jsonify({"error": "Dining hall not found"}), 404
+
+    dining_popular_times.ensure_loaded(dining.get_hourly_capacities)
+    profile = dining_popular_times.get(slug).get("capacity")
+    return jsonify({"data": {"slug": slug, "capacity": profile}, "timestamp": datetime.now().isoformat()})
+
+
+MAX_SUBSCRIBER_LENGTH = 200
+
+
+def to_json(record) -> Dict:
+    """Converts an alert or notification dataclass to a dict with ISO 8601 timestamps."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in asdict(record).items()
+    }
+
+
+def get_subscriber() -> str:
+    """Returns the `subscriber` query parameter, raising ValueError if it is missing."""
+    subscriber = request.args.get("subscriber", "").strip()
+    if not subscriber:
+        raise ValueError("Missing subscriber parameter")
+    return subscriber
+
+
+def parse_alert(body: Dict) -> Dict:
+    """Validates the JSON body of a new alert, raising ValueError on the first problem."""
+    if not isinstance(body, dict):
+        raise ValueError("Expected a JSON object")
+    subscriber = body.get("subscriber")
+    if not isinstance(subscriber, str) or not subscriber.strip() or len(subscriber) > MAX_SUBSCRIBER_LENGTH:
+        raise ValueError("'subscriber' must be a non-empty string")
+    kind = body.get("kind")
+    if kind not in ("gym", "dining"):
+        raise ValueError("'kind' must be 'gym' or 'dining'")
+    slug = body.get("slug")
+    if not isinstance(slug, str) or not slug:
+        raise ValueError("'slug' must be a non-empty string")
+
+    condition = body.get("condition")
+    zone_name = body.get("zone_name")
+    threshold = body.get("threshold")
+    if condition in OPENING_CONDITIONS:
+        zone_name, threshold = None, None
+    elif condition in THRESHOLD_CONDITIONS:
+        if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 0:
+            raise ValueError("'threshold' must be a non-negative integer")
+        if kind == "gym":
+            if threshold > 100:
+                raise ValueError("Gym thresholds are percentages between 0 and 100")
+            if not isinstance(zone_name, str) or not zone_name:
+                raise ValueError("Gym thresholds need a 'zone_name'")
+        else:
+            zone_name = None
+    else:
+        raise ValueError(f"'condition' must be one of {', '.join(THRESHOLD_CONDITIONS + OPENING_CONDITIONS)}")
+
+    return {
+        "subscriber": subscriber.strip(), "kind": kind, "slug": slug, "condition": condition,
+        "zone_name": zone_name, "threshold": threshold,
+    }
+
+
+@api.route("/v1/alerts", methods=["POST"])
+def create_alert():
+    """
+    Registers an alert, checked against every scrape from then on.
+
+    Example body:
+    - `{"subscriber": "device-1", "kind": "gym", "slug": "bfit", "zone_name": "Weight Room", "condition": "below", "threshold": 40}`
+    - `{"subscriber": "device-1", "kind": "dining", "slug": "epicuria", "condition": "opens"}`
+    """
+    try:
+        fields = parse_alert(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    db = get_db_layer()
+    if fields["kind"] == "gym" and db.gyms.get_gym_id(fields["slug"]) is None:
+        return jsonify({"error": "Gym not found", "timestamp": datetime.now().isoformat()}), 404
+    if fields["kind"] == "dining" and db.dining.get_dining_hall_id(fields["slug"]) is None:
+        return jsonify({"error": "Dining hall not found", "timestamp": datetime.now().isoformat()}), 404
+
+    alert = db.alerts.create_alert(**fields)
+    if alert is None:
+        return jsonify({"error": "Could not save the alert", "timestamp": datetime.now().isoformat()}), 500
+
+    # Adding is idempotent, and a later load replaces it with the same alert from the database
+    alert_engine.add(alert)
+    return jsonify({"data": to_json(alert), "timestamp": datetime.now().isoformat()}), 201
+
+
+@api.route("/v1/alerts", methods=["GET"])
+def get_alerts():
+    """
+    Lists a subscriber's alerts.
+
+    Example:
+    - `/v1/alerts?subscriber=device-1`
+    """
+    try:
+        subscriber = get_subscriber()
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    alerts = get_db_layer().alerts.get_subscriber_alerts(subscriber)
+    return jsonify({"data": [to_json(alert) for alert in alerts], "timestamp": datetime.now().isoformat()})
+
+
+@api.route("/v1/alerts/<int:alert_id>", methods=["DELETE"])
+def delete_alert(alert_id: int):
+    """
+    Deletes one of a subscriber's alerts.
+
+    Example:
+    - `DELETE /v1/alerts/12?subscriber=device-1`
+    """
+    try:
+        subscriber = get_subscriber()
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    if not get_db_layer().alerts.delete_alert(alert_id, subscriber):
+        return jsonify({"error": "Alert not found", "timestamp": datetime.now().isoformat()}), 404
+    alert_engine.remove(alert_id)
+    return Response(status=204)
+
+
+@api.route("/v1/alerts/notifications", methods=["GET"])
+def get_alert_notifications():
+    """
+    Lists the notifications fired by a subscriber's alerts, oldest first.
+
+    Pass the id of the last notification seen as `after` to fetch only newer ones.
+
+    Example:
+    - `/v1/alerts/notifications?subscriber=device-1&after=40`
+    """
+    try:
+        subscriber = get_subscriber()
+        after = request.args.get("after", "0")
+        if not after.isdigit():
+            raise ValueError("'after' must be a notification id")
+    except ValueError as e:
+        return jsonify({"error": str(e), "timestamp": datetime.now().isoformat()}), 400
+
+    notifications = get_db_layer().alerts.get_notifications(subscriber, int(after))
+    return jsonify(
+        {"data": [to_json(notification) for notification in notifications], "timestamp": datetime.now().isoformat()}
+    )
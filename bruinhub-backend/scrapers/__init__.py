@@ -1 +1,2 @@
+from .engine import ScrapeEngine, scrape_engine
 from .gyms import GymScrapers
@@ -0,0 +1,114 @@
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from config import SCRAPE_TIMEOUT, SCRAPE_CONNECT_TIMEOUT, SCRAPE_MAX_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeEngine:
+    """
+    Fetches upstream pages concurrently on a background asyncio event loop.
+
+    One aiohttp session is kept for the life of the process, so connections to the UCLA hosts
+    stay alive between scrape cycles. Every request has a timeout and at most `max_concurrency`
+    requests are in flight at once. The blocking methods can be called from any scheduler thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = SCRAPE_MAX_CONCURRENCY,
+        timeout: float = SCRAPE_TIMEOUT,
+        connect_timeout: float = SCRAPE_CONNECT_TIMEOUT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Starts the event loop thread on first use"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="scrape-engine", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Only touched from the loop thread, so no locking is needed here
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _fetch(self, url: str, as_json: bool) -> Any:
+        session = await self._get_session()
+        async with self._semaphore:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                if as_json:
+                    # Some UCLA endpoints serve JSON with a text/html content type
+                    return await response.json(content_type=None)
+                return await response.text()
+
+    async def _fetch_all(self, urls: Dict[str, str], as_json: bool) -> Dict[str, Any]:
+        names = list(urls)
+        responses = await asyncio.gather(
+            *(self._fetch(urls[name], as_json) for name in names), return_exceptions=True
+        )
+        results = {}
+        for name, response in zip(names, responses):
+            if isinstance(response, BaseException):
+                logger.error(f"Error fetching {name} ({urls[name]}): {response!r}")
+                results[name] = None
+            else:
+                results[name] = response
+        return results
+
+    def fetch_many(self, urls: Dict[str, str], as_json: bool = False) -> Dict[str, Any]:
+        """
+        Fetches every url concurrently and returns {name: body}. A source that fails or times out
+        maps to None, so one slow page never holds back the others for longer than the timeout.
+        """
+        if not urls:
+            return {}
+        future = asyncio.run_coroutine_threadsafe(self._fetch_all(urls, as_json), self._ensure_loop())
+        return future.result()
+
+    def fetch_json(self, url: str) -> Any:
+        """Fetches and decodes a single JSON document, None on failure"""
+        return self.fetch_many({url: url}, as_json=True)[url]
+
+    def fetch_text(self, url: str) -> Optional[str]:
+        """Fetches a single page as text, None on failure"""
+        return self.fetch_many({url: url})[url]
+
+    def close(self):
+        """Closes the pooled connections and stops the event loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+# Shared by all scrapers so they reuse the same connection pool
+scrape_engine = ScrapeEngine()
+atexit.register(scrape_engine.close)
@@ -1,8 +1,8 @@
 from datetime import datetime
 from typing import Dict, List
 import logging
-import requests
 from config import FACILITY_COUNT_URL, BFIT_URL, JWC_URL, FACILITY_IDS
+from scrapers.engine import scrape_engine
 import static
 
 logger = logging.getLogger(__name__)
@@ -12,13 +12,8 @@ class GymScrapers:
     @staticmethod
     def get_facility_counts() -> Dict:
         """Get raw facility count data from UCLA's API"""
-        try:
-            response = requests.get(FACILITY_COUNT_URL)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"Error fetching facility counts: {e}")
-            return {}
+        # The engine logs failures and timeouts itself
+        return scrape_engine.fetch_json(FACILITY_COUNT_URL) or {}
 
     @staticmethod
     def filter_facility_zones(data: List[Dict], facility_id: int) -> List[Dict]:
@@ -71,4 +66,10 @@ class GymScrapers:
     @staticmethod
     def get_static_hours() -> Dict[str, Dict]:
         """Get static hours data (until we implement webpage scraping)"""
-        return static.GYM_HOURS
\ No newline at end of file
+        return static.GYM_HOURS
+
+    @staticmethod
+    def scrape_hours() -> Dict[str, Dict]:
+        """Scrapes regular and special hours for all gyms"""
+        logger.info("Starting gym hours scrape")
+        return GymScrapers.get_static_hours()
@@ -0,0 +1,7 @@
+import atexit
+
+from .server import StreamServer, create_stream_app, format_event
+
+# Started by create_app alongside the scheduler
+stream_server = StreamServer()
+atexit.register(stream_server.close)
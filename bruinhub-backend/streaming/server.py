@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from cache import event_broker
+from routes import get_latest_facilities, parse_slugs
+from config import STREAM_HOST, STREAM_PORT, STREAM_HEARTBEAT_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event: str, event_id: int, data: Dict) -> str:
+    """Formats one Server-Sent Event."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def error_response(message: str, status: int) -> web.Response:
+    return web.json_response({"error": message, "timestamp": datetime.now().isoformat()}, status=status)
+
+
+async def stream_facilities(request: web.Request) -> web.StreamResponse:
+    """
+    Streams live updates for gyms and dining halls as Server-Sent Events.
+
+    The stream starts with a `snapshot` event per facility, then sends a `delta` event holding
+    only the changed fields each time a scrape changes one. A `resync` event replaces every
+    snapshot when the stream fell too far behind. Reconnecting with `Last-Event-ID` resumes
+    without snapshots if the missed events are still buffered.
+
+    Example:
+    - `/api/v1/stream?slugs=bfit,epicuria`
+    - `/api/v1/stream?slugs=all`
+    """
+    param = request.query.get("slugs", "").strip()
+    if not param:
+        return error_response("Missing slugs parameter", 400)
+
+    slugs = parse_slugs(param)
+    resume_after = request.headers.get("Last-Event-ID", "")
+    resume_after = int(resume_after) if resume_after.isdigit() else None
+
+    # Events after this point may already be in the snapshots, replaying them is harmless
+    cursor = event_broker.last_id
+    loop = asyncio.get_running_loop()
+    # Cache misses block on Postgres, so they run on the default executor instead of the loop
+    gyms, dining = await loop.run_in_executor(None, get_latest_facilities, slugs)
+    facilities = {("gym", slug) for slug in gyms} | {("dining", slug) for slug in dining}
+    if not facilities:
+        return error_response("No facilities found", 404)
+
+    response = web.StreamResponse(
+        headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Stop nginx from buffering the stream
+            "Access-Control-Allow-Origin": "*",
+        }
+    )
+    await response.prepare(request)
+
+    async def send_snapshots(event: str, event_id: int):
+        for kind, latest in (("gym", gyms), ("dining", dining)):
+            for slug, data in latest.items():
+                await response.write(format_event(event, event_id, {"kind": kind, "slug": slug, "data": data}).encode())
+
+    event_broker.subscribe()
+    try:
+        if resume_after is not None and event_broker.can_resume(resume_after):
+            cursor = min(resume_after, cursor)
+        else:
+            await send_snapshots("snapshot", cursor)
+
+        while True:
+            events, cursor = await event_broker.wait_for_events(cursor, facilities, STREAM_HEARTBEAT_INTERVAL)
+            if events is None:
+                gyms, dining = await loop.run_in_executor(
+                    None, get_latest_facilities, [slug for _, slug in facilities]
+                )
+                await send_snapshots("resync", cursor)
+            elif not events:
+                # Keeps idle connections open through proxies and detects closed ones
+                await response.write(b": keep-alive\n\n")
+            for event in events or []:
+                data = {"kind": event.kind, "slug": event.slug, "data": event.delta}
+                await response.write(format_event("delta", event.id, data).encode())
+    except ConnectionResetError:
+        pass  # The client went away
+    finally:
+        event_broker.unsubscribe()
+    return response
+
+
+def create_stream_app() -> web.Application:
+    """Builds the aiohttp app serving `/api/v1/stream`."""
+    app = web.Application()
+    app.router.add_get("/api/v1/stream", stream_facilities)
+    return app
+
+
+class StreamServer:
+    """
+    Serves the Server-Sent Event streams from a background asyncio event loop.
+
+    Flask holds a worker thread for as long as a response is being sent, so the streams are
+    served here instead: an open stream is a coroutine and, while it waits, a future registered
+    with the event broker, so idle subscribers cost no threads. The loop runs on its own thread
+    next to the WSGI server, the same way the scrape engine runs its HTTP client. The socket is
+    opened with SO_REUSEPORT, so every worker of a multi-process server can start one.
+    """
+
+    def __init__(self, host: str = STREAM_HOST, port: int = STREAM_PORT):
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._lock = threading.Lock()
+
+    async def _start_site(self) -> web.AppRunner:
+        # Open streams never finish on their own, so shutdown cancels them instead of waiting
+        runner = web.AppRunner(create_stream_app(), handle_signals=False, shutdown_timeout=1)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port, reuse_port=True).start()
+        return runner
+
+    async def _stop_site(self, runner: web.AppRunner):
+        await runner.cleanup()
+        # Streams still waiting on the broker are cancelled here, so the loop can close cleanly
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def start(self):
+        """Starts serving on the event loop thread; does nothing if already started"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="stream-server", daemon=True)
+            thread.start()
+            try:
+                self._runner = asyncio.run_coroutine_threadsafe(self._start_site(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self._loop, self._thread = loop, thread
+        logger.info(f"Serving streams on {self.host}:{self.port}")
+
+    def close(self):
+        """Closes the open streams and stops the event loop thread"""
+        with self._lock:
+            loop, thread, runner = self._loop, self._thread, self._runner
+            self._loop = self._thread = self._runner = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop_site(runner), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
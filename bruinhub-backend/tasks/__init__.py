@@ -1 +1 @@
-from .scheduler import init_scheduler
+from .scheduler import init_scheduler, get_schedule
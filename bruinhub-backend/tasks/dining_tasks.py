@@ -1,27 +1,63 @@
 import logging
-from database import DatabaseManager
-from database.dining import DiningDatabase
+from datetime import datetime
+from database import DatabaseLayer
 from scrapers.dining import DiningScrapers
+from cache import snapshot_store, event_broker, hours_index, menu_index
+from analytics import dining_popular_times
+from alerts import alert_engine, describe
 
 logger = logging.getLogger(__name__)
 
 # Initialize global instances
-db_manager = None
-dining_db = None
+db_layer = None
 scraper = None
 
+# Write statistics of the most recent run
+last_run_stats = {}
 
-def setup_dining_tasks(database_url: str):
-    """Setup database connections and scrapers for dining tasks"""
-    global db_manager, dining_db, scraper
+
+def setup_dining_tasks(database: DatabaseLayer):
+    """Setup the shared database layer and scrapers for dining tasks"""
+    global db_layer, scraper
     logger.info("Setting up dining tasks with database and scrapers")
-    db_manager = DatabaseManager(database_url)
-    dining_db = DiningDatabase(db_manager)
+    db_layer = database
     scraper = DiningScrapers()
 
 
-def scrape_and_store_dining_data():
-    """Periodic task to scrape and store dining hall data"""
+def refresh_dining_snapshots(slugs):
+    """Reloads the latest snapshot of each dining hall into the snapshot store, streams what changed and reindexes changed hours and menus"""
+    halls = db_layer.dining.get_dining_halls_latest(list(slugs))
+    for slug, data in halls.items():
+        snapshot_store.set("dining", slug, data)
+        event_broker.publish("dining", slug, data)
+        hours_index.update("dining", slug, data)
+        menu_index.update(slug, data["menu"])
+    return halls
+
+
+def check_dining_alerts(halls):
+    """Fires the alerts crossed by the latest capacity and opening hours of each dining hall"""
+    alert_engine.ensure_loaded(db_layer.alerts.get_alerts)
+    now = datetime.now()
+    fired = []
+    for slug, data in halls.items():
+        fired += alert_engine.observe_open("dining", slug, hours_index.is_open("dining", slug, now))
+        if data["capacity"] is not None:
+            fired += alert_engine.observe_value("dining", slug, None, data["capacity"])
+    db_layer.alerts.record_notifications([(alert.id, describe(alert, value), value) for alert, value in fired], now)
+
+
+def record_dining_popular_times(dining_data):
+    """Folds the capacities of a scrape into the popular times profiles"""
+    dining_popular_times.ensure_loaded(db_layer.dining.get_hourly_capacities)
+    now = datetime.now()
+    for slug, hall_info in dining_data.items():
+        dining_popular_times.observe(slug, "capacity", now, hall_info["capacity"])
+
+
+def scrape_and_store_dining_data() -> bool:
+    """Periodic task to scrape and store dining hall data, returns whether anything changed"""
+    global last_run_stats
     try:
         logger.info("Starting periodic dining hall data scraping")
 
@@ -30,20 +66,23 @@ def scrape_and_store_dining_data():
         dining_data = scraper.scrape_dining_halls()
 
         if dining_data:
-            for hall_slug, hall_info in dining_data.items():
-                logger.info(f"Updating dining hall data for {hall_slug}")
-
-                # Update dining hall details (menu & hours)
-                dining_db.update_dining_hall(
-                    slug=hall_slug,
-                    menu=hall_info["menu"],
-                    regular_hours=hall_info["regular_hours"],
-                    special_hours=hall_info.get("special_hours"),
-                )
+            # Store menus, hours and capacities for every hall in one transaction
+            stats = db_layer.dining.ingest_dining_halls(dining_data)
+            logger.info(
+                f"Stored dining hall data: {stats.inserted} capacity entries inserted, "
+                f"{stats.updated} menus/hours updated, {stats.unchanged} unchanged (write skipped), "
+                f"{stats.failed} failed"
+            )
+            last_run_stats = {"halls": stats}
+            if stats.failed == 0:
+                record_dining_popular_times(dining_data)
 
-                # Store historical capacity update
-                logger.info(f"Storing capacity update for {hall_slug}")
-                dining_db.insert_dining_capacity(hall_slug, hall_info["capacity"])
+            # Publish the freshly written data to API readers
+            halls = refresh_dining_snapshots(dining_data.keys())
+            check_dining_alerts(halls)
+            return stats.inserted > 0 or stats.updated > 0
+        return False
 
     except Exception as e:
         logger.error(f"Error in periodic dining hall scraping: {e}", exc_info=True)
+        return False
@@ -1,55 +1,101 @@
 import logging
-from database import DatabaseManager
-from database.gyms import GymDatabase
+from datetime import datetime
+from database import DatabaseLayer
 from scrapers.gyms import GymScrapers
+from cache import snapshot_store, event_broker, hours_index
+from analytics import gym_popular_times
+from alerts import alert_engine, describe
+from models.ingest import IngestStats
 
 logger = logging.getLogger(__name__)
 
 # Initialize global instances
-db_manager = None
-gym_db = None
+db_layer = None
 scraper = None
 
+# Write statistics of the most recent run
+last_run_stats = {}
 
-def setup_gym_tasks(database_url: str):
-    """Setup database connections and scrapers for gym tasks"""
-    global db_manager, gym_db, scraper
+
+def setup_gym_tasks(database: DatabaseLayer):
+    """Setup the shared database layer and scrapers for gym tasks"""
+    global db_layer, scraper
     logger.info("Setting up gym tasks with database and scrapers")
-    db_manager = DatabaseManager(database_url)
-    gym_db = GymDatabase(db_manager)
+    db_layer = database
     scraper = GymScrapers()
 
 
-def scrape_and_store_gym_data():
-    """Periodic task to scrape and store gym data"""
+def refresh_gym_snapshots(slugs):
+    """Reloads the latest snapshot of each gym into the snapshot store, streams what changed and recompiles changed hours"""
+    gyms = db_layer.gyms.get_gyms_latest(list(slugs))
+    for slug, data in gyms.items():
+        snapshot_store.set("gym", slug, data)
+        event_broker.publish("gym", slug, data)
+        hours_index.update("gym", slug, data)
+    return gyms
+
+
+def check_gym_alerts(gyms):
+    """Fires the alerts crossed by the latest zone percentages and opening hours of each gym"""
+    alert_engine.ensure_loaded(db_layer.alerts.get_alerts)
+    now = datetime.now()
+    fired = []
+    for slug, data in gyms.items():
+        fired += alert_engine.observe_open("gym", slug, hours_index.is_open("gym", slug, now))
+        for zone_name, zone in data["zones"].items():
+            fired += alert_engine.observe_value("gym", slug, zone_name, zone["percentage"])
+    db_layer.alerts.record_notifications([(alert.id, describe(alert, value), value) for alert, value in fired], now)
+
+
+def record_gym_popular_times(facility_counts):
+    """Folds the zone percentages of a scrape into the popular times profiles"""
+    gym_popular_times.ensure_loaded(db_layer.gyms.get_hourly_percentages)
+    for slug, zones in facility_counts.items():
+        samples = {}
+        for zone in zones:
+            samples.setdefault(zone["zone_name"], []).append(zone)
+        for zone_name, readings in samples.items():
+            gym_popular_times.add_points(
+                slug, zone_name, [reading["last_updated"] for reading in readings],
+                [reading["percentage"] for reading in readings],
+            )
+
+
+def scrape_and_store_gym_data() -> bool:
+    """Periodic task to scrape and store gym data, returns whether any new readings arrived"""
+    global last_run_stats
     try:
         logger.info("Starting periodic gym data scraping")
 
         # Scrape facility counts (zone capacities)
         logger.info("Scraping facility counts")
         facility_counts = scraper.scrape_facility_counts()
-        for slug, zones in facility_counts.items():
-            if zones:  # Only store if we got data
-                for zone in zones:
-                    logger.info(f"Storing capacity for {slug} - {zone['zone_name']}")
-                    gym_db.insert_gym_capacity(
-                        slug,
-                        zone["zone_name"],
-                        zone["last_count"],
-                        zone["percentage"],
-                        zone["last_updated"]  # This will be the LastUpdatedDateAndTime from the API
-                    )
-
-        # Scrape hours
+        stats = IngestStats()
+        if facility_counts:
+            # Store every zone of every gym in one transaction
+            stats = db_layer.gyms.insert_gym_capacities(facility_counts)
+            logger.info(
+                f"Stored gym capacities: {stats.inserted} inserted, "
+                f"{stats.skipped} skipped, {stats.failed} failed"
+            )
+            if stats.inserted:
+                record_gym_popular_times(facility_counts)
+
+        # Scrape hours, only gyms whose hours changed are rewritten
         logger.info("Scraping hours")
         hours_data = scraper.scrape_hours()
-        for slug, hours in hours_data.items():
-            logger.info(f"Updating hours for {slug}")
-            gym_db.update_gym_hours(
-                slug,
-                hours["regular_hours"],
-                hours.get("special_hours"),
-            )
+        hours_stats = db_layer.gyms.update_gyms_hours(hours_data)
+        logger.info(
+            f"Stored gym hours: {hours_stats.updated} updated, "
+            f"{hours_stats.unchanged} unchanged (write skipped), {hours_stats.failed} failed"
+        )
+        last_run_stats = {"capacities": stats, "hours": hours_stats}
+
+        # Publish the freshly written data to API readers
+        gyms = refresh_gym_snapshots(set(facility_counts) | set(hours_data))
+        check_gym_alerts(gyms)
+        return stats.inserted > 0
 
     except Exception as e:
         logger.error(f"Error in periodic gym data scraping: {e}", exc_info=True)
+        return False
@@ -0,0 +1,73 @@
+import logging
+from datetime import datetime, timedelta
+from database import DatabaseLayer
+from database.rollups import RAW_RETENTION, HOURLY_RETENTION
+from analytics import gym_forecasts
+from analytics.forecast import fit_models
+from config import CAPACITY_PARTITION_MONTHS_AHEAD, FORECAST_FIT_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Initialize global instances
+db_layer = None
+
+# Statistics of the most recent compaction
+last_run_stats = {}
+
+# Statistics of the most recent forecast fit
+last_fit_stats = {}
+
+
+def setup_maintenance_tasks(database: DatabaseLayer):
+    """Setup the shared database layer for maintenance tasks"""
+    global db_layer
+    logger.info("Setting up maintenance tasks with database")
+    db_layer = database
+
+
+def compact_capacity_history():
+    """Periodic task to roll capacity history into hourly/daily rollups, manage partitions and expire old rows"""
+    global last_run_stats
+    try:
+        logger.info("Starting capacity history compaction")
+        last_run_stats = {
+            "gyms": db_layer.gyms.compact_capacity_history(
+                RAW_RETENTION, HOURLY_RETENTION, CAPACITY_PARTITION_MONTHS_AHEAD
+            ),
+            "dining": db_layer.dining.compact_capacity_history(
+                RAW_RETENTION, HOURLY_RETENTION, CAPACITY_PARTITION_MONTHS_AHEAD
+            ),
+        }
+    except Exception as e:
+        logger.error(f"Error in capacity history compaction: {e}", exc_info=True)
+
+
+def fit_forecast_models():
+    """Periodic task to refit the occupancy forecast model of every gym zone"""
+    global last_fit_stats
+    try:
+        logger.info("Starting forecast model fit")
+        models = fit_models(db_layer.gyms.get_hourly_percentages(), datetime.now())
+        last_fit_stats = {"gyms": db_layer.gyms.save_forecast_models(models)}
+        # Serve what was persisted, including zones that had too little new history to refit
+        gym_forecasts.load(db_layer.gyms.get_forecast_models())
+    except Exception as e:
+        logger.error(f"Error fitting forecast models: {e}", exc_info=True)
+
+
+def load_forecast_models():
+    """
+    Startup task to serve the persisted forecast models right away. With none persisted yet, or
+    only ones older than FORECAST_FIT_INTERVAL (restarts reset the interval job), they are refitted
+    now instead of waiting a whole interval.
+    """
+    try:
+        models = db_layer.gyms.get_forecast_models()
+        fitted_at = max((model.fitted_at for model in models.values()), default=None)
+        if fitted_at is None or datetime.now() - fitted_at > timedelta(seconds=FORECAST_FIT_INTERVAL):
+            logger.info("Forecast models are missing or stale, fitting them now")
+            fit_forecast_models()
+        else:
+            gym_forecasts.load(models)
+    except Exception as e:
+        logger.error(f"Error loading forecast models: {e}", exc_info=True)
@@ -0,0 +1,149 @@
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from apscheduler.triggers.base import BaseTrigger
+
+from config import (
+    SCRAPE_INTERVAL,
+    SCRAPE_MIN_INTERVAL,
+    SCRAPE_MAX_INTERVAL,
+    SCRAPE_PEAK_INTERVAL,
+    SCRAPE_PEAK_HOURS,
+    SCRAPE_CLOSED_MAX_INTERVAL,
+    SCRAPE_JITTER,
+)
+from cache.hours_index import HoursIndex
+
+# Weight of the newest gap in the moving estimate of the upstream update period
+UPSTREAM_PERIOD_ALPHA = 0.3
+
+
+def parse_peak_hours(value: str) -> List[Tuple[int, int]]:
+    """Parses "11-14,16-21" into [(11, 14), (16, 21)]"""
+    ranges = []
+    for part in value.split(","):
+        if part.strip():
+            start, end = part.split("-")
+            ranges.append((int(start), int(end)))
+    return ranges
+
+
+class ScrapePolicy:
+    """
+    Decides when a scrape source should run next.
+
+    While any of the source's facilities is open, the interval follows how often upstream data
+    actually changes (polling at about twice that rate) and tightens during peak hours. While
+    everything is closed, the next run is the next opening time. Opening hours are read from the
+    compiled `HoursIndex` the scrape tasks keep up to date, and facilities with unknown hours
+    count as open.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        hours: HoursIndex,
+        base_interval: float = SCRAPE_INTERVAL,
+        min_interval: float = SCRAPE_MIN_INTERVAL,
+        max_interval: float = SCRAPE_MAX_INTERVAL,
+        peak_interval: float = SCRAPE_PEAK_INTERVAL,
+        peak_hours: str = SCRAPE_PEAK_HOURS,
+        closed_max_interval: float = SCRAPE_CLOSED_MAX_INTERVAL,
+        jitter: float = SCRAPE_JITTER,
+    ):
+        self.name = name
+        self.kind = kind
+        self.hours = hours
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.peak_interval = peak_interval
+        self.peak_hours = parse_peak_hours(peak_hours)
+        self.closed_max_interval = closed_max_interval
+        self.jitter = jitter
+
+        self.upstream_period: Optional[float] = None  # Estimated seconds between upstream changes
+        self.last_run: Optional[datetime] = None
+        self.last_change: Optional[datetime] = None
+        self.planned_interval: Optional[float] = None
+        self.planned_reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def record_run(self, changed: bool, at: datetime):
+        """Records the outcome of a run, `changed` meaning upstream had new data"""
+        with self._lock:
+            if changed:
+                if self.last_change is not None:
+                    gap = (at - self.last_change).total_seconds()
+                    # Gaps spanning a closure say nothing about the update rate
+                    if gap <= 4 * self.max_interval:
+                        if self.upstream_period is None:
+                            self.upstream_period = gap
+                        else:
+                            self.upstream_period += UPSTREAM_PERIOD_ALPHA * (gap - self.upstream_period)
+                self.last_change = at
+            self.last_run = at
+
+    def is_peak(self, at: datetime) -> bool:
+        return any(start <= at.hour < end for start, end in self.peak_hours)
+
+    def _open_state(self, at: datetime) -> Tuple[bool, Optional[datetime]]:
+        """Returns whether any facility is open and, if none is, when the first one opens"""
+        facilities = self.hours.of_kind(self.kind)
+        if not facilities or any(facility.is_open(at) is not False for facility in facilities):
+            return True, None
+        # Every facility is closed, so its next change is when it opens
+        openings = [opening for opening in (facility.next_change(at) for facility in facilities) if opening]
+        return False, min(openings) if openings else None
+
+    def plan(self, now: datetime) -> Tuple[float, str]:
+        """Returns the seconds until the next run and the reason for that interval"""
+        is_any_open, opening = self._open_state(now)
+        if not is_any_open:
+            if opening is None:
+                return self.closed_max_interval, "closed"
+            return min(max((opening - now).total_seconds(), 0), self.closed_max_interval), "closed"
+
+        if self.upstream_period is None:
+            interval, reason = self.base_interval, "open"
+        else:
+            interval = min(max(self.upstream_period / 2, self.min_interval), self.max_interval)
+            reason = "adaptive"
+        if self.is_peak(now) and interval > self.peak_interval:
+            interval, reason = self.peak_interval, "peak"
+        return interval, reason
+
+    def next_run_time(self, now: datetime) -> datetime:
+        """Plans the next run after `now` (naive local time), with jitter to spread upstream load"""
+        interval, reason = self.plan(now)
+        with self._lock:
+            self.planned_interval, self.planned_reason = interval, reason
+        return now + timedelta(seconds=interval + random.uniform(0, self.jitter))
+
+    def get_state(self) -> Dict:
+        """Returns the planning state for monitoring"""
+        with self._lock:
+            return {
+                "interval": self.planned_interval,
+                "reason": self.planned_reason,
+                "upstream_period": self.upstream_period,
+                "last_run": self.last_run.isoformat() if self.last_run else None,
+                "last_change": self.last_change.isoformat() if self.last_change else None,
+            }
+
+
+class AdaptiveTrigger(BaseTrigger):
+    """APScheduler trigger that asks a ScrapePolicy for every next fire time"""
+
+    def __init__(self, policy: ScrapePolicy):
+        self.policy = policy
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        # The scheduler passes an aware time in its own (local) timezone, hours are local wall time
+        return self.policy.next_run_time(now.replace(tzinfo=None)).astimezone(now.tzinfo)
+
+    def __str__(self):
+        return f"adaptive[{self.policy.name}]"
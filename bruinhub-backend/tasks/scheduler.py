@@ -1,20 +1,115 @@
+import logging
+from datetime import datetime
+from typing import Dict, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from .gym_tasks import scrape_and_store_gym_data
 from .dining_tasks import scrape_and_store_dining_data
+from .maintenance_tasks import compact_capacity_history, fit_forecast_models, load_forecast_models
+from .policy import ScrapePolicy, AdaptiveTrigger
+from cache import hours_index
+from config import COMPACTION_INTERVAL, FORECAST_FIT_INTERVAL
 
-def init_scheduler(scrape_interval: int) -> BackgroundScheduler:
-    """Initialize the task scheduler with all periodic tasks"""
-    scheduler = BackgroundScheduler()
+logger = logging.getLogger(__name__)
+
+GYM_SCRAPE_JOB_ID = "gym_scrape"
+DINING_SCRAPE_JOB_ID = "dining_scrape"
+COMPACTION_JOB_ID = "capacity_compaction"
+FORECAST_FIT_JOB_ID = "forecast_fit"
+FORECAST_LOAD_JOB_ID = "forecast_load"
+
+# The running scheduler, so other modules can see when the next scrape is due
+scheduler = None
+
+# job id -> (task, policy) of every adaptively scheduled scrape source
+sources = {}
+
+
+def run_source(job_id: str):
+    """Runs a scrape source and replans its next run from the outcome"""
+    task, policy = sources[job_id]
+    changed = task()
+    policy.record_run(bool(changed), datetime.now())
+
+    # The trigger planned this slot before the run, replan with what the run just observed
+    next_run_time = policy.next_run_time(datetime.now()).astimezone()
+    if scheduler is not None and scheduler.get_job(job_id):
+        scheduler.modify_job(job_id, next_run_time=next_run_time)
+    logger.info(f"Next {job_id} run at {next_run_time.isoformat()} ({policy.planned_reason})")
+
+
+def init_scheduler(scrape_interval: int, run_immediately: bool = False) -> BackgroundScheduler:
+    """
+    Initialize the task scheduler with all periodic tasks.
+
+    Each scrape source gets its own adaptive interval (see ScrapePolicy), with `scrape_interval`
+    used while a facility is open and upstream's update rate is not known yet. With
+    `run_immediately`, the first scrape runs in the background right away, and so does loading
+    (or, if missing or stale, fitting) the forecast models.
+    """
+    global scheduler
+    # A late run is merged with any missed ones and never overlaps a run still in progress
+    scheduler = BackgroundScheduler(job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 60})
+    # Leaving next_run_time unset keeps the trigger's schedule, None would pause the job
+    first_run = {"next_run_time": datetime.now().astimezone()} if run_immediately else {}
+
+    sources.clear()
+    sources[GYM_SCRAPE_JOB_ID] = (
+        scrape_and_store_gym_data,
+        ScrapePolicy("gyms", "gym", hours_index, base_interval=scrape_interval),
+    )
+    sources[DINING_SCRAPE_JOB_ID] = (
+        scrape_and_store_dining_data,
+        ScrapePolicy("dining", "dining", hours_index, base_interval=scrape_interval),
+    )
+
+    for job_id, (_, policy) in sources.items():
+        scheduler.add_job(
+            func=run_source,
+            args=(job_id,),
+            trigger=AdaptiveTrigger(policy),
+            id=job_id,
+            **first_run,
+        )
 
-    # Add gym scraping task
     scheduler.add_job(
-        func=scrape_and_store_gym_data, trigger="interval", seconds=scrape_interval
+        func=compact_capacity_history,
+        trigger="interval",
+        seconds=COMPACTION_INTERVAL,
+        id=COMPACTION_JOB_ID,
     )
+
     scheduler.add_job(
-        func=scrape_and_store_dining_data, trigger="interval", seconds=scrape_interval
+        func=fit_forecast_models,
+        trigger="interval",
+        seconds=FORECAST_FIT_INTERVAL,
+        id=FORECAST_FIT_JOB_ID,
     )
+    if run_immediately:
+        # One-off job, so the app never waits on the database to start
+        scheduler.add_job(func=load_forecast_models, id=FORECAST_LOAD_JOB_ID, **first_run)
 
     # Add other periodic tasks here as needed
 
     scheduler.start()
     return scheduler
+
+
+def get_next_run_time(job_id: str) -> Optional[datetime]:
+    """Returns when a scheduled job will next run, or None if it is not scheduled"""
+    if scheduler is None:
+        return None
+
+    job = scheduler.get_job(job_id)
+    return job.next_run_time if job else None
+
+
+def get_schedule() -> Dict[str, Dict]:
+    """Returns the next planned run of every scrape source and why it was planned then"""
+    schedule = {}
+    for job_id, (_, policy) in sources.items():
+        next_run_time = get_next_run_time(job_id)
+        schedule[job_id] = {
+            "next_run_time": next_run_time.isoformat() if next_run_time else None,
+            **policy.get_state(),
+        }
+    return schedule
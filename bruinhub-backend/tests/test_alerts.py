@@ -0,0 +1,54 @@
+from alerts import AlertEngine, ThresholdIndex, describe
+from models.alerts import Alert
+
+def threshold_alert(alert_id, condition, threshold, zone_name="Weight Room"):
+    return Alert(id=alert_id, subscriber="device", kind="gym", slug="bfit", condition=condition,
+                 zone_name=zone_name, threshold=threshold)
+
+def test_thresholds_fire_only_when_crossed():
+    """Test that a reading fires the thresholds between the previous reading and itself"""
+    index = ThresholdIndex()
+    for alert_id, threshold in enumerate([20, 40, 60]):
+        index.add(threshold_alert(alert_id, "below", threshold))
+    index.add(threshold_alert(3, "above", 50))
+    assert index.update(70) == []  # The first reading only sets the starting point
+    assert index.update(40) == [2]  # 40 is not below 40
+    assert index.update(39) == [1]
+    assert index.update(35) == []  # Still below, no repeat
+    assert index.update(55) == [3]
+
+def test_removed_alerts_do_not_fire():
+    """Test that removing an alert takes it out of the index"""
+    engine = AlertEngine()
+    engine.load([threshold_alert(1, "below", 40), threshold_alert(2, "below", 40)])
+    assert engine.remove(1).id == 1
+    assert engine.remove(1) is None
+    engine.observe_value("gym", "bfit", "Weight Room", 50)
+    assert [alert.id for alert, _ in engine.observe_value("gym", "bfit", "Weight Room", 30)] == [2]
+
+def test_zones_are_independent():
+    """Test that readings of one zone never fire another zone's alerts"""
+    engine = AlertEngine()
+    engine.add(threshold_alert(1, "below", 40, zone_name="Cardio"))
+    engine.observe_value("gym", "bfit", "Weight Room", 50)
+    assert engine.observe_value("gym", "bfit", "Weight Room", 30) == []
+
+def test_opening_alerts_fire_on_transitions():
+    """Test that opening alerts fire when a facility opens or closes, and unknown hours are ignored"""
+    engine = AlertEngine()
+    opens = Alert(id=1, subscriber="device", kind="dining", slug="epicuria", condition="opens")
+    engine.add(opens)
+    assert engine.observe_open("dining", "epicuria", False) == []
+    assert engine.observe_open("dining", "epicuria", None) == []
+    assert engine.observe_open("dining", "epicuria", True) == [(opens, None)]
+    assert engine.observe_open("dining", "epicuria", True) == []
+    assert describe(opens, None) == "epicuria is now open"
+
+def test_reload_keeps_last_readings():
+    """Test that reloading the alerts does not reset the readings they are compared against"""
+    engine = AlertEngine()
+    engine.observe_value("gym", "bfit", "Weight Room", 50)
+    engine.load([threshold_alert(1, "below", 40)])
+    fired = engine.observe_value("gym", "bfit", "Weight Room", 35)
+    assert [alert.id for alert, _ in fired] == [1]
+    assert describe(*fired[0]) == "bfit Weight Room is below 40% (35%)"
@@ -30,6 +30,61 @@ def test_get_invalid_gym(client):
     data = response.get_json()
     assert data["error"] == "Gym not found"
 
+def test_gym_conditional_request(client):
+    """Test that a matching If-None-Match returns 304 with no body"""
+    response = client.get("/v1/gym/bfit")
+    if response.status_code == 200:
+        assert response.headers["ETag"]
+        assert response.headers["Last-Modified"]
+        assert "max-age" in response.headers["Cache-Control"]
+
+        cached = client.get("/v1/gym/bfit", headers={"If-None-Match": response.headers["ETag"]})
+        assert cached.status_code == 304
+        assert cached.data == b""
+        assert cached.headers["ETag"] == response.headers["ETag"]
+
+def test_gym_unknown_fields(client):
+    """Test that fields no facility has are rejected"""
+    assert client.get("/v1/gym/bfit?fields=popularity").status_code == 400
+    assert client.get("/v1/gym/bfit?fields=capacity,zones.crowd").status_code == 400
+
+def test_get_gym_history(client):
+    """Test fetching downsampled gym history"""
+    response = client.get("/v1/gym/bfit/history?from=2025-02-01T00:00&to=2025-02-08T00:00&bucket=1h")
+    assert response.status_code in [200, 404]
+    if response.status_code == 200:
+        data = response.get_json()
+        assert isinstance(data["data"], list)
+        for bucket in data["data"]:
+            assert bucket["percentage"]["min"] <= bucket["percentage"]["avg"] <= bucket["percentage"]["max"]
+
+def test_get_gym_history_invalid_bucket(client):
+    """Test that malformed bucket sizes are rejected"""
+    response = client.get("/v1/gym/bfit/history?bucket=fortnight")
+    assert response.status_code == 400
+
+def test_get_history_invalid_cursor(client):
+    """Test that cursors not produced by the API are rejected"""
+    for cursor in ("MQ==", "WyJ4Il0=", "WzEsIDJd", "not-base64"):  # 1, ["x"], [1, 2]
+        assert client.get(f"/v1/gym/bfit/history?cursor={cursor}").status_code == 400
+        assert client.get(f"/v1/dining/epicuria/history?cursor={cursor}").status_code == 400
+
+def test_history_configuration_errors_are_not_bad_requests(client, monkeypatch):
+    """Test that only an invalid bucket, not a server error, turns into a 400"""
+    def missing_database():
+        raise ValueError("DATABASE_URL is not set!")
+
+    monkeypatch.setattr("routes.get_db_layer", missing_database)
+    for path in ("/v1/gym/bfit/history", "/v1/dining/epicuria/history"):
+        with pytest.raises(ValueError, match="DATABASE_URL"):
+            client.get(path)
+
+def test_get_gym_forecast_invalid_hours(client):
+    """Test that forecast horizons outside the supported range are rejected"""
+    for hours in ("0", "1000", "soon"):
+        response = client.get(f"/v1/gym/bfit/forecast?hours={hours}")
+        assert response.status_code == 400
+
 # ------------------ Dining API Tests ------------------
 
 def test_get_specific_dining_hall(client):
@@ -49,3 +104,104 @@ def test_get_invalid_dining_hall(client):
     assert response.status_code == 404
     data = response.get_json()
     assert data["error"] == "Dining hall not found"
+
+def test_dining_invalid_diet(client):
+    """Test that unknown diets and allergens are rejected"""
+    assert client.get("/v1/dining/epicuria?diet=keto").status_code == 400
+    assert client.get("/v1/dining/epicuria?exclude=kale").status_code == 400
+
+def test_dining_conditional_request(client):
+    """Test that a stale If-None-Match returns the full dining hall payload"""
+    response = client.get("/v1/dining/epicuria", headers={"If-None-Match": '"stale"'})
+    assert response.status_code in [200, 404]
+    if response.status_code == 200:
+        assert response.get_json()["data"]["slug"] == "epicuria"
+
+        cached = client.get("/v1/dining/epicuria", headers={"If-None-Match": response.headers["ETag"]})
+        assert cached.status_code == 304
+
+def test_dining_search_requires_query(client):
+    """Test that menu search needs a query and a sensible limit"""
+    assert client.get("/v1/dining/search").status_code == 400
+    assert client.get("/v1/dining/search?q=pasta&limit=0").status_code == 400
+
+def test_dining_menu_history_validation(client):
+    """Test that menu history lookups reject missing items and malformed dates"""
+    assert client.get("/v1/dining/item-history").status_code == 400
+    assert client.get("/v1/dining/epicuria/menu?date=yesterday").status_code == 400
+
+# ------------------ Facilities API Tests ------------------
+
+def test_get_facilities(client):
+    """Test fetching several facilities in one request"""
+    response = client.get("/v1/facilities?slugs=bfit,epicuria,invalid-facility")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert set(data["data"]) == {"gyms", "dining"}
+    assert "invalid-facility" in data["not_found"]
+    if "bfit" in data["data"]["gyms"]:
+        assert data["data"]["gyms"]["bfit"]["slug"] == "bfit"
+    if "epicuria" in data["data"]["dining"]:
+        assert data["data"]["dining"]["epicuria"]["slug"] == "epicuria"
+
+def test_get_all_facilities(client):
+    """Test fetching every facility"""
+    response = client.get("/v1/facilities?slugs=all")
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    for slug, gym in data["gyms"].items():
+        assert gym["slug"] == slug
+    for slug, hall in data["dining"].items():
+        assert hall["slug"] == slug
+
+def test_get_facilities_fields(client):
+    """Test that only the requested fields are returned for each facility"""
+    response = client.get("/v1/facilities?slugs=bfit,epicuria&fields=capacity,zones.percentage")
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    for gym in data["gyms"].values():
+        assert set(gym) <= {"slug", "zones"}
+        assert all(set(zone) <= {"percentage"} for zone in gym.get("zones", {}).values())
+    for hall in data["dining"].values():
+        assert set(hall) <= {"slug", "capacity"}
+    assert client.get("/v1/facilities?slugs=all&fields=popularity").status_code == 400
+
+def test_get_facilities_requires_slugs(client):
+    """Test that the slugs parameter is required"""
+    response = client.get("/v1/facilities")
+    assert response.status_code == 400
+
+def test_open_now_invalid_timestamp(client):
+    """Test that a malformed `at` timestamp is rejected"""
+    response = client.get("/v1/open-now?at=noon")
+    assert response.status_code == 400
+
+# ------------------ Alerts API Tests ------------------
+
+def test_create_alert_validation(client):
+    """Test that malformed alerts are rejected before touching the database"""
+    bodies = [
+        {"kind": "gym", "slug": "bfit", "condition": "opens"},
+        {"subscriber": "device", "kind": "pool", "slug": "bfit", "condition": "opens"},
+        {"subscriber": "device", "kind": "gym", "slug": "bfit", "condition": "below", "threshold": 40},
+        {"subscriber": "device", "kind": "gym", "slug": "bfit", "zone_name": "Weight Room", "condition": "below", "threshold": 140},
+        {"subscriber": "device", "kind": "dining", "slug": "epicuria", "condition": "soon"},
+    ]
+    for body in bodies:
+        response = client.post("/v1/alerts", json=body)
+        assert response.status_code == 400
+
+def test_alerts_require_subscriber(client):
+    """Test that listing alerts and notifications needs a subscriber"""
+    assert client.get("/v1/alerts").status_code == 400
+    assert client.get("/v1/alerts/notifications?subscriber=device&after=latest").status_code == 400
+
+# ------------------ App Factory Tests ------------------
+
+def test_create_app_health():
+    """Test that the app factory serves the health check without starting the scheduler"""
+    from app import create_app
+    app = create_app(start_scheduler=False)
+    response = app.test_client().get("/health")
+    assert response.status_code in [200, 500]
+    assert "status" in response.get_json()
@@ -0,0 +1,34 @@
+from dietary import Attribute, ALLERGENS, DIETS, classify, parse_mask
+
+def test_labels_set_diets():
+    """Test that "Vegan" and "Vegetarian" in a name set the diets they guarantee"""
+    vegan = classify("Vegan Tofu Bowl")
+    assert vegan & Attribute.VEGAN and vegan & Attribute.VEGETARIAN and vegan & Attribute.MILK_FREE
+    vegetarian = classify("Vegetarian Meatball Sandwich")
+    assert vegetarian & Attribute.VEGETARIAN and not vegetarian & Attribute.VEGAN
+    assert not vegetarian & Attribute.MILK_FREE
+
+def test_free_labels_set_allergens():
+    """Test that "<allergen> free" in a name guarantees the item is free of it"""
+    assert classify("Gluten Free Pancakes") == Attribute.GLUTEN_FREE | Attribute.WHEAT_FREE
+    assert classify("Nut-Free Granola Bars") == Attribute.TREE_NUT_FREE | Attribute.PEANUT_FREE
+    assert classify("Dairy Free Cheese") == Attribute.MILK_FREE
+    assert classify("Free Range Eggs") == 0
+
+def test_unlabelled_items_match_nothing():
+    """Test that names without labels get no bits, whatever they seem to lack"""
+    for name in ("Cheeseburger", "Chocolate Chip Cookie", "Pad Thai", "Roasted Carrots", "Braised Lamb"):
+        assert classify(name) == 0
+    assert not classify("Pad Thai") & ALLERGENS["peanut"]
+    assert not classify("Chocolate Chip Cookie") & DIETS["gluten-free"]
+
+def test_parse_mask_combines_values():
+    """Test that comma separated filters become one mask and unknown values are rejected"""
+    assert parse_mask("vegan, gluten-free", DIETS) == Attribute.VEGAN | Attribute.GLUTEN_FREE
+    assert parse_mask("peanut,gluten", ALLERGENS) == Attribute.PEANUT_FREE | Attribute.GLUTEN_FREE
+    assert parse_mask("", ALLERGENS) == 0
+    try:
+        parse_mask("keto", DIETS)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
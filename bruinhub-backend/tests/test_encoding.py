@@ -0,0 +1,28 @@
+import gzip
+import brotli
+import orjson
+from werkzeug.http import parse_accept_header
+from cache.encoding import encode_body, negotiate
+
+PAYLOAD = {"data": {"slug": "epicuria", "menu": {"Capri": ["Shrimp Alfredo Pasta"] * 50}}, "timestamp": "2025-11-17T12:00:00"}
+
+def test_variants_decode_to_the_same_json():
+    """Test that the gzip and brotli variants hold the identity body"""
+    body = encode_body(PAYLOAD)
+    assert orjson.loads(body.identity) == PAYLOAD
+    assert gzip.decompress(body.gzip) == body.identity
+    assert brotli.decompress(body.br) == body.identity
+    assert body.sizes()["br"] < body.sizes()["identity"]
+    assert encode_body(PAYLOAD).gzip == body.gzip  # Stable bytes, so stable variant ETags
+
+def test_negotiation_follows_accept_encoding():
+    """Test that brotli wins ties, quality values are honoured and no header means identity"""
+    body = encode_body(PAYLOAD)
+    assert negotiate(parse_accept_header("gzip, deflate, br"), body)[0] == "br"
+    assert negotiate(parse_accept_header("gzip, br;q=0.5"), body)[0] == "gzip"
+    assert negotiate(parse_accept_header(""), body) == ("identity", body.identity)
+
+def test_tiny_bodies_are_not_compressed():
+    """Test that a compressed variant larger than the body itself is never sent"""
+    body = encode_body({})
+    assert negotiate(parse_accept_header("br, gzip"), body)[0] == "identity"
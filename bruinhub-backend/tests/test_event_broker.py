@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from cache.events import EventBroker, compute_delta
+
+def test_delta_holds_only_changed_fields():
+    """Test that deltas carry changed fields and only the changed zones"""
+    before = {"slug": "bfit", "zones": {"Weight Room": {"percentage": 40}, "Pool": {"percentage": 10}}}
+    after = {"slug": "bfit", "zones": {"Weight Room": {"percentage": 55}, "Pool": {"percentage": 10}}}
+    assert compute_delta(before, after) == {"zones": {"Weight Room": {"percentage": 55}}}
+    assert compute_delta(None, after) == after
+    assert compute_delta(after, {"slug": "bfit", "zones": {}}) == {"zones": {"Weight Room": None, "Pool": None}}
+
+def test_unchanged_snapshots_are_not_published():
+    """Test that republishing an identical snapshot sends nothing"""
+    broker = EventBroker(max_events=8)
+    assert broker.publish("gym", "bfit", {"capacity": 1}) is not None
+    assert broker.publish("gym", "bfit", {"capacity": 1}) is None
+
+def test_subscribers_only_see_their_facilities():
+    """Test that a waiting subscriber wakes on publish and gets only the facilities it asked for"""
+    broker = EventBroker(max_events=8)
+    cursor = broker.last_id
+
+    async def main():
+        waiter = asyncio.ensure_future(broker.wait_for_events(cursor, {("dining", "epicuria")}, timeout=5))
+        await asyncio.sleep(0)
+        broker.publish("gym", "bfit", {"capacity": 1})
+        broker.publish("dining", "epicuria", {"capacity": 2})
+        return await waiter
+
+    events, next_cursor = asyncio.run(main())
+    assert next_cursor > cursor
+    assert all(event.slug == "epicuria" for event in events)
+    idle = broker.wait_for_events(broker.last_id, {("gym", "bfit")}, timeout=0.01)
+    assert asyncio.run(idle) == ([], broker.last_id)
+
+def test_publish_only_wakes_interested_subscribers():
+    """Test that a publish from another thread only wakes the streams following that facility"""
+    broker = EventBroker(max_events=8)
+    cursor = broker.last_id
+
+    async def main():
+        waiter = asyncio.ensure_future(broker.wait_for_events(cursor, {("dining", "epicuria")}, timeout=5))
+        await asyncio.sleep(0)
+        assert broker.get_stats()["waiting"] == 1
+        await asyncio.to_thread(broker.publish, "gym", "bfit", {"capacity": 1})
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        await asyncio.to_thread(broker.publish, "dining", "epicuria", {"capacity": 2})
+        return await asyncio.wait_for(waiter, 1)
+
+    events, _ = asyncio.run(main())
+    assert [event.slug for event in events] == ["epicuria"]
+    assert broker.get_stats()["waiting"] == 0
+
+def test_idle_subscribers_hold_no_threads():
+    """Test that thousands of waiting subscribers run on one thread"""
+    broker = EventBroker(max_events=8)
+    cursor = broker.last_id
+
+    async def main():
+        threads = threading.active_count()
+        waiters = [
+            asyncio.ensure_future(broker.wait_for_events(cursor, {("gym", "bfit")}, timeout=5))
+            for _ in range(2000)
+        ]
+        await asyncio.sleep(0)
+        assert broker.get_stats()["waiting"] == 2000
+        assert threading.active_count() == threads
+        broker.publish("gym", "bfit", {"capacity": 1})
+        return await asyncio.gather(*waiters)
+
+    assert all(len(events) == 1 for events, _ in asyncio.run(main()))
+    assert broker.get_stats()["waiting"] == 0
+
+def test_lagging_subscribers_must_resync():
+    """Test that a subscriber whose events left the buffer is told to resync"""
+    broker = EventBroker(max_events=2)
+    cursor = broker.last_id
+    for capacity in range(3):
+        broker.publish("gym", "bfit", {"capacity": capacity})
+    assert not broker.can_resume(cursor)
+    assert asyncio.run(broker.wait_for_events(cursor, {("gym", "bfit")}, timeout=0)) == (None, broker.last_id)
+    assert broker.can_resume(broker.last_id - 1)
@@ -0,0 +1,47 @@
+import pytest
+from fields import GYM_FIELDS, FACILITY_FIELDS, fieldset_key, parse_fields, project
+
+GYM = {
+    "slug": "bfit",
+    "regular_hours": {"monday": "6:00 AM - 12:00 AM"},
+    "special_hours": None,
+    "zones": {
+        "Weight Room": {"capacity": 200, "percentage": 40, "last_updated": "2025-11-17T18:00:00"},
+        "Cardio": {"capacity": 100, "percentage": 75, "last_updated": "2025-11-17T18:00:00"},
+    },
+    "last_updated": "2025-11-17T18:00:00",
+}
+
+def test_fields_are_split_by_kind():
+    """Test that each kind only gets the fields it has, and always its slug"""
+    fieldsets = parse_fields("capacity,zones.percentage", FACILITY_FIELDS)
+    assert fieldsets["gym"] == {"slug": None, "zones": frozenset({"percentage"})}
+    assert fieldsets["dining"] == {"slug": None, "capacity": None}
+
+def test_whole_field_wins_over_subfields():
+    """Test that asking for a whole field and some of its subfields returns all of it"""
+    assert parse_fields("zones.capacity,zones", FACILITY_FIELDS)["gym"]["zones"] is None
+    assert parse_fields("zones,zones.capacity", FACILITY_FIELDS)["gym"]["zones"] is None
+    assert parse_fields("zones.capacity,zones.percentage", FACILITY_FIELDS)["gym"]["zones"] == {"capacity", "percentage"}
+
+def test_unknown_fields_are_rejected():
+    """Test that fields and subfields no kind has raise ValueError"""
+    for value in ("popularity", "zones.crowd", "capacity.percentage"):
+        with pytest.raises(ValueError):
+            parse_fields(value, FACILITY_FIELDS)
+    with pytest.raises(ValueError):
+        parse_fields("capacity", {"gym": GYM_FIELDS})
+
+def test_project_keeps_requested_fields():
+    """Test that projecting keeps the requested fields and subfields of every zone"""
+    projected = project(GYM, parse_fields("zones.percentage", FACILITY_FIELDS)["gym"])
+    assert projected == {"slug": "bfit", "zones": {"Weight Room": {"percentage": 40}, "Cardio": {"percentage": 75}}}
+    assert list(projected["zones"]) == ["Weight Room", "Cardio"]
+    assert project(GYM, parse_fields("", FACILITY_FIELDS)["gym"]) == {"slug": "bfit"}
+    assert project(GYM, parse_fields("special_hours", FACILITY_FIELDS)["gym"]) == {"slug": "bfit", "special_hours": None}
+
+def test_fieldset_key_ignores_order():
+    """Test that the same fields in any order get the same key"""
+    first = parse_fields("zones.percentage,capacity,zones.capacity", FACILITY_FIELDS)["gym"]
+    second = parse_fields("zones.capacity,zones.percentage", FACILITY_FIELDS)["gym"]
+    assert fieldset_key(first) == fieldset_key(second) == "slug,zones.capacity,zones.percentage"
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from analytics.forecast import fit_zone_model, fit_models, predict
+
+MONDAY = datetime(2025, 11, 17)
+
+def weekly_history(weeks, busy_hour=18):
+    """Hourly percentages that are 80 at `busy_hour` every day and 20 otherwise"""
+    hours = [MONDAY - timedelta(weeks=weeks) + timedelta(hours=i) for i in range(weeks * 7 * 24)]
+    return hours, [80.0 if hour.hour == busy_hour else 20.0 for hour in hours]
+
+def test_baseline_follows_hour_of_week():
+    """Test that the baseline is the mean for each hour of the week"""
+    hours, percentages = weekly_history(weeks=2)
+    model = fit_zone_model(hours, percentages, MONDAY)
+    assert model.samples == len(hours)
+    assert model.baseline[18] == 80  # Monday 6 PM
+    assert model.baseline[24 + 9] == 20  # Tuesday 9 AM
+    assert model.decay == 0  # No deviations from the baseline to persist
+
+def test_too_little_history_is_not_fitted():
+    """Test that zones with less than a day of history get no model"""
+    hours, percentages = weekly_history(weeks=1)
+    assert fit_zone_model(hours[:10], percentages[:10], MONDAY) is None
+
+def test_fit_models_averages_rollup_rows():
+    """Test that rows holding sums and sample counts are fitted per zone"""
+    hours, percentages = weekly_history(weeks=1)
+    rows = [("bfit", "Weight Room", hour, value * 4, 4, hour) for hour, value in zip(hours, percentages)]
+    models = fit_models(rows, MONDAY)
+    assert list(models) == [("bfit", "Weight Room")]
+    assert models[("bfit", "Weight Room")].baseline[18] == 80
+
+def test_deviation_decays_toward_baseline():
+    """Test that a busier than usual reading raises the next hours less and less"""
+    hours, percentages = weekly_history(weeks=2)
+    model = fit_zone_model(hours, percentages, MONDAY)
+    model.decay = 0.5
+
+    now = MONDAY + timedelta(hours=9, minutes=30)
+    plain = predict(model, now, hours=3)
+    assert [point["percentage"] for point in plain] == [20, 20, 20]
+    assert plain[0]["time"] == (MONDAY + timedelta(hours=10)).isoformat()
+
+    busy = predict(model, now, hours=3, current=60, observed_at=MONDAY + timedelta(hours=9))
+    assert [point["percentage"] for point in busy] == [40, 30, 25]
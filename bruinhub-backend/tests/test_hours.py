@@ -0,0 +1,43 @@
+from datetime import datetime
+from hours import parse_hours, compile_hours
+
+BFIT_HOURS = {
+    "regular_hours": {
+        "Monday": "6:00 AM - 1:00 AM",
+        "Tuesday": "6:00 AM - 1:00 AM",
+        "Wednesday": "6:00 AM - 1:00 AM",
+        "Thursday": "6:00 AM - 1:00 AM",
+        "Friday": "6:00 AM - 9:00 PM",
+        "Saturday": "9:00 AM - 6:00 PM",
+        "Sunday": "9:00 AM - 11:00 PM",
+    },
+    "special_hours": {"2025-11-27": "CLOSED"},
+}
+
+def test_parse_hours_forms():
+    """Test past-midnight, midnight, closed and labelled alternative hours"""
+    assert parse_hours("6:00 AM - 1:00 AM") == [(360, 1500)]
+    assert parse_hours("6:00 AM - 12:00 AM") == [(360, 1440)]
+    assert parse_hours("CLOSED") == []
+    assert parse_hours("5:15 AM - 10:00 PM (A); 5:15 AM - 11:00 PM (C)") == [(315, 1320), (315, 1380)]
+    assert parse_hours("by appointment") is None
+
+def test_is_open_across_midnight_and_special_days():
+    """Test that Monday's late hours carry into Tuesday and special closures win"""
+    compiled = compile_hours(BFIT_HOURS)
+    assert compiled.is_open(datetime(2025, 11, 18, 0, 30))  # Tuesday 12:30 AM, Monday's hours
+    assert not compiled.is_open(datetime(2025, 11, 18, 3, 0))
+    assert not compiled.is_open(datetime(2025, 11, 27, 12, 0))  # Thanksgiving
+    assert compile_hours({}).is_open(datetime(2025, 11, 18, 12, 0)) is None
+
+def test_next_opening_skips_closed_days():
+    """Test that the next opening after a closure is found"""
+    compiled = compile_hours(BFIT_HOURS)
+    assert compiled.next_change(datetime(2025, 11, 18, 3, 0)) == datetime(2025, 11, 18, 6, 0)
+    assert compiled.next_change(datetime(2025, 11, 27, 1, 30)) == datetime(2025, 11, 28, 6, 0)
+
+def test_next_change_merges_back_to_back_periods():
+    """Test that a period running into the next day's opening closes at the later time"""
+    compiled = compile_hours({"regular_hours": {"Monday": "6:00 PM - 6:00 AM", "Tuesday": "6:00 AM - 2:00 PM"}})
+    assert compiled.next_change(datetime(2025, 11, 17, 20, 0)) == datetime(2025, 11, 18, 14, 0)
+    assert compiled.is_open(datetime(2025, 11, 20, 12, 0)) is None  # No hours on Wednesday or Thursday
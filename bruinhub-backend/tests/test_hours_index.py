@@ -0,0 +1,30 @@
+from datetime import datetime
+from cache.hours_index import HoursIndex
+
+GYM_HOURS = {
+    "regular_hours": {day: "6:00 AM - 1:00 AM" for day in ("Monday", "Tuesday", "Wednesday", "Thursday")},
+    "special_hours": {"2025-11-19": "CLOSED"},
+}
+
+def test_hours_are_only_recompiled_when_they_change():
+    """Test that storing the same hours again keeps the compiled entry"""
+    index = HoursIndex()
+    assert index.update("gym", "bfit", GYM_HOURS)
+    assert not index.update("gym", "bfit", dict(GYM_HOURS, zones={"Cardio": {}}))  # Other fields are ignored
+    assert index.compilations == 1
+    assert index.update("gym", "bfit", dict(GYM_HOURS, special_hours=None))
+    assert index.compilations == 2
+
+def test_open_at_reports_next_change():
+    """Test that every facility reports whether it is open and when that changes"""
+    index = HoursIndex()
+    index.load([("gym", "bfit", GYM_HOURS), ("dining", "epicuria", {})])
+    assert index.loaded
+
+    monday_noon = index.open_at(datetime(2025, 11, 17, 12, 0))
+    assert monday_noon["gym"]["bfit"] == {"open": True, "closes_at": "2025-11-18T01:00:00"}
+    assert monday_noon["dining"]["epicuria"] == {"open": None, "opens_at": None}
+
+    # Wednesday is closed, so after Tuesday's hours the next opening is Thursday
+    tuesday_night = index.open_at(datetime(2025, 11, 19, 2, 0))
+    assert tuesday_night["gym"]["bfit"] == {"open": False, "opens_at": "2025-11-20T06:00:00"}
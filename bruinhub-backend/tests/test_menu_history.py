@@ -0,0 +1,17 @@
+from database.menu_history import encode_menu, decode_menu, hash_stations
+
+MENU = {"Capri": ["Spinach Tortellini", "Shrimp Alfredo Pasta"], "Alimenti": ["Braised Lamb"]}
+ITEM_IDS = {"Spinach Tortellini": 1, "Shrimp Alfredo Pasta": 2, "Braised Lamb": 3}
+
+def test_menus_round_trip_through_item_ids():
+    """Test that an encoded menu decodes back to the same stations and items"""
+    stations = encode_menu(MENU, ITEM_IDS)
+    assert stations == {"Capri": [1, 2], "Alimenti": [3]}
+    assert decode_menu(stations, {item_id: name for name, item_id in ITEM_IDS.items()}) == MENU
+
+def test_identical_menus_share_a_version():
+    """Test that the version hash depends on content, not on station order"""
+    reordered = {"Alimenti": ["Braised Lamb"], "Capri": ["Spinach Tortellini", "Shrimp Alfredo Pasta"]}
+    assert hash_stations(encode_menu(MENU, ITEM_IDS)) == hash_stations(encode_menu(reordered, ITEM_IDS))
+    swapped = {"Capri": ["Shrimp Alfredo Pasta", "Spinach Tortellini"], "Alimenti": ["Braised Lamb"]}
+    assert hash_stations(encode_menu(MENU, ITEM_IDS)) != hash_stations(encode_menu(swapped, ITEM_IDS))
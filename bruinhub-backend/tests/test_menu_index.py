@@ -0,0 +1,49 @@
+from cache.menu_index import MenuSearchIndex, tokenize, within_one_edit
+from dietary import Attribute
+
+MENUS = {
+    "epicuria": {"Capri": ["Spinach Tortellini", "Shrimp Alfredo Pasta"], "Alimenti": ["Braised Lamb"]},
+    "de-neve": {"The Front Burner": ["Pork Pozole", "Vegetarian Pozole"], "The Grill": ["DFC"]},
+}
+
+def test_tokenize_normalizes_case_and_accents():
+    """Test that tokens are lowercase ASCII words"""
+    assert tokenize("Crème Brûlée (V)") == ["creme", "brulee", "v"]
+
+def test_every_word_must_match_as_token_or_prefix():
+    """Test that queries match whole words and prefixes, including the station"""
+    index = MenuSearchIndex()
+    index.load(MENUS)
+    assert index.search("shrimp alf") == [{"slug": "epicuria", "station": "Capri", "item": "Shrimp Alfredo Pasta"}]
+    assert [result["item"] for result in index.search("pozole")] == ["Pork Pozole", "Vegetarian Pozole"]
+    assert [result["item"] for result in index.search("grill")] == ["DFC"]
+    assert index.search("shrimp lamb") == []
+
+def test_fuzzy_search_allows_one_typo():
+    """Test that a typo only matches when fuzzy search is requested"""
+    index = MenuSearchIndex()
+    index.load(MENUS)
+    assert index.search("braized") == []
+    assert [result["item"] for result in index.search("braized", fuzzy=True)] == ["Braised Lamb"]
+    assert within_one_edit("lamb", "lmab") and not within_one_edit("lamb", "lxmbx")
+
+def test_changed_menus_replace_only_that_hall():
+    """Test that reindexing a hall drops its old items and keeps the others"""
+    index = MenuSearchIndex()
+    index.load(MENUS)
+    assert not index.update("epicuria", MENUS["epicuria"])
+    assert index.update("epicuria", {"Capri": ["Mushroom Risotto"]})
+    assert index.search("shrimp") == []
+    assert index.search("risotto")[0]["slug"] == "epicuria"
+    assert index.search("dfc")[0]["slug"] == "de-neve"
+    assert index.get_stats() == {"halls": 2, "items": 4, "tokens": 11}
+
+def test_filter_menu_uses_dietary_bits():
+    """Test that filtering keeps only the items with every required bit"""
+    index = MenuSearchIndex()
+    index.load(MENUS)
+    assert index.filter_menu("de-neve", required=Attribute.VEGETARIAN) == {"The Front Burner": ["Vegetarian Pozole"]}
+    assert index.filter_menu("de-neve", required=Attribute.VEGETARIAN | Attribute.MILK_FREE) == {}
+    assert index.filter_menu("epicuria", required=Attribute.SHELLFISH_FREE) == {}
+    assert index.filter_menu("epicuria") == MENUS["epicuria"]
+    assert index.filter_menu("bruin-plate") is None
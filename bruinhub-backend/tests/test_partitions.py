@@ -0,0 +1,16 @@
+from datetime import datetime
+from database.partitions import add_months, month_start, partition_month, partition_name
+
+def test_months_roll_over_years():
+    """Test that month arithmetic wraps around December"""
+    assert month_start(datetime(2025, 11, 18, 9, 30)) == datetime(2025, 11, 1)
+    assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+    assert add_months(datetime(2026, 1, 1), -1) == datetime(2025, 12, 1)
+
+def test_partition_names_round_trip():
+    """Test that a partition's month is recovered from its name, and other tables are ignored"""
+    name = partition_name("gym_capacity_history", datetime(2025, 2, 1))
+    assert name == "gym_capacity_history_p202502"
+    assert partition_month("gym_capacity_history", name) == datetime(2025, 2, 1)
+    assert partition_month("gym_capacity_history", "gym_capacity_history_default") is None
+    assert partition_month("dining_capacity_history", name) is None
@@ -0,0 +1,47 @@
+from datetime import datetime
+from analytics.popular_times import PopularTimes, hour_of_week, spread_over_hours, to_epoch_seconds
+
+def test_hour_of_week_starts_on_monday():
+    """Test that timestamps map to Monday-first hours of the week"""
+    seconds = to_epoch_seconds([datetime(2025, 11, 17, 0, 30), datetime(2025, 11, 23, 23, 59)])
+    assert hour_of_week(seconds).tolist() == [0, 167]
+
+def test_spans_are_split_at_hour_boundaries():
+    """Test that a span crossing an hour is weighted by the seconds spent in each hour"""
+    starts = to_epoch_seconds([datetime(2025, 11, 17, 9, 45)])
+    ends = to_epoch_seconds([datetime(2025, 11, 17, 10, 15)])
+    hours, seconds, span = spread_over_hours(starts, ends)
+    assert hours.tolist() == [9, 10]
+    assert seconds.tolist() == [900, 900]
+    assert span.tolist() == [0, 0]
+
+def test_repeated_samples_are_counted_once():
+    """Test that a scrape repeating upstream's last reading does not skew the average"""
+    profiles = PopularTimes()
+    monday_5pm = datetime(2025, 11, 17, 17, 10)
+    assert profiles.add_points("bfit", "Weight Room", [monday_5pm], [80]) == 1
+    assert profiles.add_points("bfit", "Weight Room", [monday_5pm], [80]) == 0
+    assert profiles.add_points("bfit", "Weight Room", ["2025-11-24T17:20:00"], [40]) == 1
+
+    monday = profiles.get("bfit")["Weight Room"]["Monday"]
+    assert monday[17] == 60
+    assert monday[16] is None
+
+def test_observations_are_time_weighted():
+    """Test that each reading is weighted by how long it held"""
+    profiles = PopularTimes()
+    profiles.observe("epicuria", "capacity", datetime(2025, 11, 21, 12, 0), 100)
+    profiles.observe("epicuria", "capacity", datetime(2025, 11, 21, 12, 45), 20)
+    profiles.observe("epicuria", "capacity", datetime(2025, 11, 21, 13, 0), 20)
+    assert profiles.get("epicuria")["capacity"]["Friday"][12] == 80
+
+def test_load_replaces_profiles():
+    """Test that loading aggregated rows resets the profiles and their duplicate tracking"""
+    profiles = PopularTimes()
+    profiles.add_points("bfit", "Weight Room", [datetime(2025, 11, 17, 17, 10)], [10])
+    hour = datetime(2025, 11, 17, 17)
+    profiles.load([("bfit", "Weight Room", hour, 150.0, 2, datetime(2025, 11, 17, 17, 50))])
+    assert profiles.loaded
+    assert profiles.get("bfit")["Weight Room"]["Monday"][17] == 75
+    assert profiles.add_points("bfit", "Weight Room", [datetime(2025, 11, 17, 17, 50)], [0]) == 0
+    assert profiles.get("bfit")["Weight Room"]["Monday"][17] == 75
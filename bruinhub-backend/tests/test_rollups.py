@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timedelta
+from database.rollups import HOUR, DAY, plan_history_sources, check_bucket, InvalidBucketError
+
+def levels(daily=None, hourly=None):
+    return [("daily", DAY, daily), ("hourly", HOUR, hourly)]
+
+def test_without_rollups_reads_raw():
+    """Test that the whole range comes from raw samples before any rollup has run"""
+    start, end = datetime(2025, 2, 1), datetime(2025, 2, 8)
+    assert plan_history_sources(start, end, HOUR, levels()) == [("raw", start, end)]
+
+def test_coarsest_covering_rollup_is_used():
+    """Test that finished days come from the daily rollup and the edges from finer sources"""
+    start, end = datetime(2025, 2, 1, 9, 30), datetime(2025, 2, 8, 12, 0)
+    plan = plan_history_sources(
+        start, end, DAY, levels(daily=datetime(2025, 2, 8), hourly=datetime(2025, 2, 8, 11))
+    )
+    assert plan == [
+        ("raw", start, datetime(2025, 2, 1, 10)),
+        ("hourly", datetime(2025, 2, 1, 10), datetime(2025, 2, 2)),
+        ("daily", datetime(2025, 2, 2), datetime(2025, 2, 8)),
+        ("hourly", datetime(2025, 2, 8), datetime(2025, 2, 8, 11)),
+        ("raw", datetime(2025, 2, 8, 11), end),
+    ]
+
+def test_rollups_must_divide_the_bucket():
+    """Test that a rollup coarser than or misaligned with the bucket is skipped"""
+    start, end = datetime(2025, 2, 1), datetime(2025, 2, 3)
+    plan = plan_history_sources(
+        start, end, timedelta(minutes=90), levels(daily=end, hourly=end)
+    )
+    assert plan == [("raw", start, end)]
+    assert plan_history_sources(start, end, 2 * HOUR, levels(daily=end, hourly=end)) == [("hourly", start, end)]
+
+def test_buckets_finer_than_retained_history_are_rejected():
+    """Test that a bucket must divide the finest resolution still kept at the start of the range"""
+    retained = [
+        ("raw", None, datetime(2025, 2, 1)),
+        ("hourly", HOUR, datetime(2025, 1, 1)),
+        ("daily", DAY, None),
+    ]
+    check_bucket(datetime(2025, 2, 2), timedelta(minutes=15), retained)
+    check_bucket(datetime(2025, 1, 15), 2 * HOUR, retained)
+    check_bucket(datetime(2024, 6, 1), DAY, retained)
+    for start, bucket in ((datetime(2025, 1, 15), timedelta(minutes=15)), (datetime(2024, 6, 1), HOUR)):
+        with pytest.raises(InvalidBucketError):
+            check_bucket(start, bucket, retained)
+    check_bucket(datetime(2024, 6, 1), timedelta(minutes=15), [("raw", None, None)])
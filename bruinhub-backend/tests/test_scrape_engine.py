@@ -0,0 +1,58 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from scrapers.engine import ScrapeEngine
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Serves /<delay> as JSON after sleeping for that many seconds"""
+
+    def do_GET(self):
+        delay = float(self.path.strip("/"))
+        time.sleep(delay)
+        body = json.dumps({"delay": delay}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")  # Like the goboard endpoint
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_sources_are_fetched_concurrently(server_url):
+    """Test that a cycle takes about as long as its slowest source"""
+    engine = ScrapeEngine(max_concurrency=4, timeout=5)
+    try:
+        start = time.monotonic()
+        results = engine.fetch_many({name: f"{server_url}/0.3" for name in "abc"}, as_json=True)
+        elapsed = time.monotonic() - start
+    finally:
+        engine.close()
+
+    assert results == {name: {"delay": 0.3} for name in "abc"}
+    assert elapsed < 0.8
+
+
+def test_slow_source_times_out_without_blocking_others(server_url):
+    """Test that a source past its timeout maps to None"""
+    engine = ScrapeEngine(max_concurrency=4, timeout=0.3)
+    try:
+        results = engine.fetch_many({"fast": f"{server_url}/0", "slow": f"{server_url}/2"}, as_json=True)
+    finally:
+        engine.close()
+
+    assert results == {"fast": {"delay": 0.0}, "slow": None}
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from cache.hours_index import HoursIndex
+from tasks.policy import ScrapePolicy
+
+HOURS = {"bfit": {"regular_hours": {day: "6:00 AM - 10:00 PM" for day in (
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
+)}}}
+
+def make_policy(**kwargs):
+    options = dict(
+        base_interval=300, min_interval=60, max_interval=900,
+        peak_interval=120, peak_hours="17-19", closed_max_interval=21600, jitter=0,
+    )
+    options.update(kwargs)
+    hours = HoursIndex()
+    for slug, facility in HOURS.items():
+        hours.update("gym", slug, facility)
+    return ScrapePolicy("gyms", "gym", hours, **options)
+
+def test_closed_sources_sleep_until_opening():
+    """Test that nothing runs between closing and the next opening"""
+    policy = make_policy()
+    now = datetime(2025, 11, 18, 3, 0)
+    assert policy.plan(now) == (3 * 3600, "closed")
+    assert policy.next_run_time(now) == datetime(2025, 11, 18, 6, 0)
+
+def test_interval_follows_upstream_update_rate():
+    """Test that polling settles at twice the observed upstream rate, within bounds"""
+    policy = make_policy()
+    now = datetime(2025, 11, 18, 9, 0)
+    assert policy.plan(now) == (300, "open")  # Nothing observed yet
+
+    for minute in (0, 10, 20, 30):
+        policy.record_run(True, now + timedelta(minutes=minute))
+    assert policy.plan(now) == (300, "adaptive")  # Changes every 10 minutes
+
+    policy.record_run(False, now + timedelta(minutes=35))
+    policy.record_run(True, now + timedelta(hours=20))  # Gap across a closure is ignored
+    assert policy.upstream_period == 600
+
+def test_unknown_hours_count_as_open():
+    """Test that a source whose facilities have no hours yet is polled as if open"""
+    policy = ScrapePolicy("dining", "dining", HoursIndex(), base_interval=300, jitter=0)
+    assert policy.plan(datetime(2025, 11, 18, 3, 0)) == (300, "open")
+
+def test_peak_hours_tighten_interval():
+    """Test that peak hours poll at least every peak_interval"""
+    policy = make_policy()
+    assert policy.plan(datetime(2025, 11, 18, 17, 30)) == (120, "peak")
@@ -0,0 +1,73 @@
+import json
+import time
+from cache.snapshots import SnapshotStore, project_snapshot
+from fields import FACILITY_FIELDS, parse_fields
+
+def test_get_returns_stored_snapshot():
+    """Test that a stored snapshot is returned until it is replaced"""
+    store = SnapshotStore(max_entries=4, ttl=60)
+    assert store.get("gym", "bfit") is None
+
+    store.set("gym", "bfit", {"slug": "bfit"})
+    assert store.get("gym", "bfit").data == {"slug": "bfit"}
+    assert store.get("dining", "bfit") is None  # Kinds are separate namespaces
+
+    store.set("gym", "bfit", {"slug": "bfit", "zones": {}})
+    assert store.get("gym", "bfit").data == {"slug": "bfit", "zones": {}}
+
+def test_expired_snapshots_are_misses():
+    """Test that snapshots older than the TTL fall back to the database"""
+    store = SnapshotStore(max_entries=4, ttl=0.01)
+    store.set("dining", "epicuria", {"slug": "epicuria"})
+    time.sleep(0.02)
+    assert store.get("dining", "epicuria") is None
+    assert store.get_stats()["entries"] == 0
+
+def test_least_recently_used_snapshot_is_evicted():
+    """Test that the store never holds more than max_entries snapshots"""
+    store = SnapshotStore(max_entries=2, ttl=60)
+    store.set("gym", "bfit", {"slug": "bfit"})
+    store.set("gym", "john-wooden-center", {"slug": "john-wooden-center"})
+    store.get("gym", "bfit")  # Mark BFIT as recently used
+    store.set("dining", "epicuria", {"slug": "epicuria"})
+
+    assert store.get("gym", "john-wooden-center") is None
+    assert store.get("gym", "bfit") is not None
+    assert store.get("dining", "epicuria") is not None
+    assert store.get_stats()["entries"] == 2
+
+def test_etag_tracks_content():
+    """Test that the ETag and Last-Modified only change when the content does"""
+    store = SnapshotStore(max_entries=4, ttl=60)
+    first = store.set("gym", "bfit", {"slug": "bfit", "zones": {"Cardio": {"percentage": 10}}})
+    same = store.set("gym", "bfit", {"zones": {"Cardio": {"percentage": 10}}, "slug": "bfit"})
+    assert same.etag == first.etag
+    assert same.last_modified == first.last_modified
+
+    changed = store.set("gym", "bfit", {"slug": "bfit", "zones": {"Cardio": {"percentage": 20}}})
+    assert changed.etag != first.etag
+    assert changed.last_modified >= first.last_modified
+
+def test_body_is_only_encoded_when_content_changes():
+    """Test that an unchanged snapshot reuses its serialized and compressed body"""
+    store = SnapshotStore(max_entries=4, ttl=60)
+    first = store.set("gym", "bfit", {"slug": "bfit"})
+    assert store.set("gym", "bfit", {"slug": "bfit"}).body is first.body
+    assert store.set("gym", "bfit", {"slug": "bfit", "zones": {}}).body is not first.body
+
+def test_projections_get_their_own_etag():
+    """Test that a projection keeps Last-Modified, gets an ETag per fieldset and is reused until the content changes"""
+    store = SnapshotStore(max_entries=4, ttl=60)
+    snapshot = store.set("gym", "bfit", {"slug": "bfit", "zones": {"Cardio": {"percentage": 40, "capacity": 100}}})
+    fieldset = parse_fields("zones.percentage", FACILITY_FIELDS)["gym"]
+    projected = project_snapshot(snapshot, fieldset)
+    assert projected.data == {"slug": "bfit", "zones": {"Cardio": {"percentage": 40}}}
+    assert projected.last_modified == snapshot.last_modified
+    assert json.loads(projected.body.identity)["timestamp"] == json.loads(snapshot.body.identity)["timestamp"]
+    assert projected.etag not in (snapshot.etag, project_snapshot(snapshot, {"slug": None}).etag)
+    assert project_snapshot(snapshot, fieldset) is projected
+
+    unchanged = store.set("gym", "bfit", dict(snapshot.data))
+    assert project_snapshot(unchanged, fieldset) is projected
+    changed = store.set("gym", "bfit", {"slug": "bfit", "zones": {"Cardio": {"percentage": 55, "capacity": 100}}})
+    assert project_snapshot(changed, fieldset).etag != projected.etag
@@ -0,0 +1,47 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+from cache import event_broker, snapshot_store
+from streaming import create_stream_app
+
+
+async def open_client() -> TestClient:
+    client = TestClient(TestServer(create_stream_app()))
+    await client.start_server()
+    return client
+
+def test_stream_requires_slugs():
+    """Test that the stream needs to know which facilities to follow"""
+    async def main():
+        client = await open_client()
+        try:
+            response = await client.get("/api/v1/stream")
+            return response.status, await response.json()
+        finally:
+            await client.close()
+
+    status, body = asyncio.run(main())
+    assert status == 400
+    assert "error" in body
+
+def test_stream_sends_snapshots_then_deltas():
+    """Test that a stream opens with the cached snapshot and then sends only what changed"""
+    snapshot_store.set("gym", "stream-test", {"slug": "stream-test", "capacity": 1})
+    event_broker.publish("gym", "stream-test", {"slug": "stream-test", "capacity": 1})
+
+    async def main():
+        client = await open_client()
+        try:
+            response = await client.get("/api/v1/stream?slugs=stream-test")
+            assert response.headers["Content-Type"] == "text/event-stream"
+            snapshot = await response.content.readuntil(b"\n\n")
+            event_broker.publish("gym", "stream-test", {"slug": "stream-test", "capacity": 2})
+            delta = await asyncio.wait_for(response.content.readuntil(b"\n\n"), 5)
+            response.close()
+            return snapshot.decode(), delta.decode()
+        finally:
+            await client.close()
+
+    snapshot, delta = asyncio.run(main())
+    assert "event: snapshot" in snapshot and '"capacity":1' in snapshot
+    assert "event: delta" in delta and '"data":{"capacity":2}' in delta